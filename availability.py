@@ -0,0 +1,62 @@
+import argparse
+
+from query_cache import query_cache
+
+# Cached reads of Blood_Availability go stale whenever Storage_House changes
+query_cache.add_dependency("Storage_House", "Blood_Availability")
+
+AVAILABILITY_QUERY = "SELECT Blood_grp, Total_Units FROM Blood_Availability ORDER BY Total_Units DESC"
+
+DRIFT_QUERY = """
+    SELECT g.Blood_grp, COALESCE(a.Total_Units, 0) AS Summary_units, COALESCE(s.Actual, 0) AS Actual_units
+    FROM (SELECT Blood_grp FROM Blood_Availability
+          UNION SELECT DISTINCT Blood_grp FROM Storage_House) g
+    LEFT JOIN Blood_Availability a ON a.Blood_grp = g.Blood_grp
+    LEFT JOIN (SELECT Blood_grp, SUM(Quantity) AS Actual FROM Storage_House GROUP BY Blood_grp) s
+        ON s.Blood_grp = g.Blood_grp
+    WHERE COALESCE(a.Total_Units, 0) <> COALESCE(s.Actual, 0)
+"""
+
+
+# Groups whose maintained total disagrees with Storage_House
+def check_consistency(tx):
+    return tx.fetchall(DRIFT_QUERY)
+
+
+# Recompute every total from Storage_House while holding its rows, after
+# the totals themselves (see lots.lock_groups)
+def rebuild(tx):
+    tx.fetchall("SELECT Blood_grp FROM Blood_Availability ORDER BY Blood_grp FOR UPDATE")
+    tx.fetchall("SELECT Storage_id FROM Storage_House FOR UPDATE")
+    tx.execute("DELETE FROM Blood_Availability")
+    tx.execute(
+        """INSERT INTO Blood_Availability (Blood_grp, Total_Units)
+        SELECT Blood_grp, SUM(Quantity) FROM Storage_House GROUP BY Blood_grp"""
+    )
+    query_cache.invalidate("Blood_Availability")
+    return True
+
+
+def main():
+    from database import transaction
+
+    parser = argparse.ArgumentParser(description="Check or rebuild the Blood_Availability summary")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    args = parser.parse_args()
+
+    with transaction(f"availability_{args.command}") as tx:
+        drift = check_consistency(tx)
+        for row in drift:
+            print(f"{row['Blood_grp']}: summary {row['Summary_units']}, actual {row['Actual_units']}")
+        if args.command == "rebuild":
+            rebuild(tx)
+            print("Blood_Availability rebuilt")
+        elif not drift:
+            print("Blood_Availability is consistent")
+    # A failing check fails the calling script, e.g. CI
+    if drift and args.command == "check":
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+
+SQLITE_SCHEMA_FILE = Path(__file__).resolve().parent / "blood_bank_sqlite.sql"
+
+
+# Connection settings come from the environment; nothing is hardcoded
+def config_from_env(environ=os.environ):
+    return {
+        "backend": environ.get("BB_DB_BACKEND", "mysql").lower(),
+        "host": environ.get("BB_DB_HOST", "localhost"),
+        "port": int(environ.get("BB_DB_PORT", "3306")),
+        "user": environ.get("BB_DB_USER", "root"),
+        "password": environ.get("BB_DB_PASSWORD", ""),
+        "database": environ.get("BB_DB_NAME", "blood_bank"),
+        "pool_size": int(environ.get("BB_DB_POOL_SIZE", "5")),
+        "sqlite_path": environ.get("BB_SQLITE_PATH", "blood_bank.db"),
+    }
+
+
+class MySQLBackend:
+    dialect = "mysql"
+
+    def __init__(self, config):
+        import mysql.connector
+
+        self.Error = mysql.connector.Error
+        # Errors caused by the statement's data rather than the connection
+        self.row_errors = (mysql.connector.IntegrityError, mysql.connector.DataError,
+                           mysql.connector.ProgrammingError)
+        self.pool_size = config["pool_size"]
+        # Each pool needs its own name when several databases are in use
+        self.pool_name = config.get("pool_name", "bb_pool")
+        self.connect_args = {
+            "host": config["host"],
+            "port": config["port"],
+            "user": config["user"],
+            "password": config["password"],
+            "database": config["database"],
+            "auth_plugin": "mysql_native_password",
+        }
+        self._pool = None
+        self._lock = threading.Lock()
+
+    # Pool is created lazily once per process. mysql.connector raises as soon
+    # as the pool is exhausted, so wait for a connection to be handed back.
+    def get_connection(self, timeout=30):
+        from mysql.connector import errors, pooling
+
+        with self._lock:
+            if self._pool is None:
+                self._pool = pooling.MySQLConnectionPool(
+                    pool_name=self.pool_name,
+                    pool_size=self.pool_size,
+                    **self.connect_args
+                )
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self._pool.get_connection()
+            except errors.PoolError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.005)
+
+    # The MySQL schema is installed from blood_bank.sql by the operator
+    def bootstrap(self, conn):
+        return False
+
+
+# MySQL-flavoured SQL used by the app, rewritten once per distinct statement
+_FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE\b", re.IGNORECASE)
+_ON_DUPLICATE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+_VALUES_FN = re.compile(r"\bVALUES\((\w+)\)", re.IGNORECASE)
+_GREATEST = re.compile(r"\bGREATEST\(", re.IGNORECASE)
+_LEAST = re.compile(r"\bLEAST\(", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def translate_to_sqlite(query):
+    query = _FOR_UPDATE.sub("", query)
+    query = _GREATEST.sub("MAX(", query)
+    query = _LEAST.sub("MIN(", query)
+    match = _ON_DUPLICATE.search(query)
+    if match:
+        head, tail = query[:match.start()], query[match.end():]
+        query = head + "ON CONFLICT DO UPDATE SET" + _VALUES_FN.sub(r"excluded.\1", tail)
+    return query.replace("%s", "?")
+
+
+# Cursor with the subset of the mysql.connector cursor API the app uses
+class SQLiteCursor:
+    def __init__(self, raw, dictionary=False):
+        self._raw = raw
+        self._dictionary = dictionary
+
+    @property
+    def rowcount(self):
+        return self._raw.rowcount
+
+    @property
+    def description(self):
+        return self._raw.description
+
+    @property
+    def lastrowid(self):
+        return self._raw.lastrowid
+
+    def execute(self, query, params=None):
+        self._raw.execute(translate_to_sqlite(query), tuple(params) if params else ())
+
+    def executemany(self, query, rows):
+        self._raw.executemany(translate_to_sqlite(query), rows)
+
+    def _convert(self, rows):
+        if not self._dictionary or self._raw.description is None:
+            return rows
+        columns = [col[0] for col in self._raw.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def fetchall(self):
+        return self._convert(self._raw.fetchall())
+
+    def fetchone(self):
+        row = self._raw.fetchone()
+        return None if row is None else self._convert([row])[0]
+
+    def fetchmany(self, size):
+        return self._convert(self._raw.fetchmany(size))
+
+    def close(self):
+        self._raw.close()
+
+
+# Pooled connection; close() hands it back like a mysql.connector pooled connection
+class SQLiteConnection:
+    def __init__(self, raw, pool):
+        self._raw = raw
+        self._pool = pool
+
+    def cursor(self, dictionary=False, **kwargs):
+        return SQLiteCursor(self._raw.cursor(), dictionary)
+
+    # IMMEDIATE takes the write lock up front, standing in for row locks
+    def start_transaction(self):
+        self._raw.execute("BEGIN IMMEDIATE")
+
+    @property
+    def in_transaction(self):
+        return self._raw.in_transaction
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def close(self):
+        if self._raw is None:
+            return
+        if self._raw.in_transaction:
+            self._raw.rollback()
+        self._pool.put(self._raw)
+        self._raw = None
+
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+
+
+class SQLiteBackend:
+    dialect = "sqlite"
+    Error = sqlite3.Error
+    row_errors = (sqlite3.IntegrityError, sqlite3.DataError, sqlite3.ProgrammingError)
+
+    def __init__(self, config):
+        self.path = config["sqlite_path"]
+        self.pool_size = config["pool_size"]
+        self._pool = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        # cached_statements keeps prepared statements for reuse across calls
+        raw = sqlite3.connect(
+            self.path,
+            isolation_level=None,
+            check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            cached_statements=256,
+            timeout=30,
+        )
+        raw.execute("PRAGMA journal_mode=WAL")
+        raw.execute("PRAGMA synchronous=NORMAL")
+        raw.execute("PRAGMA foreign_keys=ON")
+        return raw
+
+    def get_connection(self, timeout=30):
+        with self._lock:
+            if self._pool.empty() and self._created < self.pool_size:
+                self._created += 1
+                self._pool.put(self._open())
+        return SQLiteConnection(self._pool.get(timeout=timeout), self._pool)
+
+    # Create the translated schema in an empty database file
+    def bootstrap(self, conn):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'Donor'")
+            if cursor.fetchall():
+                return False
+            from migrations import split_statements
+
+            for statement in split_statements(SQLITE_SCHEMA_FILE.read_text()):
+                cursor.execute(statement)
+            return True
+        finally:
+            cursor.close()
+
+
+BACKENDS = {"mysql": MySQLBackend, "sqlite": SQLiteBackend}
+
+
+def create_backend(config=None):
+    config = config or config_from_env()
+    try:
+        backend_class = BACKENDS[config["backend"]]
+    except KeyError:
+        raise ValueError(f"Unknown BB_DB_BACKEND {config['backend']!r}; expected one of {sorted(BACKENDS)}")
+    return backend_class(config)
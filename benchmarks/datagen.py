@@ -0,0 +1,113 @@
+import random
+from datetime import datetime, timedelta
+
+from lots import SHELF_LIFE_DAYS
+from validation import BLOOD_GROUPS
+
+# Rough real-world blood group mix, in BLOOD_GROUPS order
+GROUP_WEIGHTS = [30, 6, 9, 2, 38, 7, 4, 1]
+ORDER_STATUSES = ["Pending", "Fulfilled", "Cancelled"]
+STATUS_WEIGHTS = [15, 75, 10]
+HISTORY_DAYS = 730
+
+COLUMNS = {
+    "Hospital": ["Hosp_id", "Hosp_name", "Location"],
+    "Donor": ["Dona_id", "Dona_name", "Blood_grp", "Dona_contact"],
+    # Stock is loaded as lots; triggers derive Storage_House from them
+    "Blood_Lot": ["Storage_id", "Blood_grp", "Quantity", "Collected_on", "Expires_on"],
+    "Orders": ["Order_id", "Hosp_id", "Blood_grp", "Quantity", "Order_date", "Status"],
+    "Supply": ["Supply_id", "Hosp_id", "Blood_grp", "Quantity", "Supply_date"],
+    "Blood_Test": ["Test_id", "Dona_id", "Test_date", "Hb_level", "Blood_pressure", "Result"],
+}
+
+
+# Row counts per table for a given scale (number of donors/orders)
+def table_sizes(scale):
+    return {
+        "Hospital": max(10, scale // 1000),
+        "Donor": scale,
+        "Blood_Lot": max(len(BLOOD_GROUPS), scale // 100),
+        "Orders": scale,
+        "Supply": max(1, scale // 2),
+        "Blood_Test": scale,
+    }
+
+
+def hospital_id(i):
+    return f"HOSP{i:06d}"
+
+
+def donor_id(i):
+    return f"DON{i:08d}"
+
+
+# Lazily generate one table's rows so 10^7-row scales never sit in memory
+def generate_table(table, scale, seed=42, now=None):
+    rng = random.Random(f"{seed}:{table}")
+    now = now or datetime.now().replace(microsecond=0)
+    sizes = table_sizes(scale)
+    n_hospitals, n_donors = sizes["Hospital"], sizes["Donor"]
+
+    def group():
+        return rng.choices(BLOOD_GROUPS, GROUP_WEIGHTS)[0]
+
+    def timestamp():
+        return now - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+
+    for i in range(sizes[table]):
+        if table == "Hospital":
+            yield (hospital_id(i), f"Hospital {i}", f"City {i % 97}")
+        elif table == "Donor":
+            yield (donor_id(i), f"Donor {rng.randrange(10 ** 6):06d} {i}", group(), f"9{rng.randrange(10 ** 9):09d}")
+        elif table == "Blood_Lot":
+            collected = now.date() - timedelta(days=rng.randrange(SHELF_LIFE_DAYS))
+            yield (f"STO{i:07d}", BLOOD_GROUPS[i % len(BLOOD_GROUPS)], rng.randint(1, 50),
+                   collected, collected + timedelta(days=SHELF_LIFE_DAYS))
+        elif table == "Orders":
+            yield (f"ORD{i:08d}", hospital_id(rng.randrange(n_hospitals)), group(), rng.randint(1, 10),
+                   timestamp(), rng.choices(ORDER_STATUSES, STATUS_WEIGHTS)[0])
+        elif table == "Supply":
+            yield (f"SUP{i:08d}", hospital_id(rng.randrange(n_hospitals)), group(), rng.randint(1, 20), timestamp())
+        elif table == "Blood_Test":
+            yield (f"TST{i:08d}", donor_id(rng.randrange(n_donors)), timestamp().date(),
+                   round(rng.uniform(10.5, 17.5), 2), f"{rng.randint(100, 140)}/{rng.randint(60, 90)}",
+                   rng.choices(["Suitable", "Unsuitable"], [85, 15])[0])
+
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Load generated rows with batched inserts, one transaction per batch;
+# returns row counts per table. With lots=False the stock goes straight into
+# Storage_House, for a base schema that migration 0006 has not yet turned
+# into lots (it backfills one lot per storage unit).
+def seed(conn, scale, seed=42, batch_size=5000, log=print, lots=True):
+    counts = {}
+    cursor = conn.cursor()
+    try:
+        for table, columns in COLUMNS.items():
+            rows = generate_table(table, scale, seed)
+            if table == "Blood_Lot" and not lots:
+                table, columns = "Storage_House", columns[:3]
+                rows = (row[:3] for row in rows)
+            query = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                     f"VALUES ({', '.join(['%s'] * len(columns))})")
+            counts[table] = 0
+            for batch in batched(rows, batch_size):
+                conn.start_transaction()
+                cursor.executemany(query, batch)
+                conn.commit()
+                counts[table] += len(batch)
+            if log:
+                log(f"seeded {table}: {counts[table]} rows")
+    finally:
+        cursor.close()
+    return counts
@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import date
+
+from availability import AVAILABILITY_QUERY
+from backends import SQLiteBackend, config_from_env
+from benchmarks.datagen import seed
+from database import backend
+from eligibility import campaign_query
+from lots import LOCK_FEFO_LOTS
+from migrations import migrate, split_statements
+from order_engine import LOCK_TOTAL
+from search import compile_query
+
+SCHEMA_FILE = "blood_bank.sql"
+
+# The reads the app issues on the base schema, with representative parameters
+WORKLOAD = [
+    ("dashboard_pending_orders",
+     "SELECT o.Order_id, h.Hosp_name, o.Blood_grp, o.Quantity FROM Orders o "
+     "JOIN Hospital h ON o.Hosp_id = h.Hosp_id WHERE o.Status = 'Pending' LIMIT 5", None),
+    ("recent_activities",
+     "SELECT * FROM (SELECT 'Order' AS Type, Order_id AS ID, Blood_grp, Quantity, Order_date AS Date "
+     "FROM Orders ORDER BY Order_date DESC LIMIT 3) AS recent_orders UNION "
+     "SELECT * FROM (SELECT 'Supply' AS Type, Supply_id AS ID, Blood_grp, Quantity, Supply_date AS Date "
+     "FROM Supply ORDER BY Supply_date DESC LIMIT 3) AS recent_supply ORDER BY Date DESC", None),
+    ("pending_order_ids",
+     "SELECT Order_id FROM Orders WHERE Status = 'Pending'", None),
+    ("orders_page_newest",
+     "SELECT o.Order_id, h.Hosp_name, o.Blood_grp, o.Quantity, o.Order_date, o.Status FROM Orders o "
+     "JOIN Hospital h ON o.Hosp_id = h.Hosp_id ORDER BY o.Order_date DESC, o.Order_id DESC LIMIT 51", None),
+    ("orders_page_pending",
+     "SELECT o.Order_id, h.Hosp_name, o.Blood_grp, o.Quantity, o.Order_date, o.Status FROM Orders o "
+     "JOIN Hospital h ON o.Hosp_id = h.Hosp_id WHERE o.Status IN (%s) "
+     "ORDER BY o.Order_date DESC, o.Order_id DESC LIMIT 51", ("Pending",)),
+    ("orders_page_group",
+     "SELECT o.Order_id, o.Order_date FROM Orders o WHERE o.Blood_grp IN (%s) "
+     "ORDER BY o.Order_date DESC, o.Order_id DESC LIMIT 51", ("O-",)),
+    ("supply_page_newest",
+     "SELECT s.Supply_id, h.Hosp_name, s.Blood_grp, s.Quantity, s.Supply_date FROM Supply s "
+     "JOIN Hospital h ON s.Hosp_id = h.Hosp_id ORDER BY s.Supply_date DESC, s.Supply_id DESC LIMIT 51", None),
+    ("donors_with_group",
+     "SELECT * FROM Donor WHERE Blood_grp = %s", ("AB-",)),
+    ("donor_name_prefix",
+     "SELECT Dona_name, Dona_contact FROM Donor WHERE Dona_name LIKE %s", ("Donor 12345%",)),
+    ("donor_information",
+     "SELECT * FROM Donor_Information WHERE Dona_id = %s", ("DON00000042",)),
+]
+
+
+# Reads of the tables and search indexes the migrations add, built from the
+# app's own statements; they only exist, and are only timed, after migrating
+def migrated_workload(dialect, today=None):
+    today = today or date.today()
+    return [
+        ("availability_totals", AVAILABILITY_QUERY, None),
+        ("order_total_lock", LOCK_TOTAL, ("O+",)),
+        ("order_fefo_lots", LOCK_FEFO_LOTS, ("O+", today, 10)),
+        # FULLTEXT (MySQL) or FTS5 (SQLite), then the MySQL short-word LIKE fallback
+        ("search_donor_name", *compile_query("contact of donor 01234", dialect, today)),
+        ("search_donor_short_name", *compile_query("contact of donor 0", dialect, today)),
+        ("eligibility_campaign", *campaign_query("O+", today=today)),
+    ]
+
+
+# Fresh scratch database on the configured backend, with the base schema
+def create_database(name, scale, log=print):
+    if backend.dialect == "sqlite":
+        path = f"{name}.db"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        scratch = SQLiteBackend(dict(config_from_env(), sqlite_path=path, pool_size=1))
+        conn = scratch.get_connection()
+        scratch.bootstrap(conn)
+    else:
+        import mysql.connector
+
+        server = {k: v for k, v in backend.connect_args.items() if k != "database"}
+        conn = mysql.connector.connect(**server)
+        cursor = conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS `{name}`")
+        cursor.execute(f"CREATE DATABASE `{name}`")
+        cursor.execute(f"USE `{name}`")
+        with open(SCHEMA_FILE) as schema:
+            for statement in split_statements(schema.read()):
+                if statement.upper().startswith(("CREATE DATABASE", "USE ")):
+                    continue
+                cursor.execute(statement)
+        cursor.close()
+    # Seeded before migrations run, so in the base schema's shape
+    seed(conn, scale, log=log, lots=False)
+    return conn
+
+
+def explain(conn, query, params):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        if backend.dialect == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+            return [{"table": None, "type": None, "key": None, "rows": None, "extra": row["detail"]}
+                    for row in cursor.fetchall()]
+        cursor.execute("EXPLAIN " + query, params)
+        return [
+            {"table": row["table"], "type": row["type"], "key": row["key"],
+             "rows": row["rows"], "extra": row["Extra"]}
+            for row in cursor.fetchall()
+        ]
+    finally:
+        cursor.close()
+
+
+def describe_plan(plan):
+    if backend.dialect == "sqlite":
+        return "; ".join(step["extra"] for step in plan)
+    return ", ".join(f"{step['table']}:{step['type']}/{step['key'] or '-'}" for step in plan)
+
+
+def time_query(conn, query, params, repeat):
+    cursor = conn.cursor()
+    samples = []
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            cursor.execute(query, params)
+            cursor.fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        cursor.close()
+    return statistics.median(samples)
+
+
+def run_workload(conn, workload, repeat):
+    return {
+        name: {"median_ms": time_query(conn, query, params, repeat), "plan": explain(conn, query, params)}
+        for name, query, params in workload
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN and time app queries before and after migrations")
+    parser.add_argument("--scale", type=int, default=100000, help="donors/orders to seed")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database", default="blood_bank_bench")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    conn = create_database(args.database, args.scale)
+    before = run_workload(conn, WORKLOAD, args.repeat)
+    migrate(conn, dialect=backend.dialect)
+    cursor = conn.cursor()
+    if backend.dialect == "sqlite":
+        cursor.execute("ANALYZE")
+    else:
+        cursor.execute("ANALYZE TABLE Storage_House, Orders, Supply, Donor, Blood_Test, Blood_Lot, "
+                       "Blood_Availability, Donor_Eligibility")
+        cursor.fetchall()
+    cursor.close()
+    workload = WORKLOAD + migrated_workload(backend.dialect)
+    after = run_workload(conn, workload, args.repeat)
+    conn.close()
+
+    print(f"{'query':<28}{'before ms':>12}{'after ms':>12}  plan after")
+    for name, _, _ in workload:
+        plan = describe_plan(after[name]["plan"])
+        was = f"{before[name]['median_ms']:.2f}" if name in before else "-"
+        print(f"{name:<28}{was:>12}{after[name]['median_ms']:>12.2f}  {plan}")
+
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump({"backend": backend.dialect, "scale": args.scale, "before": before, "after": after},
+                      out, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
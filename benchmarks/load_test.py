@@ -0,0 +1,245 @@
+import argparse
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+from availability import AVAILABILITY_QUERY, check_consistency
+from benchmarks.datagen import hospital_id, seed, table_sizes
+from database import cached_query, execute_query, run_transaction, transaction
+from inventory import record_supply
+from lots import check_storage
+from migrations import ensure_migrated
+from order_engine import place_order, update_order_status
+from search import process_query
+from validation import BLOOD_GROUPS
+
+# Relative frequency of each simulated staff action
+DEFAULT_MIX = {
+    "dashboard": 40,
+    "search": 20,
+    "place_order": 20,
+    "cancel_order": 10,
+    "record_supply": 10,
+}
+
+SEARCH_PHRASES = ["available blood", "donors with ab-", "donors with o-", "contact of donor 00042"]
+
+DASHBOARD_QUERIES = [
+    AVAILABILITY_QUERY,
+    "SELECT Dona_name, Blood_grp, Dona_contact FROM Donor ORDER BY Dona_name LIMIT 5",
+    "SELECT o.Order_id, h.Hosp_name, o.Blood_grp, o.Quantity FROM Orders o "
+    "JOIN Hospital h ON o.Hosp_id = h.Hosp_id WHERE o.Status = 'Pending' LIMIT 5",
+    """SELECT * FROM (SELECT 'Order' AS Type, Order_id AS ID, Blood_grp, Quantity, Order_date AS Date FROM Orders ORDER BY Order_date DESC LIMIT 3) AS recent_orders
+    UNION
+    SELECT * FROM (SELECT 'Supply' AS Type, Supply_id AS ID, Blood_grp, Quantity, Supply_date AS Date FROM Supply ORDER BY Supply_date DESC LIMIT 3) AS recent_supply
+    ORDER BY Date DESC""",
+]
+
+
+def percentiles(samples):
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "p50_ms": pick(50),
+        "p95_ms": pick(95),
+        "p99_ms": pick(99),
+        "max_ms": ordered[-1],
+    }
+
+
+# Latencies, errors and the unit ledger shared by all simulated users
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.units = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, action, latency_ms, ok):
+        with self._lock:
+            self.latencies[action].append(latency_ms)
+            if not ok:
+                self.errors[action] += 1
+
+    def add_units(self, kind, quantity):
+        with self._lock:
+            self.units[kind] += quantity
+
+
+class SimulatedUser:
+    def __init__(self, user_id, run_tag, n_hospitals, recorder, use_cache, rng):
+        self.prefix = f"LT{run_tag}U{user_id}"
+        self.n_hospitals = n_hospitals
+        self.recorder = recorder
+        self.use_cache = use_cache
+        self.rng = rng
+        self.pending = []
+        self.counter = 0
+
+    def next_id(self):
+        self.counter += 1
+        return f"{self.prefix}N{self.counter}"
+
+    def dashboard(self):
+        read = (lambda q: cached_query(q, ttl=10)) if self.use_cache else (lambda q: execute_query(q, fetch=True))
+        return all(read(query) is not None for query in DASHBOARD_QUERIES)
+
+    def search(self):
+        sql_query, params = process_query(self.rng.choice(SEARCH_PHRASES))
+        return execute_query(sql_query, params, fetch=True) is not None
+
+    def place_order(self):
+        order_id = self.next_id()
+        quantity = self.rng.randint(1, 5)
+        result = run_transaction(lambda tx: place_order(
+            tx, order_id, hospital_id(self.rng.randrange(self.n_hospitals)),
+            self.rng.choice(BLOOD_GROUPS), quantity), "place_order")
+        if result is None:
+            return False
+        if result.placed:
+            self.recorder.add_units("ordered", quantity)
+            self.pending.append((order_id, quantity))
+        return True
+
+    def cancel_order(self):
+        if not self.pending:
+            return self.place_order()
+        order_id, quantity = self.pending.pop(self.rng.randrange(len(self.pending)))
+        result = run_transaction(lambda tx: update_order_status(tx, order_id, "Cancelled"), "cancel_order")
+        if result:
+            self.recorder.add_units("returned", quantity)
+        return result is not None
+
+    def record_supply(self):
+        quantity = self.rng.randint(1, 20)
+        result = run_transaction(lambda tx: record_supply(
+            tx, self.next_id(), hospital_id(self.rng.randrange(self.n_hospitals)),
+            self.rng.choice(BLOOD_GROUPS), quantity), "record_supply")
+        if result:
+            self.recorder.add_units("supplied", quantity)
+        return result is not None
+
+    def run(self, mix, deadline, max_ops):
+        actions, weights = zip(*mix.items())
+        done = 0
+        while time.monotonic() < deadline and (max_ops is None or done < max_ops):
+            action = self.rng.choices(actions, weights)[0]
+            started = time.perf_counter()
+            try:
+                ok = getattr(self, action)()
+            except Exception:
+                ok = False
+            self.recorder.record(action, (time.perf_counter() - started) * 1000, ok)
+            done += 1
+
+
+def total_units():
+    rows = execute_query("SELECT COALESCE(SUM(Quantity), 0) AS total FROM Storage_House", fetch=True)
+    return int(rows[0]["total"])
+
+
+# Stock must balance: start + supplied - ordered + returned, no negative rows,
+# the maintained per-group totals must match Storage_House, and each
+# storage unit must match its available lots
+def consistency_report(start_units, recorder):
+    end_units = total_units()
+    expected = start_units + recorder.units["supplied"] - recorder.units["ordered"] + recorder.units["returned"]
+    negative = execute_query("SELECT COUNT(*) AS n FROM Storage_House WHERE Quantity < 0", fetch=True)[0]["n"]
+    with transaction("load_test_check") as tx:
+        drift = check_consistency(tx)
+        lot_drift = check_storage(tx)
+    violations = int(end_units != expected) + int(negative) + len(drift) + len(lot_drift)
+    return {
+        "start_units": start_units,
+        "end_units": end_units,
+        "expected_end_units": expected,
+        "negative_rows": int(negative),
+        "availability_drift": [dict(row) for row in drift],
+        "lot_drift": [dict(row) for row in lot_drift],
+        "violations": violations,
+    }
+
+
+def run_load_test(users, duration, max_ops=None, mix=None, use_cache=False, seed_value=1):
+    mix = mix or DEFAULT_MIX
+    run_tag = format(int(time.time() * 1000) % 36 ** 6, "x")
+    n_hospitals = execute_query("SELECT COUNT(*) AS n FROM Hospital", fetch=True)[0]["n"]
+    if not n_hospitals:
+        raise SystemExit("no hospitals found; seed the database first (--seed-scale)")
+
+    recorder = Recorder()
+    start_units = total_units()
+    database.pool_waits.clear()
+    deadline = time.monotonic() + duration
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        for user_id in range(users):
+            user = SimulatedUser(user_id, run_tag, n_hospitals, recorder, use_cache,
+                                 random.Random(seed_value * 1000 + user_id))
+            executor.submit(user.run, mix, deadline, max_ops)
+
+    elapsed = time.perf_counter() - started
+    total_ops = sum(len(samples) for samples in recorder.latencies.values())
+    return {
+        "backend": database.backend.dialect,
+        "users": users,
+        "duration_s": elapsed,
+        "throughput_ops_s": total_ops / elapsed if elapsed else 0.0,
+        "operations": {
+            action: dict(percentiles(samples), errors=recorder.errors[action])
+            for action, samples in sorted(recorder.latencies.items())
+        },
+        "pool_wait": percentiles(list(database.pool_waits)),
+        "units": dict(recorder.units),
+        "consistency": consistency_report(start_units, recorder),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the app's workflows with concurrent simulated users")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--ops", type=int, help="stop each user after this many actions")
+    parser.add_argument("--seed-scale", type=int,
+                        help="seed the configured (empty) database with this many donors/orders first")
+    parser.add_argument("--cache", action="store_true", help="route dashboard reads through the query cache")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    ensure_migrated()
+    if args.seed_scale:
+        conn = database.get_connection()
+        try:
+            seed(conn, args.seed_scale)
+        finally:
+            conn.close()
+        print(f"seeded tables: {table_sizes(args.seed_scale)}")
+
+    results = run_load_test(args.users, args.duration, args.ops, use_cache=args.cache)
+    print(f"{results['backend']}: {results['users']} users, {results['throughput_ops_s']:.1f} ops/s")
+    for action, stats in results["operations"].items():
+        print(f"  {action:<14} n={stats['count']:<6} p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms "
+              f"p99={stats['p99_ms']:.2f}ms errors={stats['errors']}")
+    wait = results["pool_wait"]
+    if wait["count"]:
+        print(f"  pool wait      p50={wait['p50_ms']:.2f}ms p95={wait['p95_ms']:.2f}ms p99={wait['p99_ms']:.2f}ms")
+    print(f"  consistency violations: {results['consistency']['violations']}")
+
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(results, out, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
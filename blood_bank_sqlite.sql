@@ -0,0 +1,104 @@
+-- SQLite translation of blood_bank.sql for local and offline deployments.
+-- ENUM columns become CHECK constraints and REGEXP checks become GLOB.
+-- SQLite has no stored procedures; Place_Order's logic lives in
+-- order_engine.place_order, which both backends use.
+
+PRAGMA foreign_keys = ON;
+
+-- Create Employee table
+CREATE TABLE IF NOT EXISTS Employee (
+    Emp_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Emp_name VARCHAR(100) NOT NULL,
+    Email VARCHAR(100) UNIQUE NOT NULL,
+    Salary DECIMAL(10,2) NOT NULL,
+    Designation VARCHAR(50) NOT NULL,
+    Joining_date DATE NOT NULL,
+    BB_contact VARCHAR(15) NOT NULL,
+    BB_id INT NOT NULL,
+    BB_address VARCHAR(255) NOT NULL,
+    CONSTRAINT chk_employee_contact CHECK (length(BB_contact) = 10 AND BB_contact NOT GLOB '*[^0-9]*')
+);
+
+-- Create Donor table
+CREATE TABLE IF NOT EXISTS Donor (
+    Dona_id VARCHAR(20) PRIMARY KEY,
+    Dona_name VARCHAR(100) NOT NULL,
+    Blood_grp VARCHAR(3) NOT NULL CHECK (Blood_grp IN ('A+', 'A-', 'B+', 'B-', 'O+', 'O-', 'AB+', 'AB-')),
+    Dona_contact VARCHAR(15) NOT NULL,
+    CONSTRAINT chk_donor_contact CHECK (length(Dona_contact) = 10 AND Dona_contact NOT GLOB '*[^0-9]*')
+);
+
+-- Create Hospital table
+CREATE TABLE IF NOT EXISTS Hospital (
+    Hosp_id VARCHAR(20) PRIMARY KEY,
+    Hosp_name VARCHAR(100) NOT NULL,
+    Location VARCHAR(255) NOT NULL
+);
+
+-- Create Storage_House table
+CREATE TABLE IF NOT EXISTS Storage_House (
+    Storage_id VARCHAR(20) PRIMARY KEY,
+    Blood_grp VARCHAR(3) NOT NULL CHECK (Blood_grp IN ('A+', 'A-', 'B+', 'B-', 'O+', 'O-', 'AB+', 'AB-')),
+    Quantity INT NOT NULL DEFAULT 0,
+    CONSTRAINT chk_quantity CHECK (Quantity >= 0)
+);
+
+-- Create Orders table
+CREATE TABLE IF NOT EXISTS Orders (
+    Order_id VARCHAR(20) PRIMARY KEY,
+    Hosp_id VARCHAR(20) NOT NULL,
+    Blood_grp VARCHAR(3) NOT NULL CHECK (Blood_grp IN ('A+', 'A-', 'B+', 'B-', 'O+', 'O-', 'AB+', 'AB-')),
+    Quantity INT NOT NULL,
+    Order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    Status VARCHAR(10) DEFAULT 'Pending' CHECK (Status IN ('Pending', 'Fulfilled', 'Cancelled')),
+    CONSTRAINT chk_order_quantity CHECK (Quantity > 0),
+    FOREIGN KEY (Hosp_id) REFERENCES Hospital(Hosp_id)
+);
+
+-- Create Supply table
+CREATE TABLE IF NOT EXISTS Supply (
+    Supply_id VARCHAR(20) PRIMARY KEY,
+    Hosp_id VARCHAR(20) NOT NULL,
+    Blood_grp VARCHAR(3) NOT NULL CHECK (Blood_grp IN ('A+', 'A-', 'B+', 'B-', 'O+', 'O-', 'AB+', 'AB-')),
+    Quantity INT NOT NULL,
+    Supply_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT chk_supply_quantity CHECK (Quantity > 0),
+    FOREIGN KEY (Hosp_id) REFERENCES Hospital(Hosp_id)
+);
+
+-- Create Blood_Test table
+CREATE TABLE IF NOT EXISTS Blood_Test (
+    Test_id VARCHAR(20) PRIMARY KEY,
+    Dona_id VARCHAR(20) NOT NULL,
+    Test_date DATE NOT NULL,
+    Hb_level DECIMAL(4,2) NOT NULL,
+    Blood_pressure VARCHAR(10) NOT NULL,
+    Result VARCHAR(10) NOT NULL CHECK (Result IN ('Suitable', 'Unsuitable')),
+    FOREIGN KEY (Dona_id) REFERENCES Donor(Dona_id)
+);
+
+-- Create views
+CREATE VIEW IF NOT EXISTS Available_Blood AS
+SELECT Blood_grp, SUM(Quantity) AS Total_Units
+FROM Storage_House
+GROUP BY Blood_grp;
+
+CREATE VIEW IF NOT EXISTS Donor_Information AS
+SELECT d.Dona_id, d.Dona_name, d.Blood_grp, d.Dona_contact,
+       COUNT(t.Test_id) AS Tests_Taken,
+       SUM(CASE WHEN t.Result = 'Suitable' THEN 1 ELSE 0 END) AS Suitable_Donations
+FROM Donor d
+LEFT JOIN Blood_Test t ON d.Dona_id = t.Dona_id
+GROUP BY d.Dona_id, d.Dona_name, d.Blood_grp, d.Dona_contact;
+
+-- Trigger
+DELIMITER //
+CREATE TRIGGER IF NOT EXISTS after_supply_insert
+AFTER INSERT ON Supply
+FOR EACH ROW
+BEGIN
+    INSERT INTO Storage_House (Storage_id, Blood_grp, Quantity)
+    VALUES ('SUP' || NEW.Supply_id, NEW.Blood_grp, NEW.Quantity)
+    ON CONFLICT (Storage_id) DO UPDATE SET Quantity = Quantity + NEW.Quantity;
+END //
+DELIMITER ;
@@ -0,0 +1,263 @@
+import argparse
+import time
+
+import pandas as pd
+
+from database import DatabaseError, transaction
+from lots import lock_groups
+from validation import BLOOD_GROUPS, CONTACT_PATTERN, ID_PATTERN
+
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_BATCH_SIZE = 1000
+
+# Column layout and load statement for each importable entity.
+# "on_duplicate" is appended after the multi-row VALUES list; None means
+# rows whose key already exists are rejected instead of merged, unless
+# "append_only" says each row is a new record that may share its key.
+ENTITIES = {
+    "donors": {
+        "table": "Donor",
+        "key": "Dona_id",
+        "columns": ["Dona_id", "Dona_name", "Blood_grp", "Dona_contact"],
+        "ids": ["Dona_id"],
+        "contacts": ["Dona_contact"],
+        "on_duplicate": "Dona_name = VALUES(Dona_name), Blood_grp = VALUES(Blood_grp), "
+                        "Dona_contact = VALUES(Dona_contact)",
+    },
+    "hospitals": {
+        "table": "Hospital",
+        "key": "Hosp_id",
+        "columns": ["Hosp_id", "Hosp_name", "Location"],
+        "ids": ["Hosp_id"],
+        "contacts": [],
+        "on_duplicate": "Hosp_name = VALUES(Hosp_name), Location = VALUES(Location)",
+    },
+    # Each row is a new lot collected today; triggers add it to Storage_House.
+    # A lot must match its storage unit's group ("unit_group").
+    "inventory": {
+        "table": "Blood_Lot",
+        "key": "Storage_id",
+        "columns": ["Storage_id", "Blood_grp", "Quantity"],
+        "ids": ["Storage_id"],
+        "contacts": [],
+        "on_duplicate": None,
+        "append_only": True,
+        "unit_group": True,
+    },
+    "supply": {
+        "table": "Supply",
+        "key": "Supply_id",
+        "columns": ["Supply_id", "Hosp_id", "Blood_grp", "Quantity"],
+        "ids": ["Supply_id", "Hosp_id"],
+        "contacts": [],
+        "on_duplicate": None,
+    },
+}
+
+
+class ImportReport:
+    def __init__(self, entity):
+        self.entity = entity
+        self.total = 0
+        self.loaded = 0
+        self.chunks = 0
+        self.duration_s = 0.0
+        self._rejections = []
+
+    def reject(self, rows, keys, reasons):
+        self._rejections.append(pd.DataFrame({"Row": rows, "Key": keys, "Reason": reasons}))
+
+    @property
+    def rejected(self):
+        return sum(len(frame) for frame in self._rejections)
+
+    # Per-row rejection report, ordered by source row number
+    def rejections(self):
+        if not self._rejections:
+            return pd.DataFrame(columns=["Row", "Key", "Reason"])
+        return pd.concat(self._rejections, ignore_index=True).sort_values("Row", ignore_index=True)
+
+    def summary(self):
+        rate = self.total / self.duration_s if self.duration_s else 0.0
+        return (f"{self.entity}: {self.loaded} loaded, {self.rejected} rejected of {self.total} rows "
+                f"in {self.duration_s:.2f}s ({rate:,.0f} rows/s)")
+
+
+# Yield DataFrames of string cells; chunk row labels are source line numbers
+def read_chunks(source, chunksize=DEFAULT_CHUNK_SIZE, filename=None):
+    name = (filename or getattr(source, "name", None) or str(source)).lower()
+    if name.endswith((".xlsx", ".xlsm")):
+        chunks = _read_excel_chunks(source, chunksize)
+    else:
+        chunks = pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunksize)
+
+    next_line = 2  # line 1 is the header
+    for chunk in chunks:
+        chunk.index = range(next_line, next_line + len(chunk))
+        next_line += len(chunk)
+        yield chunk
+
+
+def _read_excel_chunks(source, chunksize):
+    # openpyxl is only needed for spreadsheet uploads
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+        batch = []
+        for row in rows:
+            batch.append(["" if cell is None else str(cell) for cell in row])
+            if len(batch) == chunksize:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+# Vectorized form of the single-row form checks; returns a reason per row ("" if valid).
+# seen_keys holds the keys loaded by earlier chunks and is not changed here.
+def validate_chunk(chunk, spec, seen_keys):
+    reasons = pd.Series("", index=chunk.index)
+
+    def flag(mask, reason):
+        reasons[mask & (reasons == "")] = reason
+
+    missing_columns = [col for col in spec["columns"] if col not in chunk.columns]
+    if missing_columns:
+        reasons[:] = f"missing column(s): {', '.join(missing_columns)}"
+        return reasons
+
+    for col in spec["columns"]:
+        chunk[col] = chunk[col].astype(str).str.strip()
+        flag(chunk[col] == "", f"{col} is required")
+
+    for col in spec["ids"]:
+        flag(~chunk[col].str.match(ID_PATTERN), f"invalid {col} (letters and numbers only)")
+
+    for col in spec["contacts"]:
+        flag(~chunk[col].str.match(CONTACT_PATTERN), f"invalid {col} (10 digits)")
+
+    if "Blood_grp" in chunk.columns:
+        chunk["Blood_grp"] = chunk["Blood_grp"].str.upper()
+        flag(~chunk["Blood_grp"].isin(BLOOD_GROUPS), "invalid Blood_grp")
+
+    if "Quantity" in spec["columns"]:
+        quantity = pd.to_numeric(chunk["Quantity"], errors="coerce")
+        flag(~((quantity > 0) & (quantity % 1 == 0)), "Quantity must be a positive whole number")
+        chunk["Quantity"] = quantity.fillna(0).astype("int64")
+
+    # Only keys that passed the checks above, or were loaded by an earlier
+    # chunk, make a later row a duplicate
+    if not spec.get("append_only"):
+        key = chunk[spec["key"]].where(reasons == "")
+        flag((key.notna() & key.duplicated()) | key.isin(seen_keys), f"duplicate {spec['key']} in file")
+    return reasons
+
+
+# Reject rows that conflict with existing data: unknown hospitals, or keys
+# that already exist for entities that are not merged on duplicate
+def check_references(tx, chunk, spec, reasons):
+    valid = chunk[reasons == ""]
+    if valid.empty:
+        return
+
+    checks = []
+    if "Hosp_id" in spec["columns"] and spec["table"] != "Hospital":
+        checks.append(("Hospital", "Hosp_id", False, "unknown Hosp_id"))
+    if spec["on_duplicate"] is None and not spec.get("append_only"):
+        checks.append((spec["table"], spec["key"], True, f"{spec['key']} already exists"))
+
+    for table, col, reject_if_found, reason in checks:
+        values = valid[col].unique().tolist()
+        placeholders = ", ".join(["%s"] * len(values))
+        found = {row[col] for row in tx.fetchall(
+            f"SELECT {col} FROM {table} WHERE {col} IN ({placeholders})", values)}
+        mask = valid[col].isin(found)
+        bad = valid.index[mask if reject_if_found else ~mask]
+        reasons[bad.intersection(reasons.index[reasons == ""])] = reason
+
+    # Storage units keep one group: the existing unit's, or for a new unit
+    # the group of its first row in the chunk
+    if spec.get("unit_group"):
+        values = valid["Storage_id"].unique().tolist()
+        placeholders = ", ".join(["%s"] * len(values))
+        groups = valid.groupby("Storage_id", sort=False)["Blood_grp"].first().to_dict()
+        groups.update({row["Storage_id"]: row["Blood_grp"] for row in tx.fetchall(
+            f"SELECT Storage_id, Blood_grp FROM Storage_House WHERE Storage_id IN ({placeholders})", values)})
+        bad = valid.index[valid["Blood_grp"] != valid["Storage_id"].map(groups)]
+        reasons[bad.intersection(reasons.index[reasons == ""])] = "Blood_grp does not match the storage unit's group"
+
+
+def build_insert(spec, n_rows):
+    columns = ", ".join(spec["columns"])
+    row = "(" + ", ".join(["%s"] * len(spec["columns"])) + ")"
+    query = f"INSERT INTO {spec['table']} ({columns}) VALUES " + ", ".join([row] * n_rows)
+    if spec["on_duplicate"]:
+        query += f" ON DUPLICATE KEY UPDATE {spec['on_duplicate']}"
+    return query
+
+
+# Stream a CSV/XLSX file into the database: one transaction per chunk, one
+# multi-row INSERT per batch, and a savepoint per batch so a failing batch
+# is rejected without losing the rest of the chunk
+def import_file(source, entity, chunksize=DEFAULT_CHUNK_SIZE, batch_size=DEFAULT_BATCH_SIZE, filename=None):
+    spec = ENTITIES[entity]
+    report = ImportReport(entity)
+    seen_keys = set()
+    started = time.perf_counter()
+
+    for chunk in read_chunks(source, chunksize, filename):
+        report.total += len(chunk)
+        report.chunks += 1
+        reasons = validate_chunk(chunk, spec, seen_keys)
+
+        with transaction(f"bulk_import:{entity}") as tx:
+            check_references(tx, chunk, spec, reasons)
+            valid = chunk.loc[reasons == "", spec["columns"]]
+            if spec.get("unit_group"):
+                lock_groups(tx, valid["Blood_grp"].unique().tolist())
+
+            for start in range(0, len(valid), batch_size):
+                batch = valid.iloc[start:start + batch_size]
+                values = [v.item() if hasattr(v, "item") else v for v in batch.to_numpy().ravel()]
+                try:
+                    with tx.savepoint():
+                        tx.execute(build_insert(spec, len(batch)), values)
+                    report.loaded += len(batch)
+                except DatabaseError as err:
+                    reasons[batch.index] = f"database error: {getattr(err, 'msg', err)}"
+
+        # The chunk is committed; its loaded keys now count as seen
+        if not spec.get("append_only"):
+            seen_keys.update(chunk.loc[reasons == "", spec["key"]])
+
+        bad = reasons[reasons != ""]
+        if not bad.empty:
+            keys = chunk.loc[bad.index, spec["key"]] if spec["key"] in chunk.columns else ""
+            report.reject(bad.index, keys, bad.values)
+
+    report.duration_s = time.perf_counter() - started
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import donors, hospitals, inventory or supply")
+    parser.add_argument("entity", choices=sorted(ENTITIES))
+    parser.add_argument("path", help="CSV or XLSX file with a header row")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--rejections", help="write the rejection report to this CSV file")
+    args = parser.parse_args()
+
+    report = import_file(args.path, args.entity, args.chunk_size, args.batch_size)
+    print(report.summary())
+    if args.rejections:
+        report.rejections().to_csv(args.rejections, index=False)
+
+
+if __name__ == "__main__":
+    main()
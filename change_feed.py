@@ -0,0 +1,275 @@
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+from database import DatabaseError, backend, transaction
+from query_cache import query_cache
+
+logger = logging.getLogger("blood_bank.change_feed")
+
+POLL_MS = int(os.environ.get("BB_FEED_POLL_MS", "1000"))
+# Events kept in Change_Event behind the newest one; older ones are pruned
+RETAIN_EVENTS = int(os.environ.get("BB_FEED_RETAIN", "100000"))
+POLL_LIMIT = 1000
+# Longest wait between polls while the database keeps failing
+MAX_BACKOFF_S = 30
+# MySQL hands out AUTO_INCREMENT ids before commit, so a lower id can become
+# visible after a higher one; a missing id is waited for this long (it may
+# also belong to a rolled-back insert)
+GAP_TIMEOUT = 5
+
+EVENT_COLUMNS = "Event_id, Table_name, Op, Row_id, Hosp_id, Blood_grp, Quantity, Delta, Status, Event_time"
+
+
+# In-process publish/subscribe shared by every Streamlit session
+class PubSub:
+    def __init__(self):
+        self._subscribers = defaultdict(list)
+        self._lock = threading.Lock()
+
+    # Call fn(events) for each batch published on topic; returns an unsubscribe function
+    def subscribe(self, topic, fn):
+        with self._lock:
+            self._subscribers[topic].append(fn)
+        return lambda: self._unsubscribe(topic, fn)
+
+    def _unsubscribe(self, topic, fn):
+        with self._lock:
+            if fn in self._subscribers[topic]:
+                self._subscribers[topic].remove(fn)
+
+    def publish(self, topic, events):
+        with self._lock:
+            subscribers = list(self._subscribers[topic]) + list(self._subscribers["*"])
+        for fn in subscribers:
+            try:
+                fn(events)
+            except Exception:
+                logger.exception("change feed subscriber failed on %s", topic)
+
+
+# Background poller reading Change_Event rows after the last one seen and
+# publishing them per table
+class ChangeFeed:
+    def __init__(self, poll_ms=POLL_MS):
+        self.poll_ms = poll_ms
+        self.pubsub = PubSub()
+        self.low_water = None
+        self.polls = 0
+        self.delivered = 0
+        self.failures = 0
+        self._seen = set()
+        self._missing_since = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, from_id=None):
+        if self._thread is None or not self._thread.is_alive():
+            self.low_water = self.latest_id() if from_id is None else from_id
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    @staticmethod
+    def latest_id():
+        with transaction("feed_latest", db=backend) as tx:
+            return int(tx.fetchone("SELECT COALESCE(MAX(Event_id), 0) AS id FROM Change_Event")["id"])
+
+    # Poll until stopped; after a failure, wait twice as long before the
+    # next try (up to MAX_BACKOFF_S) and go back to poll_ms once one succeeds
+    def _run(self):
+        last_prune = time.monotonic()
+        delay = self.poll_ms / 1000
+        while not self._stop.wait(delay):
+            try:
+                self.poll()
+                if time.monotonic() - last_prune > 60:
+                    self.prune()
+                    last_prune = time.monotonic()
+                delay = self.poll_ms / 1000
+            except DatabaseError as err:
+                self.failures += 1
+                delay = min(delay * 2, MAX_BACKOFF_S)
+                logger.warning("change feed poll failed, retrying in %.1fs: %s", delay, err)
+
+    # Read new events once and publish them; returns how many were delivered
+    def poll(self):
+        with transaction("feed_poll", db=backend) as tx:
+            rows = tx.fetchall(
+                f"SELECT {EVENT_COLUMNS} FROM Change_Event WHERE Event_id > %s ORDER BY Event_id LIMIT {POLL_LIMIT}",
+                (self.low_water,))
+        self.polls += 1
+        fresh = [row for row in rows if row["Event_id"] not in self._seen]
+        self._seen.update(row["Event_id"] for row in fresh)
+        self._advance()
+
+        by_table = defaultdict(list)
+        for row in fresh:
+            by_table[row["Table_name"]].append(row)
+        for table, events in by_table.items():
+            # Other processes' writes invalidate this process's cache too
+            query_cache.invalidate(table)
+            self.pubsub.publish(table, events)
+        self.delivered += len(fresh)
+        return len(fresh)
+
+    # Move the low-water mark over ids seen so far, skipping gaps that
+    # stayed empty for GAP_TIMEOUT
+    def _advance(self):
+        now = time.monotonic()
+        while self._seen:
+            next_id = self.low_water + 1
+            if next_id in self._seen:
+                self._seen.discard(next_id)
+                self._missing_since.pop(next_id, None)
+                self.low_water = next_id
+            elif now - self._missing_since.setdefault(next_id, now) > GAP_TIMEOUT:
+                self._missing_since.pop(next_id)
+                self.low_water = next_id
+            else:
+                break
+
+    def stats(self):
+        return {"low_water": self.low_water, "polls": self.polls, "delivered": self.delivered,
+                "failures": self.failures, "waiting_on_gaps": len(self._missing_since)}
+
+    def prune(self):
+        with transaction("feed_prune", db=backend) as tx:
+            return tx.execute("DELETE FROM Change_Event WHERE Event_id < %s", (self.low_water - RETAIN_EVENTS,))
+
+
+# Dashboard data held in memory: loaded once from a consistent snapshot,
+# then kept current by applying change feed events
+class LiveDashboard:
+    def __init__(self, recent=3):
+        self.availability = {}
+        self.pending = {}
+        self.recent_orders = deque(maxlen=recent)
+        self.recent_supply = deque(maxlen=recent)
+        self.hospitals = {}
+        self.version = 0
+        self._lock = threading.Lock()
+
+    # Returns the event id the snapshot is consistent with
+    def load(self):
+        with transaction("dashboard_snapshot", db=backend) as tx:
+            last_id = tx.fetchone("SELECT COALESCE(MAX(Event_id), 0) AS id FROM Change_Event")["id"]
+            availability = tx.fetchall("SELECT Blood_grp, Total_Units FROM Blood_Availability")
+            pending = tx.fetchall("SELECT Order_id, Hosp_id, Blood_grp, Quantity, Order_date "
+                                  "FROM Orders WHERE Status = 'Pending'")
+            orders = tx.fetchall("SELECT Order_id, Blood_grp, Quantity, Order_date FROM Orders "
+                                 "ORDER BY Order_date DESC LIMIT %s", (self.recent_orders.maxlen,))
+            supply = tx.fetchall("SELECT Supply_id, Blood_grp, Quantity, Supply_date FROM Supply "
+                                 "ORDER BY Supply_date DESC LIMIT %s", (self.recent_supply.maxlen,))
+            hospitals = tx.fetchall("SELECT Hosp_id, Hosp_name FROM Hospital")
+        with self._lock:
+            self.availability = {row["Blood_grp"]: int(row["Total_Units"]) for row in availability}
+            self.pending = {row["Order_id"]: row for row in pending}
+            self.recent_orders.clear()
+            self.recent_orders.extend(
+                {"Type": "Order", "ID": r["Order_id"], "Blood_grp": r["Blood_grp"],
+                 "Quantity": r["Quantity"], "Date": r["Order_date"]} for r in orders)
+            self.recent_supply.clear()
+            self.recent_supply.extend(
+                {"Type": "Supply", "ID": r["Supply_id"], "Blood_grp": r["Blood_grp"],
+                 "Quantity": r["Quantity"], "Date": r["Supply_date"]} for r in supply)
+            self.hospitals = {row["Hosp_id"]: row["Hosp_name"] for row in hospitals}
+            self.version += 1
+        return int(last_id)
+
+    def apply_storage(self, events):
+        with self._lock:
+            for event in events:
+                group = event["Blood_grp"]
+                self.availability[group] = self.availability.get(group, 0) + int(event["Delta"] or 0)
+            self.version += 1
+
+    def apply_orders(self, events):
+        with self._lock:
+            for event in events:
+                order_id = event["Row_id"]
+                if event["Op"] != "D" and event["Status"] == "Pending":
+                    self.pending[order_id] = {
+                        "Order_id": order_id, "Hosp_id": event["Hosp_id"], "Blood_grp": event["Blood_grp"],
+                        "Quantity": event["Quantity"], "Order_date": event["Event_time"],
+                    }
+                else:
+                    self.pending.pop(order_id, None)
+                if event["Op"] == "I":
+                    self.recent_orders.appendleft({"Type": "Order", "ID": order_id, "Blood_grp": event["Blood_grp"],
+                                                   "Quantity": event["Quantity"], "Date": event["Event_time"]})
+            self.version += 1
+
+    def apply_supply(self, events):
+        with self._lock:
+            for event in events:
+                self.recent_supply.appendleft({"Type": "Supply", "ID": event["Row_id"], "Blood_grp": event["Blood_grp"],
+                                               "Quantity": event["Quantity"], "Date": event["Event_time"]})
+            self.version += 1
+
+    def availability_rows(self):
+        with self._lock:
+            rows = [{"Blood_grp": group, "Total_Units": units} for group, units in self.availability.items()]
+        return sorted(rows, key=lambda row: row["Total_Units"], reverse=True)
+
+    def pending_rows(self, limit=5):
+        with self._lock:
+            pending = sorted(self.pending.values(), key=lambda row: str(row["Order_date"]), reverse=True)[:limit]
+            missing = {row["Hosp_id"] for row in pending} - self.hospitals.keys()
+        if missing:
+            # Names are cosmetic: if they cannot be read, ids are shown
+            try:
+                self._load_hospitals(missing)
+            except DatabaseError as err:
+                logger.warning("could not load hospital names: %s", err)
+        return [{"Order_id": row["Order_id"], "Hosp_name": self.hospitals.get(row["Hosp_id"], row["Hosp_id"]),
+                 "Blood_grp": row["Blood_grp"], "Quantity": row["Quantity"]} for row in pending]
+
+    def pending_count(self):
+        return len(self.pending)
+
+    def activity_rows(self):
+        with self._lock:
+            rows = list(self.recent_orders) + list(self.recent_supply)
+        return sorted(rows, key=lambda row: str(row["Date"]), reverse=True)
+
+    def _load_hospitals(self, hosp_ids):
+        ids = sorted(hosp_ids)
+        with transaction("dashboard_hospitals", db=backend) as tx:
+            rows = tx.fetchall(
+                f"SELECT Hosp_id, Hosp_name FROM Hospital WHERE Hosp_id IN ({', '.join(['%s'] * len(ids))})", ids)
+        with self._lock:
+            self.hospitals.update((row["Hosp_id"], row["Hosp_name"]) for row in rows)
+
+
+_feed = None
+_dashboard = None
+_lock = threading.Lock()
+
+
+# The process-wide feed and live dashboard, started on first use
+def get_live_dashboard():
+    global _feed, _dashboard
+    with _lock:
+        if _dashboard is None:
+            dashboard = LiveDashboard()
+            feed = ChangeFeed()
+            feed.pubsub.subscribe("Storage_House", dashboard.apply_storage)
+            feed.pubsub.subscribe("Orders", dashboard.apply_orders)
+            feed.pubsub.subscribe("Supply", dashboard.apply_supply)
+            feed.start(from_id=dashboard.load())
+            _feed, _dashboard = feed, dashboard
+    return _dashboard
+
+
+def get_feed():
+    get_live_dashboard()
+    return _feed
@@ -0,0 +1,231 @@
+import contextvars
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import streamlit as st
+
+import instrumentation
+from backends import create_backend
+from query_cache import query_cache
+
+logger = logging.getLogger("blood_bank.db")
+
+# MySQL or SQLite, chosen by BB_DB_BACKEND; connections are pooled per process
+backend = create_backend()
+DatabaseError = backend.Error
+
+# Backend of the site the current page works on, set by use_backend; None
+# means this process's home database. Background threads always start at None.
+_page_backend = contextvars.ContextVar("page_backend", default=None)
+
+
+def current_backend():
+    return _page_backend.get() or backend
+
+
+# Send the rest of this page's queries to db (another site's backend)
+def use_backend(db):
+    _page_backend.set(None if db is backend else db)
+
+
+# Queries inside go to the home database unless the page calls use_backend
+@contextmanager
+def page_scope():
+    token = _page_backend.set(None)
+    try:
+        yield
+    finally:
+        _page_backend.reset(token)
+
+
+# Pool checkout waits in ms, newest last
+pool_waits = deque(maxlen=10000)
+
+
+# Check out a pooled connection, from db if given (another site's backend),
+# else from the current page's site; returns it with the wait in ms
+def checkout(db=None):
+    started = time.perf_counter()
+    conn = (db or current_backend()).get_connection()
+    wait_ms = (time.perf_counter() - started) * 1000
+    pool_waits.append(wait_ms)
+    return conn, wait_ms
+
+
+def get_connection():
+    return checkout()[0]
+
+
+# Run one statement on a cursor and report it to the profiler
+def timed_execute(cursor, query, values=None, fetch=False, many=False, pool_wait_ms=None):
+    started = time.perf_counter()
+    try:
+        if many:
+            cursor.executemany(query, values)
+        else:
+            cursor.execute(query, values)
+        result = cursor.fetchall() if fetch else cursor.rowcount
+    except Exception as err:
+        instrumentation.record(query, (time.perf_counter() - started) * 1000,
+                               pool_wait_ms=pool_wait_ms, error=err)
+        raise
+    rows = len(result) if fetch else result
+    instrumentation.record(query, (time.perf_counter() - started) * 1000, rows, pool_wait_ms)
+    return result
+
+
+# Timings of the most recent transactions, newest last
+recent_transactions = deque(maxlen=200)
+
+
+# One unit of work on a single pooled connection
+class Transaction:
+    def __init__(self, conn, name=None, pool_wait_ms=None):
+        self.conn = conn
+        self.name = name
+        self.statements = 0
+        self.duration_ms = None
+        self.pool_wait_ms = pool_wait_ms
+        self._savepoints = 0
+
+    def _run(self, query, values, fetch=False, many=False, dictionary=True):
+        cursor = self.conn.cursor(dictionary=dictionary)
+        try:
+            # The checkout wait is charged to the first statement only
+            wait = self.pool_wait_ms if self.statements == 0 else None
+            result = timed_execute(cursor, query, values, fetch, many, wait)
+            self.statements += 1
+            return result
+        finally:
+            cursor.close()
+
+    def execute(self, query, values=None):
+        return self._run(query, values)
+
+    def executemany(self, query, rows):
+        rows = list(rows)
+        if not rows:
+            return 0
+        return self._run(query, rows, many=True, dictionary=False)
+
+    def fetchall(self, query, values=None):
+        return self._run(query, values, fetch=True)
+
+    def fetchone(self, query, values=None):
+        rows = self.fetchall(query, values)
+        return rows[0] if rows else None
+
+    # Roll back only the statements inside the block if it raises
+    @contextmanager
+    def savepoint(self):
+        self._savepoints += 1
+        name = f"sp_{self._savepoints}"
+        self.execute(f"SAVEPOINT {name}")
+        try:
+            yield name
+        except Exception:
+            self.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            raise
+        else:
+            self.execute(f"RELEASE SAVEPOINT {name}")
+
+
+# Hold one pooled connection for a whole workflow and commit once at the end
+@contextmanager
+def transaction(name=None, db=None):
+    started = time.perf_counter()
+    conn, wait_ms = checkout(db)
+    tx = Transaction(conn, name, wait_ms)
+    committed = False
+    try:
+        conn.start_transaction()
+        yield tx
+        conn.commit()
+        committed = True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+        tx.duration_ms = (time.perf_counter() - started) * 1000
+        recent_transactions.append({
+            "name": name,
+            "statements": tx.statements,
+            "duration_ms": tx.duration_ms,
+            "committed": committed,
+        })
+        logger.debug("transaction %s: %d statements in %.1f ms (%s)",
+                     name or "-", tx.statements, tx.duration_ms,
+                     "committed" if committed else "rolled back")
+
+
+# Run fn(tx) in a transaction, reporting database errors the same way as execute_query
+def run_transaction(fn, name=None, db=None):
+    try:
+        with transaction(name, db) as tx:
+            return fn(tx)
+    except DatabaseError as err:
+        st.error(f"Database error: {err}")
+        return None
+
+
+# Function to execute queries with better error handling
+def execute_query(query, values=None, fetch=False, db=None):
+    conn = None
+    cursor = None
+    try:
+        if not fetch:
+            with transaction(db=db) as tx:
+                tx.execute(query, values)
+            return True
+
+        conn, wait_ms = checkout(db)
+        cursor = conn.cursor(dictionary=True)
+        return timed_execute(cursor, query, values or None, fetch=True, pool_wait_ms=wait_ms)
+
+    except DatabaseError as err:
+        st.error(f"Database error: {err}")
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+# Read-through cached SELECT shared across sessions; writes call query_cache.invalidate.
+# Results from other sites are cached apart from the home database's.
+def cached_query(query, values=None, ttl=None, db=None):
+    db = db or current_backend()
+    key = query_cache.make_key(query, values, scope=None if db is backend else id(db))
+    result = query_cache.get(key)
+    if result is None:
+        result = execute_query(query, values, fetch=True, db=db)
+        if result is not None:
+            query_cache.put(key, result, ttl=ttl)
+    return result
+
+
+# Yield (column names, rows) chunks from an unbuffered cursor so a large
+# result never sits in memory at once; the connection is held until the
+# generator is exhausted or closed
+def stream_query(query, values=None, chunk_size=10000, db=None):
+    started = time.perf_counter()
+    conn, wait_ms = checkout(db)
+    cursor = conn.cursor(buffered=False)
+    rows = 0
+    try:
+        cursor.execute(query, values or None)
+        columns = [col[0] for col in cursor.description]
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                break
+            rows += len(chunk)
+            yield columns, chunk
+    finally:
+        cursor.close()
+        conn.close()
+        instrumentation.record(query, (time.perf_counter() - started) * 1000, rows, wait_ms)
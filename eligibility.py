@@ -0,0 +1,143 @@
+import argparse
+from datetime import date, timedelta
+
+from query_cache import query_cache
+
+# Donor_Eligibility is maintained by triggers on Blood_Test and Donor
+query_cache.add_dependency("Blood_Test", "Donor_Eligibility")
+query_cache.add_dependency("Donor", "Donor_Eligibility")
+
+# Must match the interval in the 0007_donor_eligibility migration
+DONATION_INTERVAL_DAYS = 90
+DEFAULT_PAGE_SIZE = 50
+
+ELIGIBLE_FROM = {
+    "mysql": "Last_donation_date + INTERVAL 90 DAY",
+    "sqlite": "date(Last_donation_date, '+90 days')",
+}
+
+CAMPAIGN_COLUMNS = """
+    e.Dona_id, d.Dona_name, d.Dona_contact, e.Blood_grp, e.Last_donation_date, e.Last_test_date,
+    e.Last_hb, e.Donations, e.Eligible_from
+"""
+
+REBUILD_QUERY = """
+    INSERT INTO Donor_Eligibility (Dona_id, Blood_grp, Tests_taken, Donations, Last_test_id, Last_test_date,
+                                   Last_result, Last_hb, Last_donation_date)
+    SELECT d.Dona_id, d.Blood_grp, COALESCE(s.Tests, 0), COALESCE(s.Donations, 0),
+           l.Test_id, l.Test_date, l.Result, l.Hb_level, s.Last_donation
+    FROM Donor d
+    LEFT JOIN (SELECT Dona_id, COUNT(*) AS Tests, SUM(Result = 'Suitable') AS Donations,
+                      MAX(CASE WHEN Result = 'Suitable' THEN Test_date END) AS Last_donation
+               FROM Blood_Test GROUP BY Dona_id) s ON s.Dona_id = d.Dona_id
+    LEFT JOIN (SELECT Dona_id, Test_id, Test_date, Result, Hb_level,
+                      ROW_NUMBER() OVER (PARTITION BY Dona_id ORDER BY Test_date DESC, Test_id DESC) AS Recency
+               FROM Blood_Test) l ON l.Dona_id = d.Dona_id AND l.Recency = 1
+"""
+
+DRIFT_QUERY = """
+    SELECT d.Dona_id, COALESCE(e.Tests_taken, -1) AS Recorded_tests, COALESCE(s.Tests, 0) AS Actual_tests,
+           e.Last_donation_date AS Recorded_last_donation, s.Last_donation AS Actual_last_donation
+    FROM Donor d
+    LEFT JOIN Donor_Eligibility e ON e.Dona_id = d.Dona_id
+    LEFT JOIN (SELECT Dona_id, COUNT(*) AS Tests,
+                      MAX(CASE WHEN Result = 'Suitable' THEN Test_date END) AS Last_donation
+               FROM Blood_Test GROUP BY Dona_id) s ON s.Dona_id = d.Dona_id
+    WHERE e.Dona_id IS NULL OR e.Tests_taken <> COALESCE(s.Tests, 0)
+       OR (e.Last_donation_date IS NULL) <> (s.Last_donation IS NULL) OR e.Last_donation_date <> s.Last_donation
+"""
+
+
+# Latest Eligible_from that still satisfies "no donation in idle_days days";
+# never later than today, since donors inside the interval cannot give yet
+def eligible_cutoff(idle_days, today=None):
+    return (today or date.today()) - timedelta(days=max(0, idle_days - DONATION_INTERVAL_DAYS))
+
+
+# Campaign WHERE clause for one blood group. The index on (Blood_grp,
+# Last_result, Eligible_from, Dona_id) serves both the filter and the order.
+def campaign_filter(blood_grp, idle_days, min_hb=None, today=None):
+    clauses = ["e.Blood_grp = %s", "e.Last_result = 'Suitable'", "e.Eligible_from <= %s"]
+    params = [blood_grp, eligible_cutoff(idle_days, today)]
+    if min_hb is not None:
+        clauses.append("e.Last_hb >= %s")
+        params.append(min_hb)
+    return clauses, params
+
+
+# One group's slice of a campaign page: (sql, params) reading up to
+# page_size + 1 donors in index order past cursor (Eligible_from, Dona_id)
+def campaign_query(blood_grp, idle_days=DONATION_INTERVAL_DAYS, min_hb=None, cursor=None,
+                   page_size=DEFAULT_PAGE_SIZE, today=None):
+    clauses, params = campaign_filter(blood_grp, idle_days, min_hb, today)
+    if cursor is not None:
+        clauses.append("(e.Eligible_from > %s OR (e.Eligible_from = %s AND e.Dona_id > %s))")
+        params.extend([cursor[0], cursor[0], cursor[1]])
+    return (f"SELECT {CAMPAIGN_COLUMNS} FROM Donor_Eligibility e JOIN Donor d ON d.Dona_id = e.Dona_id "
+            f"WHERE {' AND '.join(clauses)} ORDER BY e.Eligible_from, e.Dona_id LIMIT {int(page_size) + 1}",
+            params)
+
+
+# One page of eligible donors, longest-waiting first, seeking past cursor
+# (Eligible_from, Dona_id). Each group is read in index order on its own and
+# the results merged, so several groups never need a sort over all matches.
+def campaign_page(tx, blood_groups, idle_days=DONATION_INTERVAL_DAYS, min_hb=None, cursor=None,
+                  page_size=DEFAULT_PAGE_SIZE, today=None):
+    rows = []
+    for blood_grp in blood_groups:
+        rows += tx.fetchall(*campaign_query(blood_grp, idle_days, min_hb, cursor, page_size, today))
+    rows.sort(key=lambda row: (row["Eligible_from"], row["Dona_id"]))
+    page = rows[:page_size]
+    next_cursor = (page[-1]["Eligible_from"], page[-1]["Dona_id"]) if len(rows) > page_size else None
+    return page, next_cursor
+
+
+# Eligible donors per blood group
+def campaign_counts(tx, blood_groups, idle_days=DONATION_INTERVAL_DAYS, min_hb=None, today=None):
+    counts = {}
+    for blood_grp in blood_groups:
+        clauses, params = campaign_filter(blood_grp, idle_days, min_hb, today)
+        counts[blood_grp] = tx.fetchone(
+            f"SELECT COUNT(*) AS n FROM Donor_Eligibility e WHERE {' AND '.join(clauses)}", params)["n"]
+    return counts
+
+
+# Donors whose summary row is missing or disagrees with Blood_Test
+def check_consistency(tx, limit=100):
+    return tx.fetchall(DRIFT_QUERY + f" LIMIT {int(limit)}")
+
+
+# Recompute every row from Blood_Test, e.g. after tests were edited or deleted
+def rebuild(tx, dialect):
+    tx.execute("DELETE FROM Donor_Eligibility")
+    tx.execute(REBUILD_QUERY)
+    tx.execute(f"UPDATE Donor_Eligibility SET Eligible_from = "
+               f"CASE WHEN Last_result = 'Suitable' THEN {ELIGIBLE_FROM[dialect]} END")
+    query_cache.invalidate("Donor_Eligibility")
+    return True
+
+
+def main():
+    from database import backend, transaction
+
+    parser = argparse.ArgumentParser(description="Check or rebuild the Donor_Eligibility summary")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    args = parser.parse_args()
+
+    with transaction(f"eligibility_{args.command}") as tx:
+        drift = check_consistency(tx)
+        for row in drift:
+            print(f"{row['Dona_id']}: recorded {row['Recorded_tests']} tests / last donation "
+                  f"{row['Recorded_last_donation']}, actual {row['Actual_tests']} / {row['Actual_last_donation']}")
+        if args.command == "rebuild":
+            rebuild(tx, backend.dialect)
+            print("Donor_Eligibility rebuilt")
+        elif not drift:
+            print("Donor_Eligibility is consistent")
+    # A failing check fails the calling script, e.g. CI
+    if drift and args.command == "check":
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from database import backend, transaction
+from validation import BLOOD_GROUPS
+
+HISTORY_DAYS = int(os.environ.get("BB_FORECAST_HISTORY_DAYS", "365"))
+HORIZONS = (7, 30)
+SHORT_WINDOW, LONG_WINDOW = 7, 28
+# Smoothing factors tried per series; the best one-step-ahead fit wins
+ALPHAS = np.array([0.05, 0.1, 0.2, 0.3, 0.5])
+
+# Daily unit totals kept per series: demand per hospital and group, and
+# incoming supply per group. Cancelled orders are not demand.
+SERIES = {
+    "demand": {"table": "Orders", "date": "Order_date", "keys": ["Hosp_id", "Blood_grp"],
+               "where": "Status <> 'Cancelled'"},
+    "supply": {"table": "Supply", "date": "Supply_date", "keys": ["Blood_grp"]},
+}
+
+
+# Units per key and day for one table of the home database, read
+# incrementally: each refresh re-reads only from the last day loaded, which
+# may have grown since
+class DailyHistory:
+    def __init__(self, spec, history_days=HISTORY_DAYS):
+        self.spec = spec
+        self.history_days = history_days
+        self.daily = pd.DataFrame(columns=spec["keys"] + ["Day", "Units", "Entries"])
+        self.loaded_until = None
+
+    # Drop everything loaded, so the next refresh re-reads the whole window
+    def reset(self):
+        self.daily = self.daily.iloc[0:0]
+        self.loaded_until = None
+
+    def refresh(self, today):
+        spec = self.spec
+        keys = ", ".join(spec["keys"])
+        start = self.loaded_until or today - timedelta(days=self.history_days)
+        where = f" AND {spec['where']}" if spec.get("where") else ""
+        with transaction(f"forecast_{spec['table']}", db=backend) as tx:
+            rows = tx.fetchall(
+                f"SELECT {keys}, DATE({spec['date']}) AS Day, SUM(Quantity) AS Units, COUNT(*) AS Entries "
+                f"FROM {spec['table']} WHERE {spec['date']} >= %s{where} GROUP BY {keys}, DATE({spec['date']})",
+                (start,))
+        fresh = pd.DataFrame(rows, columns=self.daily.columns)
+        fresh["Day"] = pd.to_datetime(fresh["Day"]).dt.date
+        cutoff = today - timedelta(days=self.history_days)
+        kept = self.daily[(self.daily["Day"] < start) & (self.daily["Day"] >= cutoff)]
+        self.daily = pd.concat([kept, fresh], ignore_index=True) if len(kept) else fresh
+        self.loaded_until = today
+        return len(fresh)
+
+    # (keys DataFrame, units array of shape series x days) for days start..end
+    def matrix(self, start, end):
+        days = (end - start).days + 1
+        window = self.daily[(self.daily["Day"] >= start) & (self.daily["Day"] <= end)]
+        grouped = window.groupby(self.spec["keys"], sort=True)
+        keys = grouped.size().reset_index()[self.spec["keys"]]
+        units = np.zeros((len(keys), days))
+        if len(window):
+            offsets = np.array([(day - start).days for day in window["Day"]])
+            np.add.at(units, (grouped.ngroup().to_numpy(), offsets), window["Units"].astype(float).to_numpy())
+        return keys, units
+
+
+# Simple exponential smoothing of every series at once, for each alpha in
+# ALPHAS; returns the final level and chosen alpha per series
+def smooth(units, alphas=ALPHAS):
+    n, days = units.shape
+    level = np.tile(units[:, :SHORT_WINDOW].mean(axis=1), (len(alphas), 1))
+    sse = np.zeros((len(alphas), n))
+    rate = alphas[:, None]
+    for t in range(days):
+        err = units[:, t] - level
+        sse += err ** 2
+        level += rate * err
+    best = sse.argmin(axis=0)
+    return level[best, np.arange(n)], alphas[best]
+
+
+# Rolling averages and smoothed forecasts for every series of one history
+def fit(history, today):
+    end = today - timedelta(days=1)  # today is still filling up
+    keys, units = history.matrix(end - timedelta(days=history.history_days - 1), end)
+    level, alpha = smooth(units) if len(keys) else (np.zeros(0), np.zeros(0))
+    result = keys.copy()
+    result["Avg_7d"] = units[:, -SHORT_WINDOW:].mean(axis=1) if len(keys) else []
+    result["Avg_28d"] = units[:, -LONG_WINDOW:].mean(axis=1) if len(keys) else []
+    result["Alpha"] = alpha
+    for horizon in HORIZONS:
+        result[f"Forecast_{horizon}d"] = (level * horizon).round(1)
+    return result
+
+
+# Forecasts per (hospital, group) and supply per group, refitted only when
+# the change feed reports new orders or supplies, or the day rolls over.
+# Cancellations and deletes can touch any past day, so they make that
+# series reload its whole window instead of just the latest day.
+class DemandForecaster:
+    def __init__(self, history_days=HISTORY_DAYS):
+        self.history = {name: DailyHistory(spec, history_days) for name, spec in SERIES.items()}
+        self.results = {}
+        self.stale = True
+        self.reload = set()
+        self.fitted_on = None
+        self.fit_ms = None
+        self._lock = threading.Lock()
+
+    def mark_stale(self, events):
+        for event in events:
+            if event["Op"] == "I":
+                self.stale = True
+            elif event["Op"] == "D" or event["Status"] == "Cancelled":
+                self.reload.update(name for name, spec in SERIES.items() if spec["table"] == event["Table_name"])
+                self.stale = True
+
+    def _refresh(self):
+        today = date.today()
+        with self._lock:
+            if self.stale or self.fitted_on != today:
+                started = time.perf_counter()
+                # Cleared first so an insert landing mid-refresh triggers another
+                self.stale = False
+                reload, self.reload = self.reload, set()
+                try:
+                    results = {}
+                    for name, history in self.history.items():
+                        if name in reload:
+                            history.reset()
+                        history.refresh(today)
+                        results[name] = fit(history, today)
+                except Exception:
+                    self.reload |= reload
+                    self.stale = True
+                    raise
+                self.results = results
+                self.fitted_on = today
+                self.fit_ms = (time.perf_counter() - started) * 1000
+            return self.results
+
+    def demand(self):
+        return self._refresh()["demand"]
+
+    # Stock against forecast demand and supply per group; Projected_Nd below
+    # zero means the group runs short within N days
+    def shortages(self, stock):
+        results = self._refresh()
+        demand = results["demand"].groupby("Blood_grp")[[f"Forecast_{h}d" for h in HORIZONS]].sum()
+        supply = results["supply"].set_index("Blood_grp")[[f"Forecast_{h}d" for h in HORIZONS]]
+        table = pd.DataFrame(index=pd.Index(BLOOD_GROUPS, name="Blood_grp"))
+        table["Stock"] = [int(stock.get(group, 0)) for group in BLOOD_GROUPS]
+        for horizon in HORIZONS:
+            column = f"Forecast_{horizon}d"
+            table[f"Demand_{horizon}d"] = demand[column].reindex(BLOOD_GROUPS, fill_value=0).round(1)
+            table[f"Supply_{horizon}d"] = supply[column].reindex(BLOOD_GROUPS, fill_value=0).round(1)
+            table[f"Projected_{horizon}d"] = (table["Stock"] + table[f"Supply_{horizon}d"]
+                                              - table[f"Demand_{horizon}d"]).round(1)
+        net_daily = (table[f"Demand_{HORIZONS[0]}d"] - table[f"Supply_{HORIZONS[0]}d"]) / HORIZONS[0]
+        table["Days_of_cover"] = (table["Stock"] / net_daily).where(net_daily > 0).round(1)
+        return table.sort_values(f"Projected_{HORIZONS[0]}d")
+
+
+_forecaster = None
+_lock = threading.Lock()
+
+
+# The process-wide forecaster, marked stale by the change feed
+def get_forecaster():
+    global _forecaster
+    with _lock:
+        if _forecaster is None:
+            from change_feed import get_feed
+
+            forecaster = DemandForecaster()
+            feed = get_feed()
+            feed.pubsub.subscribe("Orders", forecaster.mark_stale)
+            feed.pubsub.subscribe("Supply", forecaster.mark_stale)
+            _forecaster = forecaster
+    return _forecaster
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast blood demand and predicted shortages")
+    parser.add_argument("--hospital", help="show per-group forecasts for this Hosp_id")
+    parser.add_argument("--history-days", type=int, default=HISTORY_DAYS)
+    args = parser.parse_args()
+
+    forecaster = DemandForecaster(args.history_days)
+    if args.hospital:
+        demand = forecaster.demand()
+        print(demand[demand["Hosp_id"] == args.hospital].to_string(index=False))
+        return
+    with transaction("forecast_stock") as tx:
+        stock = {row["Blood_grp"]: row["Total_Units"]
+                 for row in tx.fetchall("SELECT Blood_grp, Total_Units FROM Blood_Availability")}
+    print(forecaster.shortages(stock).to_string())
+    print(f"fitted in {forecaster.fit_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import argparse
+import time
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from lots import lock_groups
+from order_engine import INSERT_ALLOCATION, build_deduction
+from validation import BLOOD_GROUPS
+
+# Red cell compatibility: donor groups each recipient can take, in order of
+# preference. Exact group first, then the substitutes that are least useful
+# to other recipients, so O- (the universal donor) is used last.
+COMPATIBLE_DONORS = {
+    "O-": ["O-"],
+    "O+": ["O+", "O-"],
+    "A-": ["A-", "O-"],
+    "A+": ["A+", "O+", "A-", "O-"],
+    "B-": ["B-", "O-"],
+    "B+": ["B+", "O+", "B-", "O-"],
+    "AB-": ["AB-", "A-", "B-", "O-"],
+    "AB+": ["AB+", "A+", "B+", "O+", "AB-", "A-", "B-", "O-"],
+}
+
+# max_orders fills the most orders (smallest first, first come on ties) and
+# lets every group use its own stock before any substitution; fifo serves
+# strictly in arrival order, each order taking its own group and then its
+# compatible donors before the next order is looked at
+POLICIES = ("max_orders", "fifo")
+
+# Rows per UPDATE/INSERT statement when applying a plan
+APPLY_CHUNK = 500
+
+GROUP_INDEX = {group: i for i, group in enumerate(BLOOD_GROUPS)}
+
+FulfilmentPlan = namedtuple("FulfilmentPlan", [
+    "fulfilled",      # Order_ids to mark Fulfilled
+    "allocations",    # DataFrame: Order_id, Lot_id, Storage_id, Blood_grp, Units
+    "unfilled",       # Order_ids left Pending
+    "substituted",    # Order_ids served at least partly from another group
+    "latency_ms",
+])
+
+PENDING_ORDERS = """
+    SELECT o.Order_id, o.Blood_grp, o.Quantity, o.Order_date, COALESCE(a.Units, 0) AS Reserved
+    FROM Orders o
+    LEFT JOIN (SELECT Order_id, SUM(Units) AS Units FROM Order_Allocation GROUP BY Order_id) a
+        ON a.Order_id = o.Order_id
+    WHERE o.Status = 'Pending'
+"""
+
+# Usable lots, first-expiring first within each group
+STOCK_ROWS = """
+    SELECT Lot_id, Storage_id, Blood_grp, Quantity FROM Blood_Lot
+    WHERE Status = 'Available' AND Expires_on >= %s AND Quantity > 0
+    ORDER BY Blood_grp, Expires_on, Lot_id
+"""
+
+
+def order_priority(orders, policy):
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy {policy!r}; expected one of {POLICIES}")
+    keys = ["Quantity", "Order_date", "Order_id"] if policy == "max_orders" else ["Order_date", "Order_id"]
+    return orders.sort_values(keys, kind="stable").reset_index(drop=True)
+
+
+# Units per donor group granted to each unreserved order.
+# Pass 1 serves each group's orders from its own stock as a vectorized
+# prefix: everything whose running total fits. Pass 2 walks the rest in
+# priority order and covers each order from compatible surplus, splitting it
+# across groups in preference order. With strict, pass 1 is skipped so pass
+# 2 sees every order in priority order. Returns an (orders x groups) array.
+def match_groups(orders, stock, strict=False):
+    n = len(orders)
+    grant = np.zeros((n, len(BLOOD_GROUPS)), dtype=np.int64)
+    if n == 0:
+        return grant
+    stock = stock.astype(np.int64).copy()
+    groups = orders["Blood_grp"].map(GROUP_INDEX).to_numpy()
+    quantity = orders["Quantity"].to_numpy(dtype=np.int64)
+
+    served = np.zeros(n, dtype=bool)
+    for g in range(len(BLOOD_GROUPS)):
+        idx = np.flatnonzero(groups == g)
+        if strict or not len(idx):
+            continue
+        fits = np.cumsum(quantity[idx]) <= stock[g]
+        take = idx[fits]
+        grant[take, g] = quantity[take]
+        served[take] = True
+        stock[g] -= quantity[take].sum()
+
+    preferences = {g: np.array([GROUP_INDEX[d] for d in COMPATIBLE_DONORS[group]])
+                   for g, group in enumerate(BLOOD_GROUPS)}
+    for i in np.flatnonzero(~served):
+        donors = preferences[groups[i]]
+        supply = stock[donors]
+        if supply.sum() < quantity[i]:
+            continue
+        # Take from each donor group in turn until the order is covered
+        before = np.concatenate(([0], np.cumsum(supply)[:-1]))
+        take = np.clip(quantity[i] - before, 0, supply)
+        grant[i, donors] = take
+        stock[donors] -= take
+    return grant
+
+
+# Spread each group's granted units over its lots, in the order given, by
+# intersecting the two running totals. Returns (order_pos, row_pos, units).
+def split_across_rows(order_units, row_units):
+    order_end = np.cumsum(order_units)
+    row_end = np.cumsum(row_units)
+    if not len(order_end) or order_end[-1] == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    cuts = np.union1d(order_end, row_end)
+    cuts = cuts[cuts <= order_end[-1]]
+    starts = np.concatenate(([0], cuts[:-1]))
+    units = cuts - starts
+    keep = units > 0
+    starts, units = starts[keep], units[keep]
+    return (np.searchsorted(order_end, starts, side="right"),
+            np.searchsorted(row_end, starts, side="right"),
+            units)
+
+
+# Plan fulfilment of every pending order against current stock. Orders that
+# already hold a reservation are fulfilled as they stand; the rest compete for
+# stock with compatible substitution.
+def plan_fulfilment(orders, stock_rows, policy="max_orders"):
+    started = time.perf_counter()
+    orders = pd.DataFrame(orders, columns=["Order_id", "Blood_grp", "Quantity", "Order_date", "Reserved"])
+    stock_rows = pd.DataFrame(stock_rows, columns=["Lot_id", "Storage_id", "Blood_grp", "Quantity"])
+    reserved = orders["Reserved"].astype(int) >= orders["Quantity"].astype(int)
+    waiting = order_priority(orders[~reserved], policy)
+
+    stock = (stock_rows.groupby("Blood_grp")["Quantity"].sum()
+             .reindex(BLOOD_GROUPS, fill_value=0).to_numpy())
+    grant = match_groups(waiting, stock, strict=policy == "fifo")
+    filled = grant.sum(axis=1) > 0
+
+    pieces = []
+    for g, group in enumerate(BLOOD_GROUPS):
+        takers = np.flatnonzero(grant[:, g])
+        if not len(takers):
+            continue
+        rows = stock_rows[stock_rows["Blood_grp"] == group]
+        order_pos, row_pos, units = split_across_rows(grant[takers, g], rows["Quantity"].to_numpy())
+        pieces.append(pd.DataFrame({
+            "Order_id": waiting["Order_id"].to_numpy()[takers[order_pos]],
+            "Lot_id": rows["Lot_id"].to_numpy()[row_pos],
+            "Storage_id": rows["Storage_id"].to_numpy()[row_pos],
+            "Blood_grp": group,
+            "Units": units,
+        }))
+    allocations = (pd.concat(pieces, ignore_index=True) if pieces
+                   else pd.DataFrame(columns=["Order_id", "Lot_id", "Storage_id", "Blood_grp", "Units"]))
+
+    own = grant[np.arange(len(waiting)), waiting["Blood_grp"].map(GROUP_INDEX).to_numpy(dtype=np.int64)]
+    substituted = waiting["Order_id"][filled & (own < waiting["Quantity"].to_numpy())].tolist()
+    fulfilled = orders["Order_id"][reserved].tolist() + waiting["Order_id"][filled].tolist()
+    unfilled = waiting["Order_id"][~filled].tolist()
+    return FulfilmentPlan(fulfilled, allocations, unfilled, substituted, (time.perf_counter() - started) * 1000)
+
+
+def chunks(items, size=APPLY_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# Lock every group's total, pending orders and usable lots, plan, and apply
+# the whole plan inside the caller's transaction: deduct lots, record
+# allocations, mark orders Fulfilled
+def run_fulfilment(tx, policy="max_orders", dry_run=False, today=None):
+    lock_groups(tx)
+    tx.fetchall("SELECT Order_id FROM Orders WHERE Status = 'Pending' FOR UPDATE")
+    orders = tx.fetchall(PENDING_ORDERS)
+    stock_rows = tx.fetchall(STOCK_ROWS + " FOR UPDATE", (today or date.today(),))
+    plan = plan_fulfilment(orders, stock_rows, policy)
+    if dry_run:
+        return plan
+
+    if len(plan.allocations):
+        per_lot = plan.allocations.groupby("Lot_id", sort=True)["Units"].sum()
+        for batch in chunks(list(zip(per_lot.index.astype(int).tolist(), per_lot.astype(int).tolist()))):
+            tx.execute(*build_deduction(batch, "Blood_Lot", "Lot_id"))
+        tx.executemany(INSERT_ALLOCATION, [
+            (row.Order_id, row.Storage_id, row.Blood_grp, int(row.Units), int(row.Lot_id))
+            for row in plan.allocations.itertuples(index=False)
+        ])
+    for batch in chunks(plan.fulfilled):
+        tx.execute(f"UPDATE Orders SET Status = 'Fulfilled' WHERE Order_id IN ({', '.join(['%s'] * len(batch))})",
+                   batch)
+    return plan
+
+
+def main():
+    from database import transaction
+
+    parser = argparse.ArgumentParser(description="Fulfil pending orders in one batch with compatible substitution")
+    parser.add_argument("--policy", choices=POLICIES, default="max_orders")
+    parser.add_argument("--dry-run", action="store_true", help="plan only; change nothing")
+    args = parser.parse_args()
+
+    with transaction("batch_fulfilment") as tx:
+        plan = run_fulfilment(tx, args.policy, args.dry_run)
+    print(f"{'planned' if args.dry_run else 'fulfilled'} {len(plan.fulfilled)} orders, "
+          f"{len(plan.unfilled)} left pending, {len(plan.substituted)} with substitutes "
+          f"({int(plan.allocations['Units'].sum()) if len(plan.allocations) else 0} units allocated, "
+          f"planned in {plan.latency_ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+BUFFER_SIZE = int(os.environ.get("BB_PROFILE_BUFFER", "5000"))
+QUERY_LOG = os.environ.get("BB_QUERY_LOG")
+N_PLUS_ONE_THRESHOLD = 5
+
+# Which page/tab and which script run issued the current query
+_context = contextvars.ContextVar("query_context", default={"page": None, "tab": None, "run": None})
+
+_events = deque(maxlen=BUFFER_SIZE)
+_lock = threading.Lock()
+
+# Wall time of each script run; the process's first run is its cold start
+_runs = deque(maxlen=BUFFER_SIZE)
+_cold_start = None
+
+_IN_LIST = re.compile(r"IN\s*\((?:\s*%s\s*,?)+\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"VALUES\s*(\((?:\s*%s\s*,?)+\)\s*,?\s*)+", re.IGNORECASE)
+
+_log = None
+if QUERY_LOG:
+    _log = logging.getLogger("blood_bank.queries")
+    _log.propagate = False
+    _log.setLevel(logging.INFO)
+    _handler = RotatingFileHandler(QUERY_LOG, maxBytes=10 * 1024 * 1024, backupCount=5)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    _log.addHandler(_handler)
+
+
+# Collapse whitespace and variable-length placeholder lists so repeated
+# statements share one shape
+def normalize(query):
+    query = " ".join(query.split())
+    query = _IN_LIST.sub("IN (...)", query)
+    return _VALUES_LIST.sub("VALUES (...) ", query).strip()
+
+
+# Start a new script run for the given menu page
+def start_run(page):
+    _context.set({"page": page, "tab": None, "run": uuid.uuid4().hex})
+
+
+@contextmanager
+def tab(name):
+    current = _context.get()
+    token = _context.set(dict(current, tab=name))
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+# Record one finished script run. first_visit marks the run that imported
+# the page's module, so its cost is kept apart from ordinary reruns.
+def finish_run(page, duration_ms, first_visit=False):
+    global _cold_start
+    run = {"ts": time.time(), "page": page, "duration_ms": duration_ms, "first_visit": first_visit}
+    with _lock:
+        if _cold_start is None:
+            _cold_start = run
+        _runs.append(run)
+
+
+def cold_start():
+    return _cold_start
+
+
+# Run count and latency percentiles per page, first visits excluded
+def per_page_runs():
+    by_page = {}
+    for run in runs():
+        entry = by_page.setdefault(run["page"], {"page": run["page"], "first_visit_ms": None, "durations": []})
+        if run["first_visit"]:
+            entry["first_visit_ms"] = run["duration_ms"]
+        else:
+            entry["durations"].append(run["duration_ms"])
+    stats = []
+    for entry in by_page.values():
+        durations = sorted(entry.pop("durations"))
+        entry["reruns"] = len(durations)
+        entry["median_ms"] = durations[len(durations) // 2] if durations else None
+        entry["p95_ms"] = durations[int(len(durations) * 0.95)] if durations else None
+        entry["max_ms"] = durations[-1] if durations else None
+        stats.append(entry)
+    return sorted(stats, key=lambda e: e["median_ms"] or 0, reverse=True)
+
+
+def runs():
+    with _lock:
+        return list(_runs)
+
+
+def record(query, latency_ms, rows=None, pool_wait_ms=None, error=None):
+    context = _context.get()
+    event = {
+        "ts": time.time(),
+        "page": context["page"],
+        "tab": context["tab"],
+        "run": context["run"],
+        "query": normalize(query),
+        "latency_ms": latency_ms,
+        "rows": rows,
+        "pool_wait_ms": pool_wait_ms,
+        "error": str(error) if error else None,
+    }
+    with _lock:
+        _events.append(event)
+    if _log:
+        _log.info(json.dumps(event, default=str))
+
+
+def events():
+    with _lock:
+        return list(_events)
+
+
+def clear():
+    with _lock:
+        _events.clear()
+        _runs.clear()
+
+
+def slowest(limit=20):
+    return sorted(events(), key=lambda e: e["latency_ms"], reverse=True)[:limit]
+
+
+# Query count and time per page/tab
+def per_page():
+    totals = {}
+    for event in events():
+        key = (event["page"] or "-", event["tab"] or "-")
+        entry = totals.setdefault(key, {"page": key[0], "tab": key[1], "queries": 0, "total_ms": 0.0})
+        entry["queries"] += 1
+        entry["total_ms"] += event["latency_ms"]
+    return sorted(totals.values(), key=lambda e: e["total_ms"], reverse=True)
+
+
+# Statement shapes executed many times within a single script run
+def n_plus_one(threshold=N_PLUS_ONE_THRESHOLD):
+    counts = Counter((e["run"], e["page"], e["tab"], e["query"]) for e in events() if e["run"])
+    return sorted(
+        ({"page": page, "tab": tab_name, "query": query, "executions": n}
+         for (run, page, tab_name, query), n in counts.items() if n >= threshold),
+        key=lambda e: e["executions"], reverse=True,
+    )
@@ -0,0 +1,29 @@
+from lots import add_lot, lock_groups, remove_from_storage, storage_group
+
+
+# Add units to a storage unit as a new lot; the lot trigger creates the
+# Storage_House row if it does not exist yet. False if the unit holds
+# another blood group.
+def add_stock(tx, storage_id, blood_grp, quantity, collected_on=None):
+    if storage_group(tx, storage_id) not in (None, blood_grp):
+        return False
+    add_lot(tx, storage_id, blood_grp, quantity, collected_on)
+    return True
+
+
+# Remove units from a storage unit, soonest-expiring lots first, without
+# going below zero
+def remove_stock(tx, storage_id, quantity):
+    remove_from_storage(tx, storage_id, quantity)
+    return True
+
+
+INSERT_SUPPLY = "INSERT INTO Supply (Supply_id, Hosp_id, Blood_grp, Quantity) VALUES (%s, %s, %s, %s)"
+
+
+# Record a supply; the after_supply_insert trigger adds it as a lot in
+# storage unit SUP<Supply_id> in the same transaction
+def record_supply(tx, supply_id, hosp_id, blood_grp, quantity):
+    lock_groups(tx, [blood_grp])
+    tx.execute(INSERT_SUPPLY, (supply_id, hosp_id, blood_grp, quantity))
+    return True
@@ -0,0 +1,262 @@
+import argparse
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+
+from query_cache import query_cache
+
+logger = logging.getLogger("blood_bank.lots")
+
+# Storage_House quantities are derived from lots by triggers, and each
+# supply arrives as a new lot
+query_cache.add_dependency("Blood_Lot", "Storage_House")
+query_cache.add_dependency("Supply", "Blood_Lot")
+
+SHELF_LIFE_DAYS = 42
+SWEEP_MINUTES = int(os.environ.get("BB_EXPIRY_SWEEP_MINUTES", "60"))
+SWEEP_BATCH = 1000
+
+# Usable lots of a group, first-expiring first. Each lot holds at least one
+# unit, so the first `quantity` lots always cover an order if anything can.
+LOCK_FEFO_LOTS = """
+    SELECT Lot_id, Storage_id, Quantity FROM Blood_Lot
+    WHERE Blood_grp = %s AND Expires_on >= %s AND Status = 'Available' AND Quantity > 0
+    ORDER BY Expires_on, Lot_id
+    LIMIT %s
+    FOR UPDATE
+"""
+
+LOCK_STORAGE_LOTS = """
+    SELECT Lot_id, Storage_id, Quantity FROM Blood_Lot
+    WHERE Storage_id = %s AND Status = 'Available' AND Quantity > 0
+    ORDER BY Expires_on, Lot_id
+    FOR UPDATE
+"""
+
+INSERT_LOT = """
+    INSERT INTO Blood_Lot (Storage_id, Blood_grp, Quantity, Collected_on, Expires_on, Dona_id, Test_id)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+STORAGE_DRIFT_QUERY = """
+    SELECT s.Storage_id, s.Quantity AS Storage_units, COALESCE(l.Units, 0) AS Lot_units
+    FROM Storage_House s
+    LEFT JOIN (SELECT Storage_id, SUM(Quantity) AS Units FROM Blood_Lot
+               WHERE Status = 'Available' GROUP BY Storage_id) l
+        ON l.Storage_id = s.Storage_id
+    WHERE s.Quantity <> COALESCE(l.Units, 0)
+"""
+
+
+# Take up to quantity units from lots in the order given; returns
+# (lot_id, storage_id, take) triples and the units still missing
+def take_from_lots(lots, quantity):
+    taken = []
+    remaining = quantity
+    for lot in lots:
+        if remaining <= 0:
+            break
+        take = min(lot["Quantity"], remaining)
+        taken.append((lot["Lot_id"], lot["Storage_id"], take))
+        remaining -= take
+    return taken, remaining
+
+
+# Lots to cover an order of one group, first-expiring first; None if short
+def allocate_fefo(tx, blood_grp, quantity, today=None):
+    lots = tx.fetchall(LOCK_FEFO_LOTS, (blood_grp, today or date.today(), quantity))
+    taken, remaining = take_from_lots(lots, quantity)
+    return taken if remaining <= 0 else None
+
+
+# Lock the Blood_Availability rows of the given groups (all groups if None),
+# in group order. Every path that changes stock takes these before touching
+# Blood_Lot: place_order locks its group's total first, and the lot triggers
+# reach Blood_Availability last, so the opposite order could deadlock on MySQL.
+def lock_groups(tx, groups=None):
+    if groups is None:
+        return tx.fetchall("SELECT Blood_grp FROM Blood_Availability ORDER BY Blood_grp FOR UPDATE")
+    groups = sorted(set(groups))
+    if not groups:
+        return []
+    placeholders = ", ".join(["%s"] * len(groups))
+    return tx.fetchall(f"SELECT Blood_grp FROM Blood_Availability WHERE Blood_grp IN ({placeholders}) "
+                       "ORDER BY Blood_grp FOR UPDATE", groups)
+
+
+# Group a storage unit holds; None if the unit does not exist yet
+def storage_group(tx, storage_id):
+    unit = tx.fetchone("SELECT Blood_grp FROM Storage_House WHERE Storage_id = %s", (storage_id,))
+    return unit["Blood_grp"] if unit else None
+
+
+# New lot in a storage unit, which must hold the same group (the
+# lot_group_check triggers enforce this too)
+def add_lot(tx, storage_id, blood_grp, quantity, collected_on=None, expires_on=None, dona_id=None, test_id=None):
+    unit_grp = storage_group(tx, storage_id)
+    if unit_grp not in (None, blood_grp):
+        raise ValueError(f"storage unit {storage_id} holds {unit_grp}, not {blood_grp}")
+    collected_on = collected_on or date.today()
+    expires_on = expires_on or collected_on + timedelta(days=SHELF_LIFE_DAYS)
+    lock_groups(tx, [blood_grp])
+    tx.execute(INSERT_LOT, (storage_id, blood_grp, quantity, collected_on, expires_on, dona_id, test_id))
+
+
+# Remove units from one storage unit, soonest-expiring lots first; returns units removed
+def remove_from_storage(tx, storage_id, quantity):
+    from order_engine import build_deduction
+
+    unit_grp = storage_group(tx, storage_id)
+    if unit_grp is None:
+        return 0
+    lock_groups(tx, [unit_grp])
+    taken, _ = take_from_lots(tx.fetchall(LOCK_STORAGE_LOTS, (storage_id,)), quantity)
+    if taken:
+        tx.execute(*build_deduction([(lot_id, take) for lot_id, _, take in taken], "Blood_Lot", "Lot_id"))
+    return sum(take for _, _, take in taken)
+
+
+# Mark available lots past their expiry date as Expired, in batches so each
+# transaction stays short; returns (lots, units) expired. db is another
+# site's backend, else the current page's site.
+def expire_lots(today=None, batch_size=SWEEP_BATCH, db=None):
+    from database import transaction
+
+    today = today or date.today()
+    lots = units = 0
+    while True:
+        with transaction("expire_lots", db=db) as tx:
+            lock_groups(tx)
+            expired = tx.fetchall(
+                "SELECT Lot_id, Quantity FROM Blood_Lot WHERE Status = 'Available' AND Expires_on < %s "
+                f"ORDER BY Expires_on LIMIT {batch_size} FOR UPDATE", (today,))
+            if not expired:
+                break
+            ids = [lot["Lot_id"] for lot in expired]
+            tx.execute(f"UPDATE Blood_Lot SET Status = 'Expired' WHERE Lot_id IN ({', '.join(['%s'] * len(ids))})", ids)
+        lots += len(expired)
+        units += sum(lot["Quantity"] for lot in expired)
+        if len(expired) < batch_size:
+            break
+    if lots:
+        query_cache.invalidate("Blood_Lot")
+        logger.info("expired %d lots (%d units)", lots, units)
+    return lots, units
+
+
+# Units per group expiring within the next `days` days; database errors
+# propagate to the caller
+def expiring_soon(days=7, today=None):
+    from database import transaction
+
+    today = today or date.today()
+    with transaction("expiring_soon") as tx:
+        return tx.fetchall(
+            "SELECT Blood_grp, Expires_on, SUM(Quantity) AS Units FROM Blood_Lot "
+            "WHERE Status = 'Available' AND Quantity > 0 AND Expires_on BETWEEN %s AND %s "
+            "GROUP BY Blood_grp, Expires_on ORDER BY Expires_on, Blood_grp",
+            (today, today + timedelta(days=days)))
+
+
+# Storage units whose Quantity no longer matches their available lots
+def check_storage(tx):
+    return tx.fetchall(STORAGE_DRIFT_QUERY)
+
+
+# Re-derive every Storage_House quantity from its lots
+def rebuild_storage(tx):
+    lock_groups(tx)
+    tx.fetchall("SELECT Storage_id FROM Storage_House FOR UPDATE")
+    tx.execute("""
+        UPDATE Storage_House SET Quantity = COALESCE((
+            SELECT SUM(l.Quantity) FROM Blood_Lot l
+            WHERE l.Storage_id = Storage_House.Storage_id AND l.Status = 'Available'), 0)""")
+
+
+# Expire lots at every site; a site that fails is logged and skipped.
+# Returns (lots, units) expired over all sites.
+def expire_all_sites(today=None):
+    from sites import SITES
+
+    lots = units = 0
+    for site in SITES.values():
+        try:
+            site_lots, site_units = expire_lots(today, db=site.backend)
+        except Exception:
+            logger.exception("expiry sweep failed at site %s", site.site_id)
+            continue
+        lots += site_lots
+        units += site_units
+    return lots, units
+
+
+# Background expiry sweep over every site: runs at start, then every interval_minutes
+class ExpirySweeper:
+    def __init__(self, interval_minutes=SWEEP_MINUTES):
+        self.interval_minutes = interval_minutes
+        self.last_run = None
+        self.last_result = (0, 0)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval_minutes > 0 and (self._thread is None or not self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="expiry-sweep", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            try:
+                self.last_result = expire_all_sites()
+                self.last_run = datetime.now()
+            except Exception:
+                logger.exception("expiry sweep failed")
+            if self._stop.wait(self.interval_minutes * 60):
+                return
+
+
+_sweeper = None
+_lock = threading.Lock()
+
+
+# The process-wide sweeper, started on first use
+def get_expiry_sweeper():
+    global _sweeper
+    with _lock:
+        if _sweeper is None:
+            _sweeper = ExpirySweeper().start()
+    return _sweeper
+
+
+def main():
+    from database import transaction
+
+    parser = argparse.ArgumentParser(description="Blood lot maintenance")
+    parser.add_argument("command", choices=["sweep", "check", "rebuild"])
+    args = parser.parse_args()
+
+    if args.command == "sweep":
+        lots, units = expire_all_sites()
+        print(f"expired {lots} lots ({units} units)")
+        return
+    with transaction(f"lots_{args.command}") as tx:
+        if args.command == "rebuild":
+            rebuild_storage(tx)
+        drift = check_storage(tx)
+    if drift:
+        for row in drift:
+            print(f"{row['Storage_id']}: Storage_House={row['Storage_units']} lots={row['Lot_units']}")
+        raise SystemExit(1)
+    print("Storage_House matches Blood_Lot")
+
+
+if __name__ == "__main__":
+    main()
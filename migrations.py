@@ -0,0 +1,145 @@
+import argparse
+import re
+import time
+import weakref
+from pathlib import Path
+
+# One directory of scripts per backend dialect, e.g. migrations/mysql
+MIGRATIONS_ROOT = Path(__file__).resolve().parent / "migrations"
+MIGRATION_FILE = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+
+SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        Version INT PRIMARY KEY,
+        Name VARCHAR(100) NOT NULL,
+        Applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        Duration_ms INT NOT NULL
+    )
+"""
+
+# Backends already migrated in this process
+_migrated = weakref.WeakSet()
+
+
+# Split a SQL script into statements, honouring DELIMITER blocks used by
+# procedures and triggers
+def split_statements(script):
+    statements = []
+    delimiter = ";"
+    buffer = []
+    for line in script.splitlines():
+        stripped = line.strip()
+        if not buffer and (not stripped or stripped.startswith("--")):
+            continue
+        if stripped.upper().startswith("DELIMITER "):
+            delimiter = stripped.split(None, 1)[1]
+            continue
+        buffer.append(line)
+        if stripped.endswith(delimiter):
+            statement = "\n".join(buffer).rstrip()
+            statements.append(statement[: -len(delimiter)].strip())
+            buffer = []
+    if buffer and "\n".join(buffer).strip():
+        statements.append("\n".join(buffer).strip())
+    return statements
+
+
+def migrations_dir(dialect):
+    return MIGRATIONS_ROOT / dialect
+
+
+# Ordered (version, name, path) for every script of a dialect
+def available_migrations(dialect="mysql"):
+    migrations = []
+    for path in sorted(migrations_dir(dialect).glob("*.sql")):
+        match = MIGRATION_FILE.match(path.name)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), path))
+    return migrations
+
+
+def applied_versions(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SCHEMA_VERSION_TABLE)
+        cursor.execute("SELECT Version FROM schema_version")
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def pending_migrations(conn, dialect="mysql"):
+    applied = applied_versions(conn)
+    return [m for m in available_migrations(dialect) if m[0] not in applied]
+
+
+# Apply pending migrations in version order, up to target if given. DDL
+# commits implicitly in MySQL, so each script is recorded right after it runs.
+def migrate(conn, target=None, dialect="mysql", log=print):
+    done = []
+    for version, name, path in pending_migrations(conn, dialect):
+        if target is not None and version > target:
+            break
+        started = time.perf_counter()
+        cursor = conn.cursor()
+        try:
+            for statement in split_statements(path.read_text()):
+                cursor.execute(statement)
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            cursor.execute(
+                "INSERT INTO schema_version (Version, Name, Duration_ms) VALUES (%s, %s, %s)",
+                (version, name, duration_ms)
+            )
+            conn.commit()
+        finally:
+            cursor.close()
+        if log:
+            log(f"applied {version:04d}_{name} in {duration_ms} ms")
+        done.append((version, name))
+    return done
+
+
+# Create the base schema if the backend manages it, then run pending
+# migrations; once per process and database, at app startup
+def ensure_migrated(db=None):
+    if db is None:
+        from database import backend as db
+    if db in _migrated:
+        return []
+
+    conn = db.get_connection()
+    try:
+        db.bootstrap(conn)
+        done = migrate(conn, dialect=db.dialect, log=None)
+    finally:
+        conn.close()
+    _migrated.add(db)
+    return done
+
+
+def main():
+    from database import backend
+
+    parser = argparse.ArgumentParser(description="Apply or inspect schema migrations")
+    parser.add_argument("command", choices=["status", "migrate"], nargs="?", default="migrate")
+    parser.add_argument("--target", type=int, help="stop after this version")
+    args = parser.parse_args()
+
+    conn = backend.get_connection()
+    try:
+        if args.command == "status":
+            applied = applied_versions(conn)
+            for version, name, _ in available_migrations(backend.dialect):
+                state = "applied" if version in applied else "pending"
+                print(f"{version:04d}_{name}: {state}")
+        else:
+            if backend.bootstrap(conn):
+                print("created base schema")
+            if not migrate(conn, args.target, backend.dialect):
+                print("schema is up to date")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+-- Per-group stock totals kept current by triggers on Storage_House, so
+-- availability reads no longer aggregate the whole table
+
+CREATE TABLE IF NOT EXISTS Blood_Availability (
+    Blood_grp ENUM('A+', 'A-', 'B+', 'B-', 'O+', 'O-', 'AB+', 'AB-') PRIMARY KEY,
+    Total_Units INT NOT NULL DEFAULT 0
+);
+
+INSERT INTO Blood_Availability (Blood_grp, Total_Units)
+SELECT Blood_grp, SUM(Quantity) FROM Storage_House GROUP BY Blood_grp
+ON DUPLICATE KEY UPDATE Total_Units = VALUES(Total_Units);
+
+DELIMITER //
+CREATE TRIGGER storage_after_insert
+AFTER INSERT ON Storage_House
+FOR EACH ROW
+BEGIN
+    INSERT INTO Blood_Availability (Blood_grp, Total_Units)
+    VALUES (NEW.Blood_grp, NEW.Quantity)
+    ON DUPLICATE KEY UPDATE Total_Units = Total_Units + NEW.Quantity;
+END //
+
+CREATE TRIGGER storage_after_update
+AFTER UPDATE ON Storage_House
+FOR EACH ROW
+BEGIN
+    IF NEW.Blood_grp = OLD.Blood_grp THEN
+        UPDATE Blood_Availability
+        SET Total_Units = Total_Units + NEW.Quantity - OLD.Quantity
+        WHERE Blood_grp = NEW.Blood_grp;
+    ELSE
+        UPDATE Blood_Availability
+        SET Total_Units = Total_Units - OLD.Quantity
+        WHERE Blood_grp = OLD.Blood_grp;
+        INSERT INTO Blood_Availability (Blood_grp, Total_Units)
+        VALUES (NEW.Blood_grp, NEW.Quantity)
+        ON DUPLICATE KEY UPDATE Total_Units = Total_Units + NEW.Quantity;
+    END IF;
+END //
+
+CREATE TRIGGER storage_after_delete
+AFTER DELETE ON Storage_House
+FOR EACH ROW
+BEGIN
+    UPDATE Blood_Availability
+    SET Total_Units = Total_Units - OLD.Quantity
+    WHERE Blood_grp = OLD.Blood_grp;
+END //
+DELIMITER ;
+
+CREATE OR REPLACE VIEW Available_Blood AS
+SELECT Blood_grp, Total_Units
+FROM Blood_Availability;
@@ -0,0 +1,3 @@
+-- Word-prefix name search for "contact of ..." and "donors named ...",
+-- replacing the leading-wildcard LIKE scan over Donor
+ALTER TABLE Donor ADD FULLTEXT INDEX ft_donor_name (Dona_name);
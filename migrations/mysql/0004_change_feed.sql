@@ -0,0 +1,84 @@
+-- Append-only change feed for Storage_House, Orders and Supply. The app
+-- polls for Event_id > last seen and applies the rows as deltas instead of
+-- re-reading the tables.
+
+CREATE TABLE IF NOT EXISTS Change_Event (
+    Event_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    Table_name VARCHAR(20) NOT NULL,
+    Op CHAR(1) NOT NULL,
+    Row_id VARCHAR(20) NOT NULL,
+    Hosp_id VARCHAR(20),
+    Blood_grp VARCHAR(3),
+    Quantity INT,
+    Delta INT,
+    Status VARCHAR(20),
+    Event_time TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+DELIMITER //
+CREATE TRIGGER storage_feed_after_insert
+AFTER INSERT ON Storage_House
+FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Event (Table_name, Op, Row_id, Blood_grp, Quantity, Delta)
+    VALUES ('Storage_House', 'I', NEW.Storage_id, NEW.Blood_grp, NEW.Quantity, NEW.Quantity);
+END //
+
+-- A changed Blood_grp is written as a removal from the old group and an
+-- addition to the new one so every event carries a single-group delta
+CREATE TRIGGER storage_feed_after_update
+AFTER UPDATE ON Storage_House
+FOR EACH ROW
+BEGIN
+    IF NEW.Blood_grp = OLD.Blood_grp THEN
+        IF NEW.Quantity <> OLD.Quantity THEN
+            INSERT INTO Change_Event (Table_name, Op, Row_id, Blood_grp, Quantity, Delta)
+            VALUES ('Storage_House', 'U', NEW.Storage_id, NEW.Blood_grp, NEW.Quantity, NEW.Quantity - OLD.Quantity);
+        END IF;
+    ELSE
+        INSERT INTO Change_Event (Table_name, Op, Row_id, Blood_grp, Quantity, Delta)
+        VALUES ('Storage_House', 'U', OLD.Storage_id, OLD.Blood_grp, 0, -OLD.Quantity),
+               ('Storage_House', 'U', NEW.Storage_id, NEW.Blood_grp, NEW.Quantity, NEW.Quantity);
+    END IF;
+END //
+
+CREATE TRIGGER storage_feed_after_delete
+AFTER DELETE ON Storage_House
+FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Event (Table_name, Op, Row_id, Blood_grp, Quantity, Delta)
+    VALUES ('Storage_House', 'D', OLD.Storage_id, OLD.Blood_grp, 0, -OLD.Quantity);
+END //
+
+CREATE TRIGGER orders_feed_after_insert
+AFTER INSERT ON Orders
+FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Event (Table_name, Op, Row_id, Hosp_id, Blood_grp, Quantity, Status)
+    VALUES ('Orders', 'I', NEW.Order_id, NEW.Hosp_id, NEW.Blood_grp, NEW.Quantity, NEW.Status);
+END //
+
+CREATE TRIGGER orders_feed_after_update
+AFTER UPDATE ON Orders
+FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Event (Table_name, Op, Row_id, Hosp_id, Blood_grp, Quantity, Status)
+    VALUES ('Orders', 'U', NEW.Order_id, NEW.Hosp_id, NEW.Blood_grp, NEW.Quantity, NEW.Status);
+END //
+
+CREATE TRIGGER orders_feed_after_delete
+AFTER DELETE ON Orders
+FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Event (Table_name, Op, Row_id, Hosp_id, Blood_grp, Quantity, Status)
+    VALUES ('Orders', 'D', OLD.Order_id, OLD.Hosp_id, OLD.Blood_grp, OLD.Quantity, OLD.Status);
+END //
+
+CREATE TRIGGER supply_feed_after_insert
+AFTER INSERT ON Supply
+FOR EACH ROW
+BEGIN
+    INSERT INTO Change_Event (Table_name, Op, Row_id, Hosp_id, Blood_grp, Quantity)
+    VALUES ('Supply', 'I', NEW.Supply_id, NEW.Hosp_id, NEW.Blood_grp, NEW.Quantity);
+END //
+DELIMITER ;
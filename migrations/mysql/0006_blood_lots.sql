@@ -0,0 +1,109 @@
+-- Stock tracked per lot (one donation or delivery) with collection and
+-- expiry dates. Storage_House.Quantity becomes the sum of a storage unit's
+-- available lots, kept current by triggers, so everything reading it
+-- (availability totals, change feed) keeps working.
+
+CREATE TABLE IF NOT EXISTS Blood_Lot (
+    Lot_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    Storage_id VARCHAR(20) NOT NULL,
+    Blood_grp ENUM('A+', 'A-', 'B+', 'B-', 'O+', 'O-', 'AB+', 'AB-') NOT NULL,
+    Quantity INT NOT NULL,
+    Collected_on DATE NOT NULL DEFAULT (CURRENT_DATE),
+    -- Red cells keep for 42 days
+    Expires_on DATE NOT NULL DEFAULT (CURRENT_DATE + INTERVAL 42 DAY),
+    Status ENUM('Available', 'Expired') NOT NULL DEFAULT 'Available',
+    Dona_id VARCHAR(20),
+    Test_id VARCHAR(20),
+    CONSTRAINT chk_lot_quantity CHECK (Quantity >= 0),
+    FOREIGN KEY (Dona_id) REFERENCES Donor(Dona_id),
+    FOREIGN KEY (Test_id) REFERENCES Blood_Test(Test_id)
+);
+
+-- Existing stock becomes one lot per storage unit; its collection date is
+-- unknown, so it is treated as collected today. Loaded before the triggers
+-- exist so Storage_House is not credited twice.
+INSERT INTO Blood_Lot (Storage_id, Blood_grp, Quantity)
+SELECT Storage_id, Blood_grp, Quantity FROM Storage_House WHERE Quantity > 0;
+
+-- First-expiring-first-out allocation within a group
+CREATE INDEX idx_lot_fefo ON Blood_Lot (Blood_grp, Expires_on);
+
+-- Expiry sweep: available lots past their date
+CREATE INDEX idx_lot_sweep ON Blood_Lot (Status, Expires_on);
+
+-- Removing stock from one storage unit, and re-deriving its quantity
+CREATE INDEX idx_lot_storage ON Blood_Lot (Storage_id, Expires_on);
+
+ALTER TABLE Order_Allocation ADD COLUMN Lot_id BIGINT;
+
+DELIMITER //
+-- A lot must hold the same group as the storage unit it goes into
+CREATE TRIGGER lot_group_check_insert
+BEFORE INSERT ON Blood_Lot
+FOR EACH ROW
+BEGIN
+    IF EXISTS (SELECT 1 FROM Storage_House WHERE Storage_id = NEW.Storage_id AND Blood_grp <> NEW.Blood_grp) THEN
+        SIGNAL SQLSTATE '23000' SET MESSAGE_TEXT = 'lot blood group does not match its storage unit';
+    END IF;
+END //
+
+CREATE TRIGGER lot_group_check_update
+BEFORE UPDATE ON Blood_Lot
+FOR EACH ROW
+BEGIN
+    IF (NEW.Storage_id <> OLD.Storage_id OR NEW.Blood_grp <> OLD.Blood_grp)
+       AND EXISTS (SELECT 1 FROM Storage_House WHERE Storage_id = NEW.Storage_id AND Blood_grp <> NEW.Blood_grp) THEN
+        SIGNAL SQLSTATE '23000' SET MESSAGE_TEXT = 'lot blood group does not match its storage unit';
+    END IF;
+END //
+
+CREATE TRIGGER lot_after_insert
+AFTER INSERT ON Blood_Lot
+FOR EACH ROW
+BEGIN
+    IF NEW.Status = 'Available' THEN
+        INSERT INTO Storage_House (Storage_id, Blood_grp, Quantity)
+        VALUES (NEW.Storage_id, NEW.Blood_grp, NEW.Quantity)
+        ON DUPLICATE KEY UPDATE Quantity = Quantity + NEW.Quantity;
+    END IF;
+END //
+
+CREATE TRIGGER lot_after_update
+AFTER UPDATE ON Blood_Lot
+FOR EACH ROW
+BEGIN
+    DECLARE old_units INT DEFAULT IF(OLD.Status = 'Available', OLD.Quantity, 0);
+    DECLARE new_units INT DEFAULT IF(NEW.Status = 'Available', NEW.Quantity, 0);
+    IF new_units <> old_units THEN
+        UPDATE Storage_House
+        SET Quantity = Quantity + new_units - old_units
+        WHERE Storage_id = NEW.Storage_id;
+    END IF;
+END //
+
+CREATE TRIGGER lot_after_delete
+AFTER DELETE ON Blood_Lot
+FOR EACH ROW
+BEGIN
+    IF OLD.Status = 'Available' AND OLD.Quantity <> 0 THEN
+        UPDATE Storage_House
+        SET Quantity = Quantity - OLD.Quantity
+        WHERE Storage_id = OLD.Storage_id;
+    END IF;
+END //
+
+-- Place_Order deducts Storage_House directly, bypassing the lots and
+-- Order_Allocation; orders go through order_engine.place_order instead
+DROP PROCEDURE IF EXISTS Place_Order //
+
+-- Deliveries now arrive as a lot
+DROP TRIGGER IF EXISTS after_supply_insert //
+
+CREATE TRIGGER after_supply_insert
+AFTER INSERT ON Supply
+FOR EACH ROW
+BEGIN
+    INSERT INTO Blood_Lot (Storage_id, Blood_grp, Quantity)
+    VALUES (CONCAT('SUP', NEW.Supply_id), NEW.Blood_grp, NEW.Quantity);
+END //
+DELIMITER ;
@@ -0,0 +1,28 @@
+-- Indexes derived from the queries the app actually runs
+
+-- Availability SUM ... GROUP BY Blood_grp and the order engine's locking
+-- read (WHERE Blood_grp = ? AND Quantity > 0 ORDER BY Quantity DESC) are
+-- answered from the index alone
+CREATE INDEX idx_storage_grp_qty ON Storage_House (Blood_grp, Quantity);
+
+-- Pending-order lists and the Status filter sorted by date
+CREATE INDEX idx_orders_status_date ON Orders (Status, Order_date);
+
+-- Recent activities and the default newest-first Orders page
+CREATE INDEX idx_orders_date ON Orders (Order_date);
+
+-- Blood group filter on the Orders page, newest first
+CREATE INDEX idx_orders_grp_date ON Orders (Blood_grp, Order_date);
+
+-- Recent activities and the default newest-first Supply History page
+CREATE INDEX idx_supply_date ON Supply (Supply_date);
+
+-- "donors with X" and the Donors blood group filter
+CREATE INDEX idx_donor_grp ON Donor (Blood_grp);
+
+-- Name lookups and sorting on the Donors page
+CREATE INDEX idx_donor_name ON Donor (Dona_name);
+
+-- Donor_Information and latest-test lookups per donor; also serves the
+-- Dona_id foreign key
+CREATE INDEX idx_test_donor_date ON Blood_Test (Dona_id, Test_date);
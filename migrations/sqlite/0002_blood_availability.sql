@@ -0,0 +1,49 @@
+-- Per-group stock totals kept current by triggers on Storage_House, so
+-- availability reads no longer aggregate the whole table
+
+CREATE TABLE IF NOT EXISTS Blood_Availability (
+    Blood_grp VARCHAR(3) PRIMARY KEY CHECK (Blood_grp IN ('A+', 'A-', 'B+', 'B-', 'O+', 'O-', 'AB+', 'AB-')),
+    Total_Units INT NOT NULL DEFAULT 0
+);
+
+INSERT OR REPLACE INTO Blood_Availability (Blood_grp, Total_Units)
+SELECT Blood_grp, SUM(Quantity) FROM Storage_House GROUP BY Blood_grp;
+
+DELIMITER //
+CREATE TRIGGER storage_after_insert
+AFTER INSERT ON Storage_House
+FOR EACH ROW
+BEGIN
+    INSERT INTO Blood_Availability (Blood_grp, Total_Units)
+    VALUES (NEW.Blood_grp, NEW.Quantity)
+    ON CONFLICT (Blood_grp) DO UPDATE SET Total_Units = Total_Units + NEW.Quantity;
+END //
+
+-- Moves OLD out and NEW in, which also covers a changed Blood_grp
+CREATE TRIGGER storage_after_update
+AFTER UPDATE ON Storage_House
+FOR EACH ROW
+BEGIN
+    UPDATE Blood_Availability
+    SET Total_Units = Total_Units - OLD.Quantity
+    WHERE Blood_grp = OLD.Blood_grp;
+    INSERT INTO Blood_Availability (Blood_grp, Total_Units)
+    VALUES (NEW.Blood_grp, NEW.Quantity)
+    ON CONFLICT (Blood_grp) DO UPDATE SET Total_Units = Total_Units + NEW.Quantity;
+END //
+
+CREATE TRIGGER storage_after_delete
+AFTER DELETE ON Storage_House
+FOR EACH ROW
+BEGIN
+    UPDATE Blood_Availability
+    SET Total_Units = Total_Units - OLD.Quantity
+    WHERE Blood_grp = OLD.Blood_grp;
+END //
+DELIMITER ;
+
+DROP VIEW IF EXISTS Available_Blood;
+
+CREATE VIEW Available_Blood AS
+SELECT Blood_grp, Total_Units
+FROM Blood_Availability;
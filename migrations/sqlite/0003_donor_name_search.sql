@@ -0,0 +1,37 @@
+-- Word-prefix name search for "contact of ..." and "donors named ...",
+-- replacing the leading-wildcard LIKE scan over Donor. An external-content
+-- FTS5 index over Dona_name with 2- and 3-character prefix indexes, kept in
+-- step with Donor by triggers.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS Donor_Name_Index USING fts5(
+    Dona_name,
+    content='Donor',
+    content_rowid='rowid',
+    prefix='2 3'
+);
+
+INSERT INTO Donor_Name_Index (Donor_Name_Index) VALUES ('rebuild');
+
+DELIMITER //
+CREATE TRIGGER donor_name_after_insert
+AFTER INSERT ON Donor
+FOR EACH ROW
+BEGIN
+    INSERT INTO Donor_Name_Index (rowid, Dona_name) VALUES (NEW.rowid, NEW.Dona_name);
+END //
+
+CREATE TRIGGER donor_name_after_update
+AFTER UPDATE OF Dona_name ON Donor
+FOR EACH ROW
+BEGIN
+    INSERT INTO Donor_Name_Index (Donor_Name_Index, rowid, Dona_name) VALUES ('delete', OLD.rowid, OLD.Dona_name);
+    INSERT INTO Donor_Name_Index (rowid, Dona_name) VALUES (NEW.rowid, NEW.Dona_name);
+END //
+
+CREATE TRIGGER donor_name_after_delete
+AFTER DELETE ON Donor
+FOR EACH ROW
+BEGIN
+    INSERT INTO Donor_Name_Index (Donor_Name_Index, rowid, Dona_name) VALUES ('delete', OLD.rowid, OLD.Dona_name);
+END //
+DELIMITER ;
@@ -0,0 +1,20 @@
+-- Which storage rows (and so which blood group) back each order, so
+-- orders can be filled from compatible groups and cancellations return
+-- units to where they came from
+
+CREATE TABLE IF NOT EXISTS Order_Allocation (
+    Order_id VARCHAR(20) NOT NULL,
+    Storage_id VARCHAR(20),
+    Blood_grp VARCHAR(3) NOT NULL CHECK (Blood_grp IN ('A+', 'A-', 'B+', 'B-', 'O+', 'O-', 'AB+', 'AB-')),
+    Units INT NOT NULL,
+    Allocated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT chk_allocation_units CHECK (Units > 0),
+    FOREIGN KEY (Order_id) REFERENCES Orders(Order_id)
+);
+
+CREATE INDEX idx_allocation_order ON Order_Allocation (Order_id);
+
+-- Pending orders placed so far had their stock deducted at placement;
+-- the source row was not recorded
+INSERT INTO Order_Allocation (Order_id, Storage_id, Blood_grp, Units)
+SELECT Order_id, NULL, Blood_grp, Quantity FROM Orders WHERE Status = 'Pending';
@@ -0,0 +1,100 @@
+-- Stock tracked per lot (one donation or delivery) with collection and
+-- expiry dates. Storage_House.Quantity becomes the sum of a storage unit's
+-- available lots, kept current by triggers, so everything reading it
+-- (availability totals, change feed) keeps working.
+
+CREATE TABLE IF NOT EXISTS Blood_Lot (
+    Lot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Storage_id VARCHAR(20) NOT NULL,
+    Blood_grp VARCHAR(3) NOT NULL CHECK (Blood_grp IN ('A+', 'A-', 'B+', 'B-', 'O+', 'O-', 'AB+', 'AB-')),
+    Quantity INT NOT NULL,
+    Collected_on DATE NOT NULL DEFAULT (date('now')),
+    -- Red cells keep for 42 days
+    Expires_on DATE NOT NULL DEFAULT (date('now', '+42 days')),
+    Status VARCHAR(10) NOT NULL DEFAULT 'Available' CHECK (Status IN ('Available', 'Expired')),
+    Dona_id VARCHAR(20),
+    Test_id VARCHAR(20),
+    CONSTRAINT chk_lot_quantity CHECK (Quantity >= 0),
+    FOREIGN KEY (Dona_id) REFERENCES Donor(Dona_id),
+    FOREIGN KEY (Test_id) REFERENCES Blood_Test(Test_id)
+);
+
+-- Existing stock becomes one lot per storage unit; its collection date is
+-- unknown, so it is treated as collected today. Loaded before the triggers
+-- exist so Storage_House is not credited twice.
+INSERT INTO Blood_Lot (Storage_id, Blood_grp, Quantity)
+SELECT Storage_id, Blood_grp, Quantity FROM Storage_House WHERE Quantity > 0;
+
+-- First-expiring-first-out allocation within a group
+CREATE INDEX idx_lot_fefo ON Blood_Lot (Blood_grp, Expires_on);
+
+-- Expiry sweep: available lots past their date
+CREATE INDEX idx_lot_sweep ON Blood_Lot (Status, Expires_on);
+
+-- Removing stock from one storage unit, and re-deriving its quantity
+CREATE INDEX idx_lot_storage ON Blood_Lot (Storage_id, Expires_on);
+
+ALTER TABLE Order_Allocation ADD COLUMN Lot_id BIGINT;
+
+DELIMITER //
+-- A lot must hold the same group as the storage unit it goes into
+CREATE TRIGGER lot_group_check_insert
+BEFORE INSERT ON Blood_Lot
+FOR EACH ROW
+WHEN EXISTS (SELECT 1 FROM Storage_House WHERE Storage_id = NEW.Storage_id AND Blood_grp <> NEW.Blood_grp)
+BEGIN
+    SELECT RAISE(ABORT, 'lot blood group does not match its storage unit');
+END //
+
+CREATE TRIGGER lot_group_check_update
+BEFORE UPDATE OF Storage_id, Blood_grp ON Blood_Lot
+FOR EACH ROW
+WHEN EXISTS (SELECT 1 FROM Storage_House WHERE Storage_id = NEW.Storage_id AND Blood_grp <> NEW.Blood_grp)
+BEGIN
+    SELECT RAISE(ABORT, 'lot blood group does not match its storage unit');
+END //
+
+CREATE TRIGGER lot_after_insert
+AFTER INSERT ON Blood_Lot
+FOR EACH ROW
+WHEN NEW.Status = 'Available'
+BEGIN
+    INSERT INTO Storage_House (Storage_id, Blood_grp, Quantity)
+    VALUES (NEW.Storage_id, NEW.Blood_grp, NEW.Quantity)
+    ON CONFLICT (Storage_id) DO UPDATE SET Quantity = Quantity + NEW.Quantity;
+END //
+
+CREATE TRIGGER lot_after_update
+AFTER UPDATE ON Blood_Lot
+FOR EACH ROW
+WHEN (CASE WHEN NEW.Status = 'Available' THEN NEW.Quantity ELSE 0 END)
+  <> (CASE WHEN OLD.Status = 'Available' THEN OLD.Quantity ELSE 0 END)
+BEGIN
+    UPDATE Storage_House
+    SET Quantity = Quantity
+        + (CASE WHEN NEW.Status = 'Available' THEN NEW.Quantity ELSE 0 END)
+        - (CASE WHEN OLD.Status = 'Available' THEN OLD.Quantity ELSE 0 END)
+    WHERE Storage_id = NEW.Storage_id;
+END //
+
+CREATE TRIGGER lot_after_delete
+AFTER DELETE ON Blood_Lot
+FOR EACH ROW
+WHEN OLD.Status = 'Available' AND OLD.Quantity <> 0
+BEGIN
+    UPDATE Storage_House
+    SET Quantity = Quantity - OLD.Quantity
+    WHERE Storage_id = OLD.Storage_id;
+END //
+
+-- Deliveries now arrive as a lot
+DROP TRIGGER IF EXISTS after_supply_insert //
+
+CREATE TRIGGER after_supply_insert
+AFTER INSERT ON Supply
+FOR EACH ROW
+BEGIN
+    INSERT INTO Blood_Lot (Storage_id, Blood_grp, Quantity)
+    VALUES ('SUP' || NEW.Supply_id, NEW.Blood_grp, NEW.Quantity);
+END //
+DELIMITER ;
@@ -0,0 +1,99 @@
+-- One row per donor summarising their test history, kept current by
+-- triggers, so campaign queries read an index instead of aggregating
+-- Blood_Test. A Suitable test counts as a donation; a donor may give
+-- again 90 days after their last one while their latest test is Suitable.
+
+CREATE TABLE IF NOT EXISTS Donor_Eligibility (
+    Dona_id VARCHAR(20) PRIMARY KEY,
+    Blood_grp VARCHAR(3) NOT NULL CHECK (Blood_grp IN ('A+', 'A-', 'B+', 'B-', 'O+', 'O-', 'AB+', 'AB-')),
+    Tests_taken INT NOT NULL DEFAULT 0,
+    Donations INT NOT NULL DEFAULT 0,
+    Last_test_id VARCHAR(20),
+    Last_test_date DATE,
+    Last_result VARCHAR(10) CHECK (Last_result IN ('Suitable', 'Unsuitable')),
+    Last_hb DECIMAL(4,2),
+    Last_donation_date DATE,
+    Eligible_from DATE
+);
+
+INSERT INTO Donor_Eligibility (Dona_id, Blood_grp, Tests_taken, Donations, Last_test_id, Last_test_date,
+                               Last_result, Last_hb, Last_donation_date)
+SELECT d.Dona_id, d.Blood_grp, COALESCE(s.Tests, 0), COALESCE(s.Donations, 0),
+       l.Test_id, l.Test_date, l.Result, l.Hb_level, s.Last_donation
+FROM Donor d
+LEFT JOIN (SELECT Dona_id, COUNT(*) AS Tests, SUM(Result = 'Suitable') AS Donations,
+                  MAX(CASE WHEN Result = 'Suitable' THEN Test_date END) AS Last_donation
+           FROM Blood_Test GROUP BY Dona_id) s ON s.Dona_id = d.Dona_id
+LEFT JOIN (SELECT Dona_id, Test_id, Test_date, Result, Hb_level,
+                  ROW_NUMBER() OVER (PARTITION BY Dona_id ORDER BY Test_date DESC, Test_id DESC) AS Recency
+           FROM Blood_Test) l ON l.Dona_id = d.Dona_id AND l.Recency = 1;
+
+UPDATE Donor_Eligibility
+SET Eligible_from = CASE WHEN Last_result = 'Suitable' THEN date(Last_donation_date, '+90 days') END;
+
+-- Campaign lists: eligible donors of a group, longest-waiting first
+CREATE INDEX idx_eligibility_campaign ON Donor_Eligibility (Blood_grp, Last_result, Eligible_from, Dona_id);
+
+DELIMITER //
+-- SET expressions all see the row as it was before the UPDATE, so the
+-- Last_* fields compare against the previous newest test; Eligible_from
+-- is derived in a second statement from the updated row
+CREATE TRIGGER eligibility_after_test_insert
+AFTER INSERT ON Blood_Test
+FOR EACH ROW
+BEGIN
+    INSERT OR IGNORE INTO Donor_Eligibility (Dona_id, Blood_grp)
+    SELECT Dona_id, Blood_grp FROM Donor WHERE Dona_id = NEW.Dona_id;
+
+    UPDATE Donor_Eligibility
+    SET Tests_taken = Tests_taken + 1,
+        Donations = Donations + (NEW.Result = 'Suitable'),
+        Last_donation_date = CASE
+            WHEN NEW.Result = 'Suitable' AND (Last_donation_date IS NULL OR NEW.Test_date > Last_donation_date)
+            THEN NEW.Test_date ELSE Last_donation_date END,
+        Last_test_id = CASE WHEN Last_test_date IS NULL OR NEW.Test_date > Last_test_date
+            OR (NEW.Test_date = Last_test_date AND NEW.Test_id > Last_test_id) THEN NEW.Test_id ELSE Last_test_id END,
+        Last_test_date = CASE WHEN Last_test_date IS NULL OR NEW.Test_date > Last_test_date
+            OR (NEW.Test_date = Last_test_date AND NEW.Test_id > Last_test_id) THEN NEW.Test_date ELSE Last_test_date END,
+        Last_result = CASE WHEN Last_test_date IS NULL OR NEW.Test_date > Last_test_date
+            OR (NEW.Test_date = Last_test_date AND NEW.Test_id > Last_test_id) THEN NEW.Result ELSE Last_result END,
+        Last_hb = CASE WHEN Last_test_date IS NULL OR NEW.Test_date > Last_test_date
+            OR (NEW.Test_date = Last_test_date AND NEW.Test_id > Last_test_id) THEN NEW.Hb_level ELSE Last_hb END
+    WHERE Dona_id = NEW.Dona_id;
+
+    UPDATE Donor_Eligibility
+    SET Eligible_from = CASE WHEN Last_result = 'Suitable' THEN date(Last_donation_date, '+90 days') END
+    WHERE Dona_id = NEW.Dona_id;
+END //
+
+CREATE TRIGGER eligibility_after_donor_insert
+AFTER INSERT ON Donor
+FOR EACH ROW
+BEGIN
+    INSERT OR IGNORE INTO Donor_Eligibility (Dona_id, Blood_grp) VALUES (NEW.Dona_id, NEW.Blood_grp);
+END //
+
+CREATE TRIGGER eligibility_after_donor_update
+AFTER UPDATE OF Blood_grp ON Donor
+FOR EACH ROW
+WHEN NEW.Blood_grp <> OLD.Blood_grp
+BEGIN
+    UPDATE Donor_Eligibility SET Blood_grp = NEW.Blood_grp WHERE Dona_id = NEW.Dona_id;
+END //
+
+CREATE TRIGGER eligibility_after_donor_delete
+AFTER DELETE ON Donor
+FOR EACH ROW
+BEGIN
+    DELETE FROM Donor_Eligibility WHERE Dona_id = OLD.Dona_id;
+END //
+DELIMITER ;
+
+DROP VIEW IF EXISTS Donor_Information;
+
+CREATE VIEW Donor_Information AS
+SELECT d.Dona_id, d.Dona_name, d.Blood_grp, d.Dona_contact,
+       COALESCE(e.Tests_taken, 0) AS Tests_Taken,
+       COALESCE(e.Donations, 0) AS Suitable_Donations
+FROM Donor d
+LEFT JOIN Donor_Eligibility e ON e.Dona_id = d.Dona_id;
@@ -0,0 +1,110 @@
+import hashlib
+import time
+from collections import namedtuple
+
+from lots import add_lot, allocate_fefo, lock_groups
+
+AllocationResult = namedtuple("AllocationResult", ["placed", "available", "allocations", "latency_ms", "backordered"],
+                              defaults=(False,))
+
+# Serializes orders per group and answers availability without scanning stock;
+# taken before any lot, like lots.lock_groups
+LOCK_TOTAL = "SELECT Total_Units FROM Blood_Availability WHERE Blood_grp = %s FOR UPDATE"
+
+INSERT_ORDER = """
+    INSERT INTO Orders (Order_id, Hosp_id, Blood_grp, Quantity, Status)
+    VALUES (%s, %s, %s, %s, 'Pending')
+"""
+
+INSERT_ALLOCATION = """
+    INSERT INTO Order_Allocation (Order_id, Storage_id, Blood_grp, Units, Lot_id)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+
+# One UPDATE deducting every allocated row via CASE; allocations are (key, take) pairs
+def build_deduction(allocations, table="Storage_House", key="Storage_id"):
+    cases = " ".join("WHEN %s THEN Quantity - %s" for _ in allocations)
+    placeholders = ", ".join(["%s"] * len(allocations))
+    query = (
+        f"UPDATE {table} SET Quantity = CASE {key} {cases} ELSE Quantity END "
+        f"WHERE {key} IN ({placeholders})"
+    )
+    values = [v for row_id, take in allocations for v in (row_id, take)]
+    values += [row_id for row_id, _ in allocations]
+    return query, values
+
+
+# Place an order atomically: lock the group's total and its first-expiring lots,
+# insert the order and deduct from the lots inside the caller's transaction. With
+# backorder, an order that cannot be covered is still recorded, unreserved, for
+# batch fulfilment.
+def place_order(tx, order_id, hosp_id, blood_grp, quantity, backorder=False):
+    started = time.perf_counter()
+    total = tx.fetchone(LOCK_TOTAL, (blood_grp,))
+    available = total["Total_Units"] if total else 0
+    # The total can include lots past their date that the sweep has not reached yet
+    allocations = allocate_fefo(tx, blood_grp, quantity) if available >= quantity else None
+
+    if allocations is None:
+        if backorder:
+            tx.execute(INSERT_ORDER, (order_id, hosp_id, blood_grp, quantity))
+        latency_ms = (time.perf_counter() - started) * 1000
+        return AllocationResult(backorder, available, [], latency_ms, backorder)
+
+    tx.execute(INSERT_ORDER, (order_id, hosp_id, blood_grp, quantity))
+    tx.execute(*build_deduction([(lot_id, take) for lot_id, _, take in allocations], "Blood_Lot", "Lot_id"))
+    tx.executemany(INSERT_ALLOCATION, [(order_id, storage_id, blood_grp, take, lot_id)
+                                       for lot_id, storage_id, take in allocations])
+    latency_ms = (time.perf_counter() - started) * 1000
+    return AllocationResult(True, available, allocations, latency_ms)
+
+
+# Fulfil or cancel a pending order. Cancelled units go back to the lots they
+# were allocated from; allocations without a known lot come back as a new lot.
+# Unreserved (backordered) orders return nothing.
+def update_order_status(tx, order_id, new_status):
+    if new_status == "Cancelled":
+        # Group totals first, then the order and its lots (see lots.lock_groups)
+        groups = tx.fetchall("SELECT Blood_grp FROM Orders WHERE Order_id = %s "
+                             "UNION SELECT Blood_grp FROM Order_Allocation WHERE Order_id = %s", (order_id, order_id))
+        lock_groups(tx, [row["Blood_grp"] for row in groups])
+    order = tx.fetchone(
+        "SELECT Blood_grp, Quantity FROM Orders WHERE Order_id = %s AND Status = 'Pending' FOR UPDATE",
+        (order_id,)
+    )
+    if not order:
+        return False
+
+    tx.execute("UPDATE Orders SET Status = %s WHERE Order_id = %s", (new_status, order_id))
+
+    if new_status == "Cancelled":
+        allocations = tx.fetchall(
+            "SELECT Lot_id, Storage_id, Blood_grp, Units FROM Order_Allocation WHERE Order_id = %s", (order_id,))
+        for allocation in allocations:
+            return_units(tx, order_id, allocation["Lot_id"], allocation["Storage_id"],
+                         allocation["Blood_grp"], allocation["Units"])
+        tx.execute("DELETE FROM Order_Allocation WHERE Order_id = %s", (order_id,))
+    return True
+
+
+# Storage unit created for returned units when the group has none left.
+# Order ids can be as long as a Storage_id, so the id is a short digest.
+def return_storage_id(order_id):
+    return "RET" + hashlib.sha1(order_id.encode()).hexdigest()[:12].upper()
+
+
+# Credit cancelled units back to their lot (even if it has since expired,
+# so expired blood is not revived); otherwise as a fresh lot in the original
+# storage unit, the group's largest one, or a new return unit
+def return_units(tx, order_id, lot_id, storage_id, blood_grp, units):
+    if lot_id and tx.execute("UPDATE Blood_Lot SET Quantity = Quantity + %s WHERE Lot_id = %s", (units, lot_id)):
+        return
+    if not (storage_id and tx.fetchone("SELECT Storage_id FROM Storage_House WHERE Storage_id = %s FOR UPDATE",
+                                       (storage_id,))):
+        target = tx.fetchone(
+            "SELECT Storage_id FROM Storage_House WHERE Blood_grp = %s ORDER BY Quantity DESC, Storage_id LIMIT 1 FOR UPDATE",
+            (blood_grp,)
+        )
+        storage_id = target["Storage_id"] if target else return_storage_id(order_id)
+    add_lot(tx, storage_id, blood_grp, units)
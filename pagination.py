@@ -0,0 +1,179 @@
+from datetime import timedelta
+
+import pandas as pd
+import streamlit as st
+
+from database import cached_query, execute_query
+from validation import BLOOD_GROUPS
+
+DEFAULT_PAGE_SIZE = 50
+
+# Paginated "View" tables. Each sort column is (label, SQL expression); the
+# label must be a column of the select list so a page's last row can seed the
+# next page's seek predicate. "key" is the unique tie-breaker.
+TABLES = {
+    "employees": {
+        "select": "SELECT e.* FROM Employee e",
+        "key": ("Emp_id", "e.Emp_id"),
+        "sorts": [("Emp_id", "e.Emp_id"), ("Emp_name", "e.Emp_name"),
+                  ("Joining_date", "e.Joining_date"), ("Salary", "e.Salary")],
+        "filters": {},
+    },
+    "donors": {
+        "select": "SELECT d.* FROM Donor d",
+        "key": ("Dona_id", "d.Dona_id"),
+        "sorts": [("Dona_id", "d.Dona_id"), ("Dona_name", "d.Dona_name"), ("Blood_grp", "d.Blood_grp")],
+        "filters": {"blood_group": "d.Blood_grp"},
+    },
+    "hospitals": {
+        "select": "SELECT h.* FROM Hospital h",
+        "key": ("Hosp_id", "h.Hosp_id"),
+        "sorts": [("Hosp_id", "h.Hosp_id"), ("Hosp_name", "h.Hosp_name"), ("Location", "h.Location")],
+        "filters": {},
+    },
+    "inventory": {
+        "select": "SELECT s.* FROM Storage_House s",
+        "key": ("Storage_id", "s.Storage_id"),
+        "sorts": [("Storage_id", "s.Storage_id"), ("Quantity", "s.Quantity"), ("Blood_grp", "s.Blood_grp")],
+        "filters": {"blood_group": "s.Blood_grp"},
+    },
+    "lots": {
+        "select": "SELECT l.* FROM Blood_Lot l",
+        "key": ("Lot_id", "l.Lot_id"),
+        "sorts": [("Expires_on", "l.Expires_on"), ("Lot_id", "l.Lot_id"), ("Storage_id", "l.Storage_id"),
+                  ("Quantity", "l.Quantity")],
+        "filters": {"blood_group": "l.Blood_grp", "status": "l.Status", "date": "l.Expires_on"},
+        "statuses": ["Available", "Expired"],
+    },
+    "orders": {
+        "select": """SELECT o.Order_id, h.Hosp_name, o.Blood_grp, o.Quantity, o.Order_date, o.Status
+            FROM Orders o JOIN Hospital h ON o.Hosp_id = h.Hosp_id""",
+        "key": ("Order_id", "o.Order_id"),
+        "sorts": [("Order_date", "o.Order_date"), ("Order_id", "o.Order_id"), ("Quantity", "o.Quantity")],
+        "default_descending": True,
+        "filters": {"blood_group": "o.Blood_grp", "status": "o.Status",
+                    "date": "o.Order_date", "hospital": "o.Hosp_id"},
+        "statuses": ["Pending", "Fulfilled", "Cancelled"],
+    },
+    "supply": {
+        "select": """SELECT s.Supply_id, h.Hosp_name, s.Blood_grp, s.Quantity, s.Supply_date
+            FROM Supply s JOIN Hospital h ON s.Hosp_id = h.Hosp_id""",
+        "key": ("Supply_id", "s.Supply_id"),
+        "sorts": [("Supply_date", "s.Supply_date"), ("Supply_id", "s.Supply_id"), ("Quantity", "s.Quantity")],
+        "default_descending": True,
+        "filters": {"blood_group": "s.Blood_grp", "date": "s.Supply_date", "hospital": "s.Hosp_id"},
+    },
+}
+
+
+# WHERE clauses and params for the chosen filter values
+def build_filters(spec, blood_groups=None, statuses=None, date_range=None, hospitals=None):
+    clauses, params = [], []
+    columns = spec["filters"]
+
+    for name, chosen in (("blood_group", blood_groups), ("status", statuses), ("hospital", hospitals)):
+        if chosen and name in columns:
+            clauses.append(f"{columns[name]} IN ({', '.join(['%s'] * len(chosen))})")
+            params.extend(chosen)
+
+    if date_range and "date" in columns:
+        start, end = date_range
+        clauses.append(f"{columns['date']} >= %s AND {columns['date']} < %s")
+        params.extend([start, end + timedelta(days=1)])
+
+    return clauses, params
+
+
+# Keyset page query: seek past the cursor on (sort column, key) instead of OFFSET
+def build_page_query(spec, sort, descending, clauses, params, cursor, page_size):
+    sort_label, sort_expr = sort
+    key_label, key_expr = spec["key"]
+    clauses, params = list(clauses), list(params)
+    op = "<" if descending else ">"
+    direction = "DESC" if descending else "ASC"
+
+    if cursor is not None:
+        if sort_expr == key_expr:
+            clauses.append(f"{key_expr} {op} %s")
+            params.append(cursor[1])
+        else:
+            clauses.append(f"({sort_expr} {op} %s OR ({sort_expr} = %s AND {key_expr} {op} %s))")
+            params.extend([cursor[0], cursor[0], cursor[1]])
+
+    query = spec["select"]
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    order = f"{sort_expr} {direction}" if sort_expr == key_expr else f"{sort_expr} {direction}, {key_expr} {direction}"
+    query += f" ORDER BY {order} LIMIT {int(page_size) + 1}"
+    return query, params
+
+
+def build_count_query(spec, clauses):
+    from_clause = spec["select"][spec["select"].upper().index(" FROM "):]
+    query = "SELECT COUNT(*) AS total" + from_clause
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    return query
+
+
+# Render filters, sort controls, one page of rows and prev/next navigation
+def paginated_table(name, page_size=DEFAULT_PAGE_SIZE):
+    spec = TABLES[name]
+    columns = spec["filters"]
+    sort_labels = [label for label, _ in spec["sorts"]]
+
+    controls = st.columns([2, 1])
+    sort_label = controls[0].selectbox("Sort by", sort_labels, key=f"{name}_sort")
+    descending = controls[1].checkbox("Descending", value=spec.get("default_descending", False),
+                                      key=f"{name}_desc")
+
+    blood_groups = statuses = hospitals = date_range = None
+    if columns:
+        widgets = iter(st.columns(len(columns)))
+        if "blood_group" in columns:
+            blood_groups = next(widgets).multiselect("Blood group", BLOOD_GROUPS, key=f"{name}_grp")
+        if "status" in columns:
+            statuses = next(widgets).multiselect("Status", spec["statuses"], key=f"{name}_status")
+        if "hospital" in columns:
+            options = [h["Hosp_id"] for h in cached_query("SELECT Hosp_id FROM Hospital", ttl=300) or []]
+            hospitals = next(widgets).multiselect("Hospital", options, key=f"{name}_hosp")
+        if "date" in columns:
+            picked = next(widgets).date_input("Date range", value=(), key=f"{name}_dates")
+            if len(picked) == 2:
+                date_range = picked
+
+    clauses, params = build_filters(spec, blood_groups, statuses, date_range, hospitals)
+    sort = dict(spec["sorts"])[sort_label]
+
+    # Any change to sort or filters starts again from the first page
+    signature = (sort_label, descending, tuple(params))
+    state_key = f"{name}_pages"
+    if st.session_state.get(f"{name}_signature") != signature:
+        st.session_state[f"{name}_signature"] = signature
+        st.session_state[state_key] = [None]
+    cursors = st.session_state[state_key]
+
+    total = cached_query(build_count_query(spec, clauses), params, ttl=60)
+    total = total[0]["total"] if total else 0
+
+    query, page_params = build_page_query(spec, (sort_label, sort), descending, clauses, params,
+                                          cursors[-1], page_size)
+    rows = execute_query(query, page_params, fetch=True) or []
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if rows:
+        st.dataframe(pd.DataFrame(rows))
+    else:
+        st.info("No rows match the current filters.")
+
+    pages = max(1, -(-total // page_size))
+    nav = st.columns([1, 1, 4])
+    if nav[0].button("Previous", key=f"{name}_prev", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if nav[1].button("Next", key=f"{name}_next", disabled=not has_next):
+        last = rows[-1]
+        cursors.append((last[sort_label], last[spec["key"][0]]))
+        st.rerun()
+    nav[2].caption(f"Page {len(cursors)} of {pages} · {total} rows")
@@ -0,0 +1,114 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Tables referenced by a SELECT, used to scope invalidation
+TABLE_PATTERN = re.compile(r"\b(?:FROM|JOIN)\s+`?([A-Za-z_][A-Za-z0-9_]*)`?", re.IGNORECASE)
+
+
+def tables_in(query):
+    return frozenset(name.lower() for name in TABLE_PATTERN.findall(query))
+
+
+# Read-through cache for SELECT results, keyed by (SQL, params) plus the
+# database they came from when that is not the home one.
+# Lives at module level so every Streamlit session and rerun shares it.
+class QueryCache:
+    def __init__(self, max_entries=256, default_ttl=30):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._by_table = {}
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(query, values=None, scope=None):
+        normalized = " ".join(query.split())
+        key = (normalized, tuple(values) if values else None)
+        return key if scope is None else key + (scope,)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, tables, result = entry
+            if expires_at < time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result, ttl=None, tables=None):
+        if tables is None:
+            tables = tables_in(key[0])
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (expires_at, tables, result)
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    # Tables whose contents are maintained from another table (e.g. by
+    # triggers) are invalidated together with their source
+    def add_dependency(self, source, *derived):
+        with self._lock:
+            self._derived.setdefault(source.lower(), set()).update(t.lower() for t in derived)
+
+    # Drop every cached result that read from any of the given tables
+    def invalidate(self, *tables):
+        with self._lock:
+            pending = [table.lower() for table in tables]
+            seen = set()
+            while pending:
+                table = pending.pop()
+                if table in seen:
+                    continue
+                seen.add(table)
+                pending.extend(self._derived.get(table, ()))
+                for key in list(self._by_table.get(table, ())):
+                    self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    # Caller must hold the lock
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for table in entry[1]:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+
+query_cache = QueryCache()
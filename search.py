@@ -0,0 +1,206 @@
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from database import backend
+
+# Search results are cached per compiled plan (SQL + params) in the query cache
+SEARCH_TTL = 30
+SEARCH_LIMIT = 1000
+
+# InnoDB ignores FULLTEXT terms shorter than innodb_ft_min_token_size
+FULLTEXT_MIN_TOKEN = 3
+
+# What each question is about: the base SELECT and which filters it accepts
+SUBJECTS = {
+    "available": {
+        "select": "SELECT Blood_grp, Total_Units FROM Blood_Availability",
+        "group": "Blood_grp",
+        "order": "Total_Units DESC",
+    },
+    "contact": {
+        "select": "SELECT d.Dona_name, d.Dona_contact, d.Blood_grp FROM Donor d",
+        "group": "d.Blood_grp",
+        "name": "d",
+        "order": "d.Dona_name",
+    },
+    "donors": {
+        "select": "SELECT d.Dona_id, d.Dona_name, d.Blood_grp, d.Dona_contact FROM Donor d",
+        "group": "d.Blood_grp",
+        "name": "d",
+        "order": "d.Dona_name",
+    },
+    "orders": {
+        "select": "SELECT o.Order_id, h.Hosp_name, o.Blood_grp, o.Quantity, o.Order_date, o.Status "
+                  "FROM Orders o JOIN Hospital h ON o.Hosp_id = h.Hosp_id",
+        "group": "o.Blood_grp",
+        "hospital": "h",
+        "date": "o.Order_date",
+        "status": "o.Status",
+        "order": "o.Order_date DESC",
+    },
+    "supply": {
+        "select": "SELECT s.Supply_id, h.Hosp_name, s.Blood_grp, s.Quantity, s.Supply_date "
+                  "FROM Supply s JOIN Hospital h ON s.Hosp_id = h.Hosp_id",
+        "group": "s.Blood_grp",
+        "hospital": "h",
+        "date": "s.Supply_date",
+        "order": "s.Supply_date DESC",
+    },
+    "location": {
+        "select": "SELECT Emp_name, BB_address FROM Employee",
+    },
+}
+
+# One automaton picks the subject; the words around it are scanned for filters
+DISPATCH = re.compile(r"""
+    ^(?P<head>.*?)\b
+    (?:
+        (?P<available>available\s+blood|blood\s+availability|stock)
+      | (?P<contact>contacts?\s+(?:of|for))
+      | (?P<donors>donors?|who\s+donated(?:\s+blood)?)
+      | (?P<orders>(?:hospital\s+)?orders?)
+      | (?P<supply>(?:blood\s+)?suppl(?:y|ies))
+      | (?P<location>location\s+of\s+(?:the\s+)?blood\s+bank)
+    )\b(?P<rest>.*)$
+""", re.VERBOSE)
+
+_STOP = r"(?=\s+(?:between|since|after|before|until|in\s+the|last|past|with|named|pending|fulfilled|cancelled|(?:at|from|for|by|to)\s+hospital)\b|$)"
+
+FILTERS = re.compile(rf"""
+    (?P<group>(?<![\w+-])(?:ab|a|b|o)[+-](?![\w+-]))
+  | \b(?P<status>pending|fulfilled|cancelled)\b
+  | \bbetween\s+(?P<start>\d{{4}}-\d{{2}}-\d{{2}})\s+and\s+(?P<end>\d{{4}}-\d{{2}}-\d{{2}})\b
+  | \b(?:since|after)\s+(?P<since>\d{{4}}-\d{{2}}-\d{{2}})\b
+  | \b(?:before|until)\s+(?P<until>\d{{4}}-\d{{2}}-\d{{2}})\b
+  | \b(?:in\s+the\s+)?(?:last|past)\s+(?P<days>\d+)\s+days?\b
+  | \b(?:at|from|for|by|to)\s+hospital\s+(?P<hospital>.+?){_STOP}
+  | \bnamed\s+(?P<name>.+?){_STOP}
+""", re.VERBOSE)
+
+# Connective words that may be left over once filters are removed
+FILLER = frozenset(["show", "list", "find", "get", "with", "of", "in", "and", "for", "the", "blood", "group", "type", "units", "all", "who", "are"])
+
+NAME_WORD = re.compile(r"[a-z0-9]+")
+
+
+# Input sanitization function
+def sanitize_input(input_str):
+    if not input_str:
+        return ""
+    return re.sub(r"[;'\"]", "", input_str.strip())
+
+
+def parse_date(text):
+    return datetime.strptime(text, "%Y-%m-%d").date()
+
+
+# Name match backed by the FULLTEXT (MySQL) or FTS5 prefix (SQLite) index;
+# every word must prefix-match a word of the donor's name
+def name_condition(alias, name, dialect):
+    words = NAME_WORD.findall(name)
+    if not words:
+        return None
+    if dialect == "sqlite":
+        return (f"{alias}.rowid IN (SELECT rowid FROM Donor_Name_Index WHERE Donor_Name_Index MATCH %s)",
+                [" ".join(f'"{word}"*' for word in words)])
+    if min(len(word) for word in words) < FULLTEXT_MIN_TOKEN:
+        # Too short for the FULLTEXT index; each word must still prefix the
+        # name or one of its later words, in any order
+        condition = f"({alias}.Dona_name LIKE %s OR {alias}.Dona_name LIKE %s)"
+        return " AND ".join([condition] * len(words)), [like for word in words for like in (f"{word}%", f"% {word}%")]
+    return (f"MATCH({alias}.Dona_name) AGAINST (%s IN BOOLEAN MODE)",
+            [" ".join(f"+{word}*" for word in words)])
+
+
+# Compile a sanitized question into (sql, params); None when it is not understood.
+# Plans are memoized per (text, dialect, day) since "last N days" depends on today.
+@lru_cache(maxsize=512)
+def compile_query(text, dialect, today):
+    match = DISPATCH.match(text)
+    if not match:
+        return None
+    subject = next(name for name in SUBJECTS if match.group(name))
+    spec = SUBJECTS[subject]
+    rest = f"{match.group('head')} {match.group('rest')}"
+
+    conditions, params = [], []
+    leftover, position = [], 0
+    groups, statuses = [], []
+    for found in FILTERS.finditer(rest):
+        leftover.append(rest[position:found.start()])
+        position = found.end()
+        kind = found.lastgroup
+        if kind == "end":
+            kind = "start"
+        column = {"group": "group", "status": "status", "hospital": "hospital", "name": "name"}.get(kind, "date")
+        if column not in spec:
+            return None
+        if kind == "group":
+            groups.append(found.group("group").upper())
+        elif kind == "status":
+            statuses.append(found.group("status").capitalize())
+        elif kind == "hospital":
+            hospital = found.group("hospital").strip()
+            conditions.append(f"({spec['hospital']}.Hosp_id = %s OR {spec['hospital']}.Hosp_name LIKE %s)")
+            params += [hospital.upper(), hospital + "%"]
+        elif kind == "name":
+            condition = name_condition(spec["name"], found.group("name"), dialect)
+            if condition is None:
+                return None
+            conditions.append(condition[0])
+            params += condition[1]
+        else:
+            try:
+                if kind == "start":
+                    start, end = parse_date(found.group("start")), parse_date(found.group("end"))
+                elif kind == "since":
+                    start, end = parse_date(found.group("since")), None
+                elif kind == "until":
+                    start, end = None, parse_date(found.group("until")) - timedelta(days=1)
+                else:
+                    start, end = today - timedelta(days=int(found.group("days"))), None
+            except ValueError:
+                return None
+            if start:
+                conditions.append(f"{spec['date']} >= %s")
+                params.append(datetime.combine(start, datetime.min.time()))
+            if end:
+                conditions.append(f"{spec['date']} < %s")
+                params.append(datetime.combine(end + timedelta(days=1), datetime.min.time()))
+    leftover.append(rest[position:])
+
+    words = [word for word in " ".join(leftover).split() if word not in FILLER]
+    if subject == "contact":
+        condition = name_condition(spec["name"], " ".join(words), dialect)
+        if condition is None:
+            return None
+        conditions.append(condition[0])
+        params += condition[1]
+    elif words:
+        return None
+
+    if groups:
+        conditions.append(f"{spec['group']} IN ({', '.join(['%s'] * len(groups))})")
+        params += groups
+    if statuses:
+        conditions.append(f"{spec['status']} IN ({', '.join(['%s'] * len(statuses))})")
+        params += statuses
+
+    sql_query = spec["select"]
+    if conditions:
+        sql_query += " WHERE " + " AND ".join(conditions)
+    if "order" in spec:
+        sql_query += f" ORDER BY {spec['order']}"
+    sql_query += f" LIMIT {SEARCH_LIMIT}"
+    return sql_query, tuple(params) or None
+
+
+# Improved query processing with parameterized queries
+def process_query(user_query, dialect=None):
+    text = " ".join(sanitize_input(user_query.lower()).split())
+    plan = compile_query(text, dialect or backend.dialect, date.today())
+    if plan is None:
+        return None
+    sql_query, params = plan
+    return (sql_query, list(params) if params else None)
@@ -0,0 +1,239 @@
+import argparse
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from backends import config_from_env, create_backend
+from query_cache import query_cache
+
+# Each blood bank site (an Employee BB_id) keeps its Storage_House, lots,
+# Orders and Supply in its own database. BB_SITES lists the site ids;
+# BB_SITE_<id>_<VAR> overrides BB_<VAR> for that site's connection, e.g.
+# BB_SITE_2_DB_HOST or BB_SITE_2_SQLITE_PATH, and BB_SITE_<id>_LOCATION is
+# matched against Hospital.Location to find the nearest site. With more
+# than one site, order ids carry their site as a prefix, e.g. 2-ORD100.
+SITE_IDS = [site.strip() for site in os.environ.get("BB_SITES", "1").split(",") if site.strip()]
+HOME_SITE = os.environ.get("BB_HOME_SITE", SITE_IDS[0])
+FANOUT_TIMEOUT_MS = int(os.environ.get("BB_SITE_TIMEOUT_MS", "2000"))
+SITE_WORKERS = int(os.environ.get("BB_SITE_WORKERS", "2"))
+ORDER_ID_LENGTH = 20  # Orders.Order_id VARCHAR(20)
+
+SITE_STOCK_QUERY = "SELECT Blood_grp, Total_Units FROM Blood_Availability"
+
+UPSERT_HOSPITAL = """
+    INSERT INTO Hospital (Hosp_id, Hosp_name, Location) VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE Hosp_name = VALUES(Hosp_name), Location = VALUES(Location)
+"""
+
+# Per-group totals summed over the sites that answered in time; by_site maps
+# each of those to its own totals, missing maps the rest to the reason
+SiteAvailability = namedtuple("SiteAvailability", ["totals", "by_site", "missing", "elapsed_ms"])
+
+
+# Connection settings for one site: BB_SITE_<id>_* on top of the BB_* defaults
+def site_config(site_id, environ=os.environ):
+    prefix = f"BB_SITE_{site_id}_"
+    overlay = dict(environ)
+    overlay.update({"BB_" + key[len(prefix):]: value for key, value in environ.items() if key.startswith(prefix)})
+    config = config_from_env(overlay)
+    config["pool_name"] = f"bb_pool_site{site_id}"
+    return config
+
+
+class Site:
+    def __init__(self, site_id, environ=os.environ):
+        self.site_id = site_id
+        self.name = environ.get(f"BB_SITE_{site_id}_NAME", f"Site {site_id}")
+        self.location = environ.get(f"BB_SITE_{site_id}_LOCATION")
+        self.home = site_id == HOME_SITE
+        self._environ = environ
+        self._backend = None
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(SITE_WORKERS)
+        self._lock = threading.Lock()
+
+    # The home site shares the app's pool; others get their own, created on first use
+    @property
+    def backend(self):
+        with self._lock:
+            if self._backend is None:
+                if self.home:
+                    from database import backend
+                    self._backend = backend
+                else:
+                    from migrations import ensure_migrated
+                    backend = create_backend(site_config(self.site_id, self._environ))
+                    ensure_migrated(backend)
+                    self._backend = backend
+        return self._backend
+
+    # Run fn(self) on this site's own pool of SITE_WORKERS threads. Returns
+    # None rather than queueing when they are all still busy, e.g. stuck on
+    # a site that stopped answering, so other sites' calls never wait on it.
+    def submit(self, fn):
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=SITE_WORKERS,
+                                                        thread_name_prefix=f"site-{self.site_id}")
+            future = self._executor.submit(fn, self)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def __repr__(self):
+        return f"Site({self.site_id!r}, {self.name!r})"
+
+
+SITES = {site_id: Site(site_id) for site_id in SITE_IDS}
+
+
+# The site this app manages, whose database is the BB_DB_* one
+def home_site():
+    return SITES[HOME_SITE]
+
+
+# The order id as stored at site: prefixed with the site id when there are
+# several sites, so ids stay unique across their databases
+def qualify_order_id(site, order_id):
+    if len(SITES) == 1 or order_site(order_id) == site.site_id:
+        return order_id
+    return f"{site.site_id}-{order_id}"
+
+
+# Id of the site an order id was placed at, or None for an unprefixed id
+def order_site(order_id):
+    site_id, sep, _ = order_id.partition("-")
+    return site_id if sep and site_id in SITES else None
+
+
+# The site holding an order: the one named by its prefix, else default
+def site_for_order(order_id, default=None):
+    site_id = order_site(order_id)
+    return SITES[site_id] if site_id else default or home_site()
+
+
+# Run fn(tx) in a transaction at site. The hospital row, when given, is
+# copied there first so the site's Orders and Supply foreign keys hold.
+def run_at(site, fn, name=None, hospital=None):
+    from database import transaction
+
+    with transaction(name, db=site.backend) as tx:
+        if hospital and not site.home:
+            tx.execute(UPSERT_HOSPITAL, (hospital["Hosp_id"], hospital["Hosp_name"], hospital["Location"]))
+        return fn(tx)
+
+
+def _site_stock(site):
+    from database import transaction
+
+    with transaction(f"site_stock_{site.site_id}", db=site.backend) as tx:
+        return {row["Blood_grp"]: int(row["Total_Units"]) for row in tx.fetchall(SITE_STOCK_QUERY)}
+
+
+# Query every site's Blood_Availability concurrently and merge the totals.
+# Sites that fail, have not answered after timeout_ms or are still busy with
+# earlier queries are left out and reported in missing; started queries
+# finish in the background.
+def site_availability(sites=None, timeout_ms=FANOUT_TIMEOUT_MS):
+    started = time.perf_counter()
+    totals, by_site, missing = {}, {}, {}
+    futures = {}
+    for site in sites or SITES.values():
+        future = site.submit(_site_stock)
+        if future is None:
+            missing[site.site_id] = f"busy: all {SITE_WORKERS} worker(s) still on earlier queries"
+        else:
+            futures[future] = site
+    done, pending = wait(futures, timeout=timeout_ms / 1000)
+
+    for future in done:
+        site = futures[future]
+        try:
+            stock = future.result()
+        except Exception as err:
+            missing[site.site_id] = f"error: {err}"
+            continue
+        by_site[site.site_id] = stock
+        for blood_grp, units in stock.items():
+            totals[blood_grp] = totals.get(blood_grp, 0) + units
+    for future in pending:
+        missing[futures[future].site_id] = f"no answer within {timeout_ms} ms"
+    return SiteAvailability(totals, by_site, missing, (time.perf_counter() - started) * 1000)
+
+
+# Sites holding at least quantity units of the group, nearest first: those
+# at the hospital's location, then the rest in BB_SITES order
+def nearest_sites(availability, blood_grp, quantity, location=None):
+    order = list(SITES)
+    candidates = [site_id for site_id, stock in availability.by_site.items()
+                  if stock.get(blood_grp, 0) >= quantity]
+    return [SITES[site_id] for site_id in
+            sorted(candidates, key=lambda site_id: (location is None or SITES[site_id].location != location,
+                                                    order.index(site_id)))]
+
+
+# Place an order against a site's stock, under its site-qualified id
+def place_order_at(site, order_id, hospital, blood_grp, quantity, backorder=False):
+    from order_engine import place_order
+
+    order_id = qualify_order_id(site, order_id)
+    result = run_at(site, lambda tx: place_order(tx, order_id, hospital["Hosp_id"], blood_grp, quantity, backorder),
+                    "place_order" if site.home else "place_order_remote", hospital)
+    query_cache.invalidate("Orders", "Blood_Lot", "Order_Allocation")
+    return result
+
+
+# Try each candidate site in turn until one allocates the order; stock can
+# move between the fan-out and the order. Returns (site, result) or (None, None).
+def source_order(order_id, hospital, blood_grp, quantity, timeout_ms=FANOUT_TIMEOUT_MS):
+    availability = site_availability(timeout_ms=timeout_ms)
+    for site in nearest_sites(availability, blood_grp, quantity, hospital["Location"]):
+        result = place_order_at(site, order_id, hospital, blood_grp, quantity)
+        if result.placed:
+            return site, result
+    return None, None
+
+
+def main():
+    from migrations import ensure_migrated
+
+    parser = argparse.ArgumentParser(description="Blood bank sites")
+    parser.add_argument("command", choices=["list", "availability", "migrate"])
+    parser.add_argument("--timeout-ms", type=int, default=FANOUT_TIMEOUT_MS)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for site in SITES.values():
+            config = config_from_env() if site.home else site_config(site.site_id)
+            target = config["sqlite_path"] if config["backend"] == "sqlite" else \
+                f"{config['host']}:{config['port']}/{config['database']}"
+            print(f"{site.site_id}: {site.name} ({site.location or 'no location'}) -> {config['backend']} "
+                  f"{target}{' [home]' if site.home else ''}")
+    elif args.command == "migrate":
+        for site in SITES.values():
+            # A fresh backend, since Site.backend migrates remote sites on first use
+            try:
+                applied = ensure_migrated(site.backend if site.home else create_backend(site_config(site.site_id)))
+            except Exception as err:
+                print(f"{site.site_id}: failed ({err})")
+                continue
+            print(f"{site.site_id}: {len(applied)} migration(s) applied")
+    else:
+        result = site_availability(timeout_ms=args.timeout_ms)
+        for site_id, stock in sorted(result.by_site.items()):
+            print(f"{site_id}: " + ", ".join(f"{grp}={units}" for grp, units in sorted(stock.items())))
+        for site_id, reason in sorted(result.missing.items()):
+            print(f"{site_id}: missing ({reason})")
+        print("total: " + ", ".join(f"{grp}={units}" for grp, units in sorted(result.totals.items())))
+        print(f"in {result.elapsed_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from database import backend, stream_query, transaction
+
+SNAPSHOT_DIR = os.environ.get("BB_SNAPSHOT_DIR", "snapshots")
+CHUNK_ROWS = int(os.environ.get("BB_SNAPSHOT_CHUNK", "50000"))
+
+# Home database tables exported for reporting. Each is written as one Parquet
+# file per month of its "watermark" column
+# (<dir>/<name>/month=YYYY-MM/data.parquet). "key" is the column the change
+# feed reports as Row_id.
+DATASETS = {
+    "orders": {
+        "table": "Orders",
+        "key": "Order_id",
+        "watermark": "Order_date",
+        "columns": [("Order_id", "string"), ("Hosp_id", "string"), ("Blood_grp", "string"),
+                    ("Quantity", "int32"), ("Order_date", "timestamp"), ("Status", "string")],
+    },
+    "supply": {
+        "table": "Supply",
+        "key": "Supply_id",
+        "watermark": "Supply_date",
+        "columns": [("Supply_id", "string"), ("Hosp_id", "string"), ("Blood_grp", "string"),
+                    ("Quantity", "int32"), ("Supply_date", "timestamp")],
+    },
+}
+
+# Exports of the same dataset from several app sessions run one at a time
+_export_locks = {name: threading.Lock() for name in DATASETS}
+
+ExportResult = namedtuple("ExportResult", ["dataset", "rows", "months", "watermark", "full", "duration_s"])
+
+
+def _arrow_schema(spec):
+    import pyarrow as pa
+
+    types = {"string": pa.string(), "int32": pa.int32(), "timestamp": pa.timestamp("s")}
+    return pa.schema([(name, types[kind]) for name, kind in spec["columns"]])
+
+
+def dataset_dir(name, root=None):
+    return os.path.join(root or SNAPSHOT_DIR, name)
+
+
+def _state_path(name, root=None):
+    return os.path.join(dataset_dir(name, root), "_watermark.json")
+
+
+# Newest watermark value and change event exported so far, with row counts;
+# None before the first export
+def read_state(name, root=None):
+    try:
+        with open(_state_path(name, root)) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    state["watermark"] = datetime.fromisoformat(state["watermark"]) if state["watermark"] else None
+    return state
+
+
+# Temp file name unique to this writer, so concurrent exports (other
+# processes included) never write into each other's files before os.replace
+def _temp_path(path):
+    head, tail = os.path.split(path)
+    return os.path.join(head, f".{tail}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+
+
+def _write_state(name, state, root=None):
+    path = _state_path(name, root)
+    temp = _temp_path(path)
+    with open(temp, "w") as f:
+        json.dump(dict(state, watermark=state["watermark"].isoformat() if state["watermark"] else None), f)
+    os.replace(temp, path)
+
+
+# (first day, first day of the next month) of month, given as YYYY-MM
+def _month_range(month):
+    start = datetime.strptime(month, "%Y-%m")
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+
+# Months holding rows of the table changed after change event since: where
+# those rows are now, and where the last export put them (for rows moved to
+# another month or deleted). Returns (months, latest event id), or
+# (None, latest) when events after since may have been pruned.
+def _changed_months(name, since, root=None):
+    spec = DATASETS[name]
+    with transaction(f"snapshot_changes_{name}", db=backend) as tx:
+        events = tx.fetchone("SELECT MIN(Event_id) AS oldest, MAX(Event_id) AS latest FROM Change_Event")
+        latest = events["latest"] or since or 0
+        if since is None or (events["oldest"] is not None and events["oldest"] > since + 1):
+            return None, latest
+        ids = [row["Row_id"] for row in tx.fetchall(
+            "SELECT DISTINCT Row_id FROM Change_Event WHERE Table_name = %s AND Event_id > %s AND Event_id <= %s",
+            (spec["table"], since, latest))]
+        months = set()
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            rows = tx.fetchall(f"SELECT {spec['watermark']} AS Stamp FROM {spec['table']} "
+                               f"WHERE {spec['key']} IN ({', '.join(['%s'] * len(batch))})", batch)
+            months.update(f"{row['Stamp']:%Y-%m}" for row in rows if row["Stamp"])
+    exported = load(name, ["month", spec["key"]], root) if ids else None
+    if exported is not None:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        hits = exported.filter(pc.is_in(exported[spec["key"]], value_set=pa.array(ids, pa.string())))
+        months.update(str(month) for month in hits["month"].to_pylist())
+    return months, latest
+
+
+# Stream one table into monthly Parquet files. A full export rewrites every
+# month; otherwise the month holding the last watermark and anything newer
+# is re-read, plus every older month the change feed shows rows were
+# inserted into, changed in or removed from since the last export (late
+# status changes, backdated rows). Other closed months stay untouched. Supply
+# rows are only ever inserted, so inserts are all its feed reports.
+def export_dataset(name, full=False, chunk_rows=CHUNK_ROWS, root=None):
+    with _export_locks[name]:
+        return _export_dataset(name, full, chunk_rows, root)
+
+
+def _export_dataset(name, full, chunk_rows, root):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    started = time.perf_counter()
+    spec = DATASETS[name]
+    schema = _arrow_schema(spec)
+    column_names = [col for col, _ in spec["columns"]]
+    mark = spec["watermark"]
+    target = dataset_dir(name, root)
+    state = None if full else read_state(name, root)
+    changed, event_id = _changed_months(name, state.get("event_id") if state else None, root)
+    if changed is None:
+        state = None
+
+    query = f"SELECT {', '.join(column_names)} FROM {spec['table']}"
+    values = None
+    rewritten = set()
+    if state and state["watermark"]:
+        open_month = f"{state['watermark']:%Y-%m}"
+        closed = sorted(month for month in changed if month < open_month)
+        rewritten = set(closed) | {open_month}
+        ranges = [_month_range(month) for month in closed]
+        query += " WHERE " + " OR ".join([f"{mark} >= %s"] + [f"({mark} >= %s AND {mark} < %s)"] * len(ranges))
+        values = [_month_range(open_month)[0]] + [bound for pair in ranges for bound in pair]
+    else:
+        shutil.rmtree(target, ignore_errors=True)
+    query += f" ORDER BY {mark}"
+    os.makedirs(target, exist_ok=True)
+
+    mark_pos = column_names.index(mark)
+    writer = month = temp = None
+    rows = 0
+    months = []
+    watermark = state["watermark"] if state else None
+
+    def finish():
+        writer.close()
+        os.replace(temp, os.path.join(target, f"month={month}", "data.parquet"))
+
+    try:
+        for _, chunk in stream_query(query, values, chunk_rows, db=backend):
+            columns = list(zip(*chunk))
+            stamps = columns[mark_pos]
+            # Rows arrive in watermark order, so each month is one contiguous run
+            keys = [f"{stamp:%Y-%m}" if stamp else "unknown" for stamp in stamps]
+            start = 0
+            while start < len(chunk):
+                key = keys[start]
+                end = start
+                while end < len(chunk) and keys[end] == key:
+                    end += 1
+                if key != month:
+                    if writer:
+                        finish()
+                    month = key
+                    months.append(month)
+                    os.makedirs(os.path.join(target, f"month={month}"), exist_ok=True)
+                    temp = _temp_path(os.path.join(target, f"month={month}", "data.parquet"))
+                    writer = pq.ParquetWriter(temp, schema)
+                writer.write_table(pa.table([pa.array(col[start:end], type=field.type)
+                                             for col, field in zip(columns, schema)], schema=schema))
+                start = end
+            rows += len(chunk)
+            if stamps[-1] and (watermark is None or stamps[-1] > watermark):
+                watermark = stamps[-1]
+        if writer:
+            finish()
+            writer = None
+    finally:
+        if writer:
+            writer.close()
+            os.remove(temp)
+    # Months re-read that no longer hold any row
+    for month in rewritten - set(months):
+        shutil.rmtree(os.path.join(target, f"month={month}"), ignore_errors=True)
+
+    # Row counts come from the Parquet footers, so no file is read in full
+    total = sum(pq.ParquetFile(os.path.join(target, entry, "data.parquet")).metadata.num_rows
+                for entry in os.listdir(target) if entry.startswith("month="))
+    _write_state(name, {"watermark": watermark, "event_id": event_id, "rows": total,
+                        "exported_at": datetime.now().isoformat(timespec="seconds")}, root)
+    return ExportResult(name, rows, months, watermark, state is None, time.perf_counter() - started)
+
+
+def export_all(full=False, chunk_rows=CHUNK_ROWS, root=None):
+    return [export_dataset(name, full, chunk_rows, root) for name in DATASETS]
+
+
+# Memory-mapped Arrow table over every month of a dataset; None if never exported
+def load(name, columns=None, root=None):
+    import pyarrow.parquet as pq
+
+    target = dataset_dir(name, root)
+    if not os.path.isdir(target) or read_state(name, root) is None:
+        return None
+    return pq.read_table(target, columns=columns, partitioning="hive", memory_map=True)
+
+
+# Units ordered per month and blood group, excluding cancelled orders
+def monthly_demand(root=None):
+    import pyarrow.compute as pc
+
+    table = load("orders", ["month", "Blood_grp", "Quantity", "Status"], root)
+    if table is None:
+        return None
+    table = table.filter(pc.not_equal(table["Status"], "Cancelled"))
+    return (table.group_by(["month", "Blood_grp"]).aggregate([("Quantity", "sum")])
+            .to_pandas().rename(columns={"Quantity_sum": "Units"})
+            .pivot(index="month", columns="Blood_grp", values="Units").fillna(0).astype(int).sort_index())
+
+
+# Units fulfilled and supplied per hospital and blood group
+def hospital_consumption(root=None):
+    import pyarrow.compute as pc
+
+    orders = load("orders", ["Hosp_id", "Blood_grp", "Quantity", "Status"], root)
+    if orders is None:
+        return None
+    orders = orders.filter(pc.equal(orders["Status"], "Fulfilled"))
+    consumed = (orders.group_by(["Hosp_id", "Blood_grp"]).aggregate([("Quantity", "sum"), ("Quantity", "count")])
+                .to_pandas().rename(columns={"Quantity_sum": "Units_used", "Quantity_count": "Orders"}))
+    supply = load("supply", ["Hosp_id", "Blood_grp", "Quantity"], root)
+    if supply is not None:
+        supplied = (supply.group_by(["Hosp_id", "Blood_grp"]).aggregate([("Quantity", "sum")])
+                    .to_pandas().rename(columns={"Quantity_sum": "Units_supplied"}))
+        consumed = consumed.merge(supplied, on=["Hosp_id", "Blood_grp"], how="outer").fillna(0)
+    return consumed.sort_values(["Hosp_id", "Blood_grp"], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export Orders and Supply to monthly Parquet snapshots")
+    parser.add_argument("datasets", nargs="*", metavar="dataset", help=f"{', '.join(DATASETS)} (default: all)")
+    parser.add_argument("--full", action="store_true", help="rewrite every month instead of appending")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--dir", default=SNAPSHOT_DIR)
+    args = parser.parse_args()
+    unknown = set(args.datasets) - DATASETS.keys()
+    if unknown:
+        parser.error(f"unknown dataset(s): {', '.join(sorted(unknown))}")
+
+    for name in args.datasets or DATASETS:
+        result = export_dataset(name, args.full, args.chunk_rows, args.dir)
+        print(f"{name}: {result.rows} rows over {len(result.months)} month(s) in {result.duration_s:.2f}s "
+              f"({'full' if result.full else 'incremental'}), watermark {result.watermark}")
+
+
+if __name__ == "__main__":
+    main()
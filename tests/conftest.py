@@ -0,0 +1,49 @@
+import os
+import tempfile
+
+import pytest
+
+# The app's modules pick their database from the environment when first
+# imported, so point them at a throwaway SQLite file before any test does
+os.environ.update({
+    "BB_DB_BACKEND": "sqlite",
+    "BB_SQLITE_PATH": os.path.join(tempfile.mkdtemp(prefix="blood_bank_tests_"), "blood_bank.db"),
+    "BB_SITES": "1",
+    "BB_EXPIRY_SWEEP_MINUTES": "0",
+})
+os.environ.pop("BB_HOME_SITE", None)
+
+# Emptied before each test, children before parents
+DATA_TABLES = ["Order_Allocation", "Orders", "Supply", "Blood_Lot", "Blood_Test", "Donor", "Storage_House", "Hospital",
+               "Change_Event"]
+
+
+@pytest.fixture(scope="session")
+def migrated():
+    from migrations import ensure_migrated
+
+    ensure_migrated()
+
+
+# A migrated database with no orders, stock or hospitals left by earlier tests
+@pytest.fixture
+def db(migrated):
+    from database import transaction
+
+    with transaction("test_reset") as tx:
+        for table in DATA_TABLES:
+            tx.execute(f"DELETE FROM {table}")
+        tx.execute("INSERT INTO Hospital (Hosp_id, Hosp_name, Location) VALUES ('HOS1', 'City Hospital', 'Delhi')")
+
+
+# Units per group in the trigger-maintained Blood_Availability table
+@pytest.fixture
+def availability(db):
+    from database import transaction
+
+    def read(blood_grp):
+        with transaction("test_availability") as tx:
+            row = tx.fetchone("SELECT Total_Units FROM Blood_Availability WHERE Blood_grp = %s", (blood_grp,))
+        return row["Total_Units"] if row else 0
+
+    return read
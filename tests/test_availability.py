@@ -0,0 +1,108 @@
+from datetime import date, timedelta
+
+import pytest
+
+from availability import check_consistency, rebuild
+from database import DatabaseError, transaction
+from inventory import record_supply, remove_stock
+from lots import INSERT_LOT, add_lot, expire_lots
+
+
+def storage_units(storage_id):
+    with transaction() as tx:
+        row = tx.fetchone("SELECT Quantity FROM Storage_House WHERE Storage_id = %s", (storage_id,))
+    return row["Quantity"] if row else None
+
+
+def test_lots_maintain_storage_and_availability(availability):
+    with transaction() as tx:
+        add_lot(tx, "STO1", "A+", 3)
+        add_lot(tx, "STO1", "A+", 2)
+        add_lot(tx, "STO2", "A+", 4)
+    assert storage_units("STO1") == 5
+    assert availability("A+") == 9
+
+    with transaction() as tx:
+        remove_stock(tx, "STO1", 4)
+    assert storage_units("STO1") == 1
+    assert availability("A+") == 5
+
+
+def test_supply_arrives_as_a_lot(availability):
+    with transaction() as tx:
+        record_supply(tx, "SUP1", "HOS1", "O+", 6)
+        lot = tx.fetchone("SELECT Storage_id, Quantity FROM Blood_Lot WHERE Blood_grp = 'O+'")
+    assert lot == {"Storage_id": "SUPSUP1", "Quantity": 6}
+    assert availability("O+") == 6
+
+
+def test_expired_lots_leave_availability(availability):
+    today = date.today()
+    with transaction() as tx:
+        add_lot(tx, "STO1", "B+", 3, collected_on=today - timedelta(days=50), expires_on=today - timedelta(days=1))
+        add_lot(tx, "STO1", "B+", 2)
+    assert expire_lots(today) == (1, 3)
+    assert storage_units("STO1") == 2
+    assert availability("B+") == 2
+
+
+def test_lot_of_another_group_is_rejected(db):
+    today = date.today()
+    with transaction() as tx:
+        add_lot(tx, "STO1", "A+", 3)
+    with pytest.raises(DatabaseError):
+        with transaction() as tx:
+            tx.execute(INSERT_LOT, ("STO1", "B+", 1, today, today + timedelta(days=42), None, None))
+    with pytest.raises(ValueError):
+        with transaction() as tx:
+            add_lot(tx, "STO1", "B+", 1)
+    assert storage_units("STO1") == 3
+
+
+def test_rebuild_repairs_drift(availability):
+    with transaction() as tx:
+        add_lot(tx, "STO1", "AB-", 3)
+        tx.execute("UPDATE Blood_Availability SET Total_Units = 99 WHERE Blood_grp = 'AB-'")
+        assert check_consistency(tx) == [{"Blood_grp": "AB-", "Summary_units": 99, "Actual_units": 3}]
+        rebuild(tx)
+        assert check_consistency(tx) == []
+    assert availability("AB-") == 3
+
+
+# Every stock path must lock Blood_Availability before Blood_Lot, the order
+# place_order uses, so MySQL cannot deadlock between them
+def test_stock_paths_lock_totals_before_lots(db, monkeypatch):
+    import database
+    from fulfilment import run_fulfilment
+    from order_engine import place_order, update_order_status
+
+    with transaction() as tx:
+        add_lot(tx, "STO1", "A+", 5)
+        place_order(tx, "ORD1", "HOS1", "A+", 2)
+        place_order(tx, "ORD2", "HOS1", "A+", 9, backorder=True)
+
+    locks = []
+    run = database.Transaction._run
+
+    def record(self, query, *args, **kwargs):
+        if "FOR UPDATE" in query:
+            locks.append("Blood_Availability" if "FROM Blood_Availability" in query else
+                         "Blood_Lot" if "FROM Blood_Lot" in query else "other")
+        return run(self, query, *args, **kwargs)
+
+    monkeypatch.setattr(database.Transaction, "_run", record)
+    paths = [
+        lambda tx: place_order(tx, "ORD3", "HOS1", "A+", 1),
+        lambda tx: update_order_status(tx, "ORD1", "Cancelled"),
+        lambda tx: remove_stock(tx, "STO1", 1),
+        lambda tx: add_lot(tx, "STO1", "A+", 1),
+        lambda tx: run_fulfilment(tx, "fifo"),
+    ]
+    for path in paths:
+        locks.clear()
+        with transaction() as tx:
+            path(tx)
+        assert locks and locks[0] == "Blood_Availability"
+    locks.clear()
+    expire_lots(date.today())
+    assert locks[0] == "Blood_Availability"
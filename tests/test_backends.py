@@ -0,0 +1,46 @@
+from backends import translate_to_sqlite
+
+
+def test_for_update_is_dropped():
+    assert translate_to_sqlite("SELECT Quantity FROM Blood_Lot WHERE Lot_id = %s FOR UPDATE") == \
+        "SELECT Quantity FROM Blood_Lot WHERE Lot_id = ?"
+
+
+def test_multiline_for_update_is_dropped():
+    query = """
+        SELECT Lot_id FROM Blood_Lot
+        LIMIT %s
+        FOR UPDATE
+    """
+    assert "FOR UPDATE" not in translate_to_sqlite(query)
+
+
+def test_greatest_and_least_become_max_and_min():
+    assert translate_to_sqlite("UPDATE Storage_House SET Quantity = GREATEST(Quantity - %s, 0)") == \
+        "UPDATE Storage_House SET Quantity = MAX(Quantity - ?, 0)"
+    assert translate_to_sqlite("SELECT least(a, b) FROM t") == "SELECT MIN(a, b) FROM t"
+
+
+def test_on_duplicate_key_becomes_on_conflict():
+    query = ("INSERT INTO Hospital (Hosp_id, Hosp_name, Location) VALUES (%s, %s, %s) "
+             "ON DUPLICATE KEY UPDATE Hosp_name = VALUES(Hosp_name), Location = VALUES(Location)")
+    assert translate_to_sqlite(query) == (
+        "INSERT INTO Hospital (Hosp_id, Hosp_name, Location) VALUES (?, ?, ?) "
+        "ON CONFLICT DO UPDATE SET Hosp_name = excluded.Hosp_name, Location = excluded.Location")
+
+
+def test_placeholders_become_question_marks():
+    assert translate_to_sqlite("SELECT * FROM Orders WHERE Hosp_id = %s AND Quantity > %s") == \
+        "SELECT * FROM Orders WHERE Hosp_id = ? AND Quantity > ?"
+
+
+def test_upsert_runs_on_sqlite(db):
+    from database import transaction
+
+    upsert = ("INSERT INTO Hospital (Hosp_id, Hosp_name, Location) VALUES (%s, %s, %s) "
+              "ON DUPLICATE KEY UPDATE Hosp_name = VALUES(Hosp_name), Location = VALUES(Location)")
+    with transaction() as tx:
+        tx.execute(upsert, ("HOS1", "City Hospital", "Mumbai"))
+        tx.execute(upsert, ("HOS2", "Rural Clinic", "Pune"))
+        rows = tx.fetchall("SELECT Hosp_id, Location FROM Hospital ORDER BY Hosp_id")
+    assert rows == [{"Hosp_id": "HOS1", "Location": "Mumbai"}, {"Hosp_id": "HOS2", "Location": "Pune"}]
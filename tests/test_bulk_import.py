@@ -0,0 +1,80 @@
+import io
+
+import pandas as pd
+
+from bulk_import import ENTITIES, import_file, validate_chunk
+from database import transaction
+
+
+def csv(*lines):
+    return io.StringIO("\n".join(lines) + "\n")
+
+
+def chunk(*lines):
+    frame = pd.read_csv(csv(*lines), dtype=str, keep_default_na=False)
+    frame.index = range(2, 2 + len(frame))
+    return frame
+
+
+def rejections(report):
+    return {row.Row: row.Reason for row in report.rejections().itertuples()}
+
+
+def test_chunk_checks_every_row():
+    rows = chunk("Dona_id,Dona_name,Blood_grp,Dona_contact",
+                 "DON1,Alice,a+,9876543210",
+                 "DON-2,Bob,B+,9876543210",
+                 "DON3,Carol,C+,9876543210",
+                 "DON4,Dan,O-,12345",
+                 "DON5,,O-,9876543210")
+    reasons = validate_chunk(rows, ENTITIES["donors"], set())
+    assert reasons.tolist() == ["", "invalid Dona_id (letters and numbers only)", "invalid Blood_grp",
+                                "invalid Dona_contact (10 digits)", "Dona_name is required"]
+    assert rows.loc[2, "Blood_grp"] == "A+"
+
+
+def test_chunk_without_a_column_is_rejected():
+    reasons = validate_chunk(chunk("Supply_id,Hosp_id,Blood_grp", "SUP1,HOS1,A+"), ENTITIES["supply"], set())
+    assert reasons.tolist() == ["missing column(s): Quantity"]
+
+
+def test_duplicate_keys_are_rejected():
+    rows = chunk("Supply_id,Hosp_id,Blood_grp,Quantity",
+                 "SUP1,HOS1,A+,2", "SUP1,HOS1,A+,3", "SUP2,HOS1,A+,1", "SUP3,HOS1,A+,0")
+    seen_keys = {"SUP2"}
+    reasons = validate_chunk(rows, ENTITIES["supply"], seen_keys)
+    assert reasons.tolist() == ["", "duplicate Supply_id in file", "duplicate Supply_id in file",
+                                "Quantity must be a positive whole number"]
+    assert seen_keys == {"SUP2"}
+
+
+def test_corrected_row_after_an_invalid_one_is_loaded():
+    rows = chunk("Dona_id,Dona_name,Blood_grp,Dona_contact",
+                 "DON1,Alice,A+,98765", "DON1,Alice,A+,9876543210")
+    assert validate_chunk(rows, ENTITIES["donors"], set()).tolist() == ["invalid Dona_contact (10 digits)", ""]
+
+
+# A row the database rejects in one chunk must not make its corrected
+# copy in a later chunk a duplicate
+def test_keys_count_as_seen_once_their_chunk_commits(db):
+    report = import_file(csv("Supply_id,Hosp_id,Blood_grp,Quantity",
+                             "SUP1,HOS9,A+,2",
+                             "SUP1,HOS1,A+,2",
+                             "SUP1,HOS1,A+,2"), "supply", chunksize=1, filename="supply.csv")
+    assert (report.loaded, report.rejected, report.chunks) == (1, 2, 3)
+    assert rejections(report) == {2: "unknown Hosp_id", 4: "duplicate Supply_id in file"}
+
+
+def test_existing_keys_and_unit_groups_are_rejected(db):
+    with transaction() as tx:
+        tx.execute("INSERT INTO Supply (Supply_id, Hosp_id, Blood_grp, Quantity) VALUES ('SUP1', 'HOS1', 'A+', 1)")
+    report = import_file(csv("Supply_id,Hosp_id,Blood_grp,Quantity", "SUP1,HOS1,A+,2", "SUP2,HOS1,A+,2"),
+                         "supply", filename="supply.csv")
+    assert rejections(report) == {2: "Supply_id already exists"}
+
+    report = import_file(csv("Storage_id,Blood_grp,Quantity", "STO1,A+,2", "STO1,A+,3", "STO1,B+,1"),
+                         "inventory", filename="inventory.csv")
+    assert report.loaded == 2
+    assert rejections(report) == {4: "Blood_grp does not match the storage unit's group"}
+    with transaction() as tx:
+        assert tx.fetchone("SELECT Quantity FROM Storage_House WHERE Storage_id = 'STO1'") == {"Quantity": 5}
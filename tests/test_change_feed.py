@@ -0,0 +1,90 @@
+import pytest
+
+import change_feed
+from change_feed import ChangeFeed, LiveDashboard
+from database import DatabaseError, transaction
+from order_engine import place_order
+
+
+def new_orders(*order_ids):
+    with transaction() as tx:
+        for order_id in order_ids:
+            place_order(tx, order_id, "HOS1", "A+", 1, backorder=True)
+
+
+# A feed caught up with an event log that is not empty, so ids run on from
+# low_water as they would in a live database
+@pytest.fixture
+def feed(db):
+    new_orders("ORD0")
+    feed = ChangeFeed(poll_ms=1)
+    feed.low_water = feed.latest_id()
+    return feed
+
+
+def test_poll_delivers_new_events_once(feed):
+    received = []
+    feed.pubsub.subscribe("Orders", received.extend)
+    new_orders("ORD1", "ORD2")
+    assert feed.poll() == 2
+    assert [event["Row_id"] for event in received] == ["ORD1", "ORD2"]
+    assert feed.low_water == received[-1]["Event_id"]
+    assert feed.poll() == 0
+    assert feed.stats()["delivered"] == 2
+
+
+def test_low_water_waits_on_gaps(feed, monkeypatch):
+    new_orders("ORD1", "ORD2", "ORD3")
+    with transaction() as tx:
+        ids = [row["Event_id"] for row in tx.fetchall(
+            "SELECT Event_id FROM Change_Event WHERE Event_id > %s ORDER BY Event_id", (feed.low_water,))]
+        # Stands in for an insert that has its id but has not committed yet
+        tx.execute("DELETE FROM Change_Event WHERE Event_id = %s", (ids[1],))
+    assert feed.poll() == 2
+    assert feed.low_water == ids[0]
+    assert feed.stats()["waiting_on_gaps"] == 1
+
+    monkeypatch.setattr(change_feed, "GAP_TIMEOUT", -1)
+    assert feed.poll() == 0
+    assert feed.low_water == ids[2]
+
+
+def test_prune_keeps_events_behind_low_water(feed, monkeypatch):
+    new_orders("ORD1", "ORD2", "ORD3")
+    feed.poll()
+    monkeypatch.setattr(change_feed, "RETAIN_EVENTS", 1)
+    assert feed.prune() == 2  # ORD0 and ORD1's events
+    with transaction() as tx:
+        assert tx.fetchone("SELECT MIN(Event_id) AS id FROM Change_Event")["id"] == feed.low_water - 1
+
+
+def test_poll_errors_reach_the_poller(feed, monkeypatch):
+    monkeypatch.setattr(change_feed, "EVENT_COLUMNS", "No_such_column")
+    with pytest.raises(DatabaseError):
+        feed.poll()
+
+    # _run logs the failure and backs off instead of stopping
+    calls = []
+
+    def fail():
+        calls.append(1)
+        if len(calls) == 3:
+            feed._stop.set()
+        raise DatabaseError("down")
+
+    monkeypatch.setattr(feed, "poll", fail)
+    feed._run()
+    assert feed.failures == 3
+
+
+def test_live_dashboard_follows_the_feed(feed):
+    live = LiveDashboard()
+    feed.pubsub.subscribe("Orders", live.apply_orders)
+    feed.low_water = live.load()
+    new_orders("ORD1", "ORD2")
+    with transaction() as tx:
+        tx.execute("UPDATE Orders SET Status = 'Cancelled' WHERE Order_id = 'ORD1'")
+    feed.poll()
+    assert live.pending_count() == 2
+    assert sorted(row["Order_id"] for row in live.pending_rows()) == ["ORD0", "ORD2"]
+    assert {row["Hosp_name"] for row in live.pending_rows()} == {"City Hospital"}
@@ -0,0 +1,45 @@
+import pytest
+
+from database import recent_transactions, transaction
+
+INSERT_HOSPITAL = "INSERT INTO Hospital (Hosp_id, Hosp_name, Location) VALUES (%s, %s, %s)"
+
+
+def hospital_ids():
+    with transaction() as tx:
+        return [row["Hosp_id"] for row in tx.fetchall("SELECT Hosp_id FROM Hospital ORDER BY Hosp_id")]
+
+
+def test_transaction_commits(db):
+    with transaction("test_commit") as tx:
+        tx.execute(INSERT_HOSPITAL, ("HOS2", "Rural Clinic", "Pune"))
+    assert recent_transactions[-1]["name"] == "test_commit"
+    assert recent_transactions[-1]["committed"]
+    assert hospital_ids() == ["HOS1", "HOS2"]
+
+
+def test_transaction_rolls_back_on_error(db):
+    with pytest.raises(RuntimeError):
+        with transaction("test_rollback") as tx:
+            tx.execute(INSERT_HOSPITAL, ("HOS2", "Rural Clinic", "Pune"))
+            raise RuntimeError("abort")
+    assert not recent_transactions[-1]["committed"]
+    assert hospital_ids() == ["HOS1"]
+
+
+def test_savepoint_rolls_back_only_its_block(db):
+    with transaction() as tx:
+        tx.execute(INSERT_HOSPITAL, ("HOS2", "Rural Clinic", "Pune"))
+        with pytest.raises(RuntimeError):
+            with tx.savepoint():
+                tx.execute(INSERT_HOSPITAL, ("HOS3", "Army Hospital", "Delhi"))
+                raise RuntimeError("abort")
+    assert hospital_ids() == ["HOS1", "HOS2"]
+
+
+def test_statements_are_counted(db):
+    with transaction() as tx:
+        tx.fetchall("SELECT Hosp_id FROM Hospital")
+        tx.executemany(INSERT_HOSPITAL, [("HOS2", "Rural Clinic", "Pune"), ("HOS3", "Army Hospital", "Delhi")])
+        tx.executemany(INSERT_HOSPITAL, [])
+    assert tx.statements == 2
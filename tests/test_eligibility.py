@@ -0,0 +1,74 @@
+from datetime import date
+
+import pytest
+
+from database import backend, transaction
+from eligibility import campaign_counts, campaign_page, check_consistency, rebuild
+
+TODAY = date(2024, 6, 1)
+
+# (Dona_id, Blood_grp, [(Test_date, Result, Hb_level)])
+DONORS = [
+    ("DON1", "A+", [(date(2024, 1, 1), "Suitable", 14.0)]),
+    ("DON2", "A+", [(date(2024, 1, 1), "Suitable", 14.0)]),
+    ("DON3", "O-", [(date(2023, 12, 1), "Suitable", 14.0)]),
+    ("DON4", "A+", [(date(2024, 2, 1), "Suitable", 14.0), (date(2024, 2, 15), "Unsuitable", 9.5)]),
+    ("DON5", "A+", [(date(2024, 5, 1), "Suitable", 14.0)]),
+    ("DON6", "O-", [(date(2024, 1, 10), "Suitable", 12.0)]),
+    ("DON7", "B+", [(date(2023, 11, 1), "Suitable", 14.0)]),
+    ("DON8", "A+", []),
+]
+
+
+@pytest.fixture
+def donors(db):
+    with transaction() as tx:
+        for dona_id, blood_grp, tests in DONORS:
+            tx.execute("INSERT INTO Donor (Dona_id, Dona_name, Blood_grp, Dona_contact) VALUES (%s, %s, %s, %s)",
+                       (dona_id, f"Donor {dona_id}", blood_grp, "9876543210"))
+            for n, (test_date, result, hb) in enumerate(tests):
+                tx.execute("INSERT INTO Blood_Test (Test_id, Dona_id, Test_date, Hb_level, Blood_pressure, Result) "
+                           "VALUES (%s, %s, %s, %s, '120/80', %s)", (f"T{dona_id}{n}", dona_id, test_date, hb, result))
+
+
+# Every page of a campaign, following each page's cursor
+def pages(blood_groups, page_size=2, **filters):
+    result, cursor = [], None
+    with transaction() as tx:
+        while True:
+            page, cursor = campaign_page(tx, blood_groups, cursor=cursor, page_size=page_size, today=TODAY,
+                                         **filters)
+            result.append([row["Dona_id"] for row in page])
+            if cursor is None:
+                return result
+
+
+def test_pages_merge_groups_longest_waiting_first(donors):
+    assert pages(["A+", "O-"]) == [["DON3", "DON1"], ["DON2", "DON6"]]
+    assert pages(["A+", "O-"], page_size=3) == [["DON3", "DON1", "DON2"], ["DON6"]]
+    assert pages(["A+", "O-"], page_size=4) == [["DON3", "DON1", "DON2", "DON6"]]
+
+
+def test_filters_narrow_the_campaign(donors):
+    assert pages(["A+", "O-"], min_hb=13) == [["DON3", "DON1"], ["DON2"]]
+    assert pages(["A+", "O-"], idle_days=150) == [["DON3", "DON1"], ["DON2"]]
+    assert pages(["B-"]) == [[]]
+    with transaction() as tx:
+        assert campaign_counts(tx, ["A+", "O-", "B+"], today=TODAY) == {"A+": 2, "O-": 2, "B+": 1}
+
+
+def test_summary_follows_new_tests(donors):
+    with transaction() as tx:
+        tx.execute("INSERT INTO Blood_Test (Test_id, Dona_id, Test_date, Hb_level, Blood_pressure, Result) "
+                   "VALUES ('TDON19', 'DON1', %s, 14.0, '120/80', 'Suitable')", (date(2024, 4, 1),))
+    assert pages(["A+"]) == [["DON2"]]
+
+
+def test_rebuild_repairs_drift(donors):
+    with transaction() as tx:
+        assert check_consistency(tx) == []
+        tx.execute("UPDATE Donor_Eligibility SET Tests_taken = 5 WHERE Dona_id = 'DON1'")
+        assert [row["Dona_id"] for row in check_consistency(tx)] == ["DON1"]
+        rebuild(tx, backend.dialect)
+        assert check_consistency(tx) == []
+    assert pages(["A+", "O-"]) == [["DON3", "DON1"], ["DON2", "DON6"]]
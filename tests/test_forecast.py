@@ -0,0 +1,60 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database import transaction
+from forecast import SHORT_WINDOW, DemandForecaster
+
+INSERT_ORDER = "INSERT INTO Orders (Order_id, Hosp_id, Blood_grp, Quantity, Order_date, Status) " \
+               "VALUES (%s, 'HOS1', %s, %s, %s, %s)"
+
+
+def days_ago(n):
+    return datetime.combine(date.today() - timedelta(days=n), datetime.min.time()) + timedelta(hours=9)
+
+
+def weekly_units(forecaster, blood_grp="A+"):
+    demand = forecaster.demand()
+    row = demand[(demand["Hosp_id"] == "HOS1") & (demand["Blood_grp"] == blood_grp)]
+    return round(float(row["Avg_7d"].iloc[0]) * SHORT_WINDOW, 6) if len(row) else 0
+
+
+def event(op, status, table="Orders"):
+    return {"Op": op, "Status": status, "Table_name": table}
+
+
+@pytest.fixture
+def orders(db):
+    with transaction() as tx:
+        tx.executemany(INSERT_ORDER, [
+            ("ORD1", "A+", 4, days_ago(1), "Pending"),
+            ("ORD2", "A+", 6, days_ago(2), "Cancelled"),
+            ("ORD3", "A+", 3, days_ago(3), "Fulfilled"),
+            ("ORD4", "O-", 2, days_ago(2), "Cancelled"),
+        ])
+
+
+def test_cancelled_orders_are_not_demand(orders):
+    forecaster = DemandForecaster(history_days=30)
+    assert weekly_units(forecaster) == 7
+    assert weekly_units(forecaster, "O-") == 0
+
+
+def test_cancelling_an_old_order_reloads_its_days(orders):
+    forecaster = DemandForecaster(history_days=30)
+    assert weekly_units(forecaster) == 7
+    with transaction() as tx:
+        tx.execute("UPDATE Orders SET Status = 'Cancelled' WHERE Order_id = 'ORD3'")
+    forecaster.mark_stale([event("U", "Cancelled")])
+    assert forecaster.reload == {"demand"}
+    assert weekly_units(forecaster) == 4
+    assert forecaster.reload == set()
+
+
+def test_new_orders_only_mark_the_forecast_stale(orders):
+    forecaster = DemandForecaster(history_days=30)
+    forecaster.demand()
+    forecaster.mark_stale([event("I", "Pending"), event("U", "Fulfilled")])
+    assert forecaster.stale and forecaster.reload == set()
+    forecaster.mark_stale([event("D", None, "Supply")])
+    assert forecaster.reload == {"supply"}
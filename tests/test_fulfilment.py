@@ -0,0 +1,53 @@
+from datetime import date, timedelta
+
+from database import transaction
+from fulfilment import plan_fulfilment, run_fulfilment
+from lots import add_lot
+from order_engine import place_order
+
+DAY = date(2024, 1, 1)
+
+# Earliest first; ORD0 already holds its units
+ORDERS = [
+    ("ORD0", "A+", 5, DAY, 5),
+    ("ORD1", "AB+", 3, DAY + timedelta(days=1), 0),
+    ("ORD2", "A+", 2, DAY + timedelta(days=2), 0),
+    ("ORD3", "O-", 2, DAY + timedelta(days=3), 0),
+]
+LOTS = [(1, "STO1", "A+", 2), (2, "STO2", "O-", 3), (3, "STO3", "A+", 1)]
+
+
+def units_by_order(plan):
+    return plan.allocations.groupby("Order_id")["Units"].sum().to_dict()
+
+
+def test_fifo_serves_in_arrival_order():
+    plan = plan_fulfilment(ORDERS, LOTS, "fifo")
+    assert plan.fulfilled == ["ORD0", "ORD1", "ORD2"]
+    assert plan.unfilled == ["ORD3"]
+    assert plan.substituted == ["ORD1", "ORD2"]
+    assert units_by_order(plan) == {"ORD1": 3, "ORD2": 2}
+    # ORD1 takes all the A+ stock, leaving ORD2 to O-
+    by_group = plan.allocations.groupby(["Order_id", "Blood_grp"])["Units"].sum().to_dict()
+    assert by_group == {("ORD1", "A+"): 3, ("ORD2", "O-"): 2}
+
+
+def test_max_orders_fills_the_most_orders():
+    plan = plan_fulfilment(ORDERS, LOTS, "max_orders")
+    assert sorted(plan.fulfilled) == ["ORD0", "ORD2", "ORD3"]
+    assert plan.unfilled == ["ORD1"]
+    assert plan.substituted == []
+    assert units_by_order(plan) == {"ORD2": 2, "ORD3": 2}
+
+
+def test_run_fulfilment_applies_the_plan(availability):
+    with transaction() as tx:
+        add_lot(tx, "STO1", "O-", 3)
+        place_order(tx, "ORD1", "HOS1", "A+", 2, backorder=True)
+        place_order(tx, "ORD2", "HOS1", "O-", 4, backorder=True)
+    with transaction() as tx:
+        plan = run_fulfilment(tx, "fifo")
+        statuses = {row["Order_id"]: row["Status"] for row in tx.fetchall("SELECT Order_id, Status FROM Orders")}
+    assert plan.fulfilled == ["ORD1"]
+    assert statuses == {"ORD1": "Fulfilled", "ORD2": "Pending"}
+    assert availability("O-") == 1
@@ -0,0 +1,51 @@
+from backends import config_from_env, create_backend
+from migrations import applied_versions, available_migrations, migrate, split_statements
+
+
+def fresh_connection(tmp_path):
+    backend = create_backend(config_from_env({"BB_DB_BACKEND": "sqlite",
+                                              "BB_SQLITE_PATH": str(tmp_path / "fresh.db")}))
+    conn = backend.get_connection()
+    assert backend.bootstrap(conn)
+    return conn
+
+
+def test_dialects_have_the_same_migrations():
+    assert [m[:2] for m in available_migrations("mysql")] == [m[:2] for m in available_migrations("sqlite")]
+
+
+def test_migrate_applies_everything_once(tmp_path):
+    conn = fresh_connection(tmp_path)
+    try:
+        done = migrate(conn, dialect="sqlite", log=None)
+        assert done == [m[:2] for m in available_migrations("sqlite")]
+        assert applied_versions(conn) == {version for version, _ in done}
+        assert migrate(conn, dialect="sqlite", log=None) == []
+    finally:
+        conn.close()
+
+
+def test_migrate_stops_at_target(tmp_path):
+    conn = fresh_connection(tmp_path)
+    try:
+        assert [version for version, _ in migrate(conn, target=2, dialect="sqlite", log=None)] == [1, 2]
+        assert applied_versions(conn) == {1, 2}
+    finally:
+        conn.close()
+
+
+def test_split_statements_honours_delimiter():
+    script = """
+CREATE TABLE t (a INT);
+DELIMITER //
+CREATE TRIGGER t_check BEFORE INSERT ON t
+FOR EACH ROW
+BEGIN
+    SELECT 1;
+END //
+DELIMITER ;
+DROP TABLE t;
+"""
+    statements = split_statements(script)
+    assert len(statements) == 3
+    assert statements[1].startswith("CREATE TRIGGER") and statements[1].rstrip().endswith("END")
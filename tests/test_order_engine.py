@@ -0,0 +1,114 @@
+from datetime import date, timedelta
+
+from database import transaction
+from inventory import add_stock
+from lots import add_lot
+from order_engine import place_order, return_storage_id, update_order_status
+
+
+def stock(storage_id, blood_grp, quantity, **lot):
+    with transaction() as tx:
+        add_lot(tx, storage_id, blood_grp, quantity, **lot)
+
+
+def order(order_id):
+    with transaction() as tx:
+        return tx.fetchone("SELECT Blood_grp, Quantity, Status FROM Orders WHERE Order_id = %s", (order_id,))
+
+
+def allocated_units(order_id):
+    with transaction() as tx:
+        row = tx.fetchone("SELECT COALESCE(SUM(Units), 0) AS Units FROM Order_Allocation WHERE Order_id = %s",
+                          (order_id,))
+    return row["Units"]
+
+
+def test_place_order_deducts_stock(availability):
+    stock("STO1", "A+", 5)
+    with transaction() as tx:
+        result = place_order(tx, "ORD1", "HOS1", "A+", 3)
+    assert result.placed and not result.backordered
+    assert result.available == 5
+    assert order("ORD1") == {"Blood_grp": "A+", "Quantity": 3, "Status": "Pending"}
+    assert allocated_units("ORD1") == 3
+    assert availability("A+") == 2
+
+
+def test_place_order_takes_first_expiring_lot(db):
+    today = date.today()
+    stock("STO1", "B+", 4, expires_on=today + timedelta(days=20))
+    stock("STO2", "B+", 4, expires_on=today + timedelta(days=5))
+    with transaction() as tx:
+        result = place_order(tx, "ORD1", "HOS1", "B+", 2)
+    assert [(storage_id, take) for _, storage_id, take in result.allocations] == [("STO2", 2)]
+
+
+def test_short_order_is_not_placed(availability):
+    stock("STO1", "O-", 2)
+    with transaction() as tx:
+        result = place_order(tx, "ORD1", "HOS1", "O-", 3)
+    assert not result.placed
+    assert result.available == 2
+    assert order("ORD1") is None
+    assert availability("O-") == 2
+
+
+def test_backorder_is_recorded_unreserved(availability):
+    stock("STO1", "O-", 2)
+    with transaction() as tx:
+        result = place_order(tx, "ORD1", "HOS1", "O-", 3, backorder=True)
+    assert result.placed and result.backordered
+    assert order("ORD1")["Status"] == "Pending"
+    assert allocated_units("ORD1") == 0
+    assert availability("O-") == 2
+
+
+def test_cancel_returns_units(availability):
+    stock("STO1", "AB+", 4)
+    with transaction() as tx:
+        place_order(tx, "ORD1", "HOS1", "AB+", 4)
+    assert availability("AB+") == 0
+    with transaction() as tx:
+        assert update_order_status(tx, "ORD1", "Cancelled")
+    assert order("ORD1")["Status"] == "Cancelled"
+    assert allocated_units("ORD1") == 0
+    assert availability("AB+") == 4
+
+
+def test_fulfil_keeps_units_out(availability):
+    stock("STO1", "A-", 4)
+    with transaction() as tx:
+        place_order(tx, "ORD1", "HOS1", "A-", 1)
+        assert update_order_status(tx, "ORD1", "Fulfilled")
+    assert order("ORD1")["Status"] == "Fulfilled"
+    assert availability("A-") == 3
+
+
+def test_only_pending_orders_change_status(db):
+    stock("STO1", "A-", 4)
+    with transaction() as tx:
+        place_order(tx, "ORD1", "HOS1", "A-", 1)
+        update_order_status(tx, "ORD1", "Cancelled")
+        assert not update_order_status(tx, "ORD1", "Fulfilled")
+        assert not update_order_status(tx, "MISSING", "Cancelled")
+
+
+def test_cancel_without_the_lot_restocks_a_return_unit(availability):
+    stock("STO1", "B-", 2)
+    order_id = "ORD-LONG-ID-12345678"
+    with transaction() as tx:
+        place_order(tx, order_id, "HOS1", "B-", 2)
+        tx.execute("DELETE FROM Blood_Lot WHERE Storage_id = 'STO1'")
+        tx.execute("DELETE FROM Storage_House WHERE Storage_id = 'STO1'")
+        tx.execute("UPDATE Order_Allocation SET Lot_id = NULL, Storage_id = NULL WHERE Order_id = %s", (order_id,))
+        assert update_order_status(tx, order_id, "Cancelled")
+        unit = tx.fetchone("SELECT Storage_id, Quantity FROM Storage_House WHERE Blood_grp = 'B-'")
+    assert unit == {"Storage_id": return_storage_id(order_id), "Quantity": 2}
+    assert len(unit["Storage_id"]) <= 20
+    assert availability("B-") == 2
+
+
+def test_add_stock_rejects_another_group(db):
+    with transaction() as tx:
+        assert add_stock(tx, "STO1", "A+", 2)
+        assert add_stock(tx, "STO1", "B+", 2) is False
@@ -0,0 +1,74 @@
+from datetime import date, datetime
+
+import pytest
+
+from database import transaction
+from pagination import TABLES, build_count_query, build_filters, build_page_query
+
+INSERT_HOSPITAL = "INSERT INTO Hospital (Hosp_id, Hosp_name, Location) VALUES (%s, %s, %s)"
+INSERT_ORDER = "INSERT INTO Orders (Order_id, Hosp_id, Blood_grp, Quantity, Order_date, Status) " \
+               "VALUES (%s, 'HOS1', %s, 1, %s, %s)"
+
+
+# Follow Next from the first page to the last, as the table view does
+def walk(name, sort_label, descending, clauses=(), params=(), page_size=2):
+    spec = TABLES[name]
+    sort = (sort_label, dict(spec["sorts"])[sort_label])
+    pages, cursor = [], None
+    with transaction() as tx:
+        while True:
+            rows = tx.fetchall(*build_page_query(spec, sort, descending, clauses, params, cursor, page_size))
+            page = rows[:page_size]
+            pages.append([row[spec["key"][0]] for row in page])
+            if len(rows) <= page_size:
+                return pages
+            cursor = (page[-1][sort_label], page[-1][spec["key"][0]])
+
+
+@pytest.fixture
+def hospitals(db):
+    # Locations repeat so page boundaries fall inside runs of equal sort values
+    with transaction() as tx:
+        tx.executemany(INSERT_HOSPITAL, [("HOS2", "B", "Delhi"), ("HOS3", "C", "Agra"), ("HOS4", "D", "Delhi"),
+                                         ("HOS5", "E", "Agra"), ("HOS6", "F", "Delhi")])
+
+
+def test_key_sort_pages_without_gaps(hospitals):
+    assert walk("hospitals", "Hosp_id", False) == [["HOS1", "HOS2"], ["HOS3", "HOS4"], ["HOS5", "HOS6"]]
+    assert walk("hospitals", "Hosp_id", True) == [["HOS6", "HOS5"], ["HOS4", "HOS3"], ["HOS2", "HOS1"]]
+
+
+def test_ties_on_the_sort_column_break_on_the_key(hospitals):
+    assert walk("hospitals", "Location", False) == [["HOS3", "HOS5"], ["HOS1", "HOS2"], ["HOS4", "HOS6"]]
+    assert walk("hospitals", "Location", True, page_size=4) == [["HOS6", "HOS4", "HOS2", "HOS1"],
+                                                                ["HOS5", "HOS3"]]
+
+
+def test_last_full_page_has_no_next(hospitals):
+    assert walk("hospitals", "Hosp_id", False, page_size=3) == [["HOS1", "HOS2", "HOS3"], ["HOS4", "HOS5", "HOS6"]]
+    assert walk("hospitals", "Hosp_id", False, page_size=6) == [["HOS1", "HOS2", "HOS3", "HOS4", "HOS5", "HOS6"]]
+
+
+def test_cursor_on_the_key_alone_uses_one_predicate():
+    spec = TABLES["hospitals"]
+    query, params = build_page_query(spec, ("Hosp_id", "h.Hosp_id"), False, [], [], ("HOS2", "HOS2"), 10)
+    assert query == "SELECT h.* FROM Hospital h WHERE h.Hosp_id > %s ORDER BY h.Hosp_id ASC LIMIT 11"
+    assert params == ["HOS2"]
+
+
+def test_filters_page_and_count_together(db):
+    with transaction() as tx:
+        tx.executemany(INSERT_ORDER, [
+            ("ORD1", "A+", datetime(2024, 1, 1, 9), "Pending"),
+            ("ORD2", "A+", datetime(2024, 1, 2, 9), "Pending"),
+            ("ORD3", "A+", datetime(2024, 1, 2, 9), "Pending"),
+            ("ORD4", "B+", datetime(2024, 1, 2, 9), "Pending"),
+            ("ORD5", "A+", datetime(2024, 1, 3, 9), "Pending"),
+            ("ORD6", "A+", datetime(2024, 1, 4, 9), "Cancelled"),
+        ])
+    spec = TABLES["orders"]
+    clauses, params = build_filters(spec, blood_groups=["A+"], statuses=["Pending"],
+                                    date_range=(date(2024, 1, 2), date(2024, 1, 3)))
+    assert walk("orders", "Order_date", True, clauses, params) == [["ORD5", "ORD3"], ["ORD2"]]
+    with transaction() as tx:
+        assert tx.fetchone(build_count_query(spec, clauses), params) == {"total": 3}
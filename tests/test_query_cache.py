@@ -0,0 +1,93 @@
+import query_cache as cache_module
+from query_cache import QueryCache, tables_in
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def key(query, values=None):
+    return QueryCache.make_key(query, values)
+
+
+def test_tables_come_from_from_and_join():
+    assert tables_in("SELECT * FROM Orders o JOIN `Hospital` h ON o.Hosp_id = h.Hosp_id") == {"orders", "hospital"}
+
+
+def test_key_ignores_whitespace_and_carries_the_scope():
+    assert key("SELECT *\n  FROM Orders") == key("SELECT * FROM Orders")
+    assert key("SELECT * FROM Orders WHERE Status = %s", ["Pending"]) == \
+        ("SELECT * FROM Orders WHERE Status = %s", ("Pending",))
+    assert QueryCache.make_key("SELECT * FROM Orders", scope=7) != key("SELECT * FROM Orders")
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    cache = QueryCache(default_ttl=30)
+    cache.put(key("SELECT * FROM Orders"), ["row"])
+    cache.put(key("SELECT * FROM Supply"), ["row"], ttl=5)
+    clock.now += 10
+    assert cache.get(key("SELECT * FROM Orders")) == ["row"]
+    assert cache.get(key("SELECT * FROM Supply")) is None
+    clock.now += 30
+    assert cache.get(key("SELECT * FROM Orders")) is None
+    assert cache.stats()["entries"] == 0
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(max_entries=2)
+    cache.put(key("SELECT 1 FROM Orders"), [1])
+    cache.put(key("SELECT 2 FROM Orders"), [2])
+    assert cache.get(key("SELECT 1 FROM Orders")) == [1]
+    cache.put(key("SELECT 3 FROM Orders"), [3])
+    assert cache.get(key("SELECT 2 FROM Orders")) is None
+    assert cache.get(key("SELECT 1 FROM Orders")) == [1]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidation_drops_only_readers_of_the_table():
+    cache = QueryCache()
+    cache.put(key("SELECT * FROM Orders o JOIN Hospital h ON o.Hosp_id = h.Hosp_id"), ["orders"])
+    cache.put(key("SELECT * FROM Supply"), ["supply"])
+    cache.invalidate("HOSPITAL")
+    assert cache.get(key("SELECT * FROM Orders o JOIN Hospital h ON o.Hosp_id = h.Hosp_id")) is None
+    assert cache.get(key("SELECT * FROM Supply")) == ["supply"]
+
+
+def test_invalidation_follows_derived_tables():
+    cache = QueryCache()
+    cache.add_dependency("Blood_Lot", "Storage_House")
+    cache.add_dependency("Storage_House", "Blood_Availability")
+    cache.put(key("SELECT * FROM Blood_Availability"), ["totals"])
+    cache.put(key("SELECT * FROM Donor"), ["donors"])
+    cache.invalidate("Blood_Lot")
+    assert cache.get(key("SELECT * FROM Blood_Availability")) is None
+    assert cache.get(key("SELECT * FROM Donor")) == ["donors"]
+
+
+def test_cached_query_reads_through_once(db, monkeypatch):
+    import database
+    from query_cache import query_cache
+
+    calls = []
+    execute = database.execute_query
+
+    def counted(*args, **kwargs):
+        calls.append(args[0])
+        return execute(*args, **kwargs)
+
+    monkeypatch.setattr(database, "execute_query", counted)
+    query_cache.clear()
+    query = "SELECT Hosp_id FROM Hospital ORDER BY Hosp_id"
+    assert database.cached_query(query) == [{"Hosp_id": "HOS1"}]
+    assert database.cached_query(query) == [{"Hosp_id": "HOS1"}]
+    assert len(calls) == 1
+    query_cache.invalidate("Hospital")
+    database.cached_query(query)
+    assert len(calls) == 2
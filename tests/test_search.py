@@ -0,0 +1,79 @@
+from datetime import date, datetime
+
+import pytest
+
+from database import transaction
+from search import compile_query, name_condition, process_query
+
+ORDER_COLUMNS = "SELECT o.Order_id, h.Hosp_name, o.Blood_grp, o.Quantity, o.Order_date, o.Status " \
+                "FROM Orders o JOIN Hospital h ON o.Hosp_id = h.Hosp_id"
+
+DONORS = [("DON1", "Alice Smith", "A+"), ("DON2", "Sal Al", "O-"), ("DON3", "Bob Alder", "B+"),
+          ("DON4", "Walter King", "A+")]
+
+
+@pytest.fixture
+def donors(db):
+    with transaction() as tx:
+        tx.executemany("INSERT INTO Donor (Dona_id, Dona_name, Blood_grp, Dona_contact) VALUES (%s, %s, %s, %s)",
+                       [(dona_id, name, grp, "9876543210") for dona_id, name, grp in DONORS])
+
+
+def names(plan):
+    with transaction() as tx:
+        return sorted(row["Dona_name"] for row in tx.fetchall(*plan))
+
+
+def test_dispatch_picks_the_subject_and_filters():
+    today = date(2024, 3, 10)
+    assert compile_query("pending orders for a+ in the last 7 days", "mysql", today) == (
+        f"{ORDER_COLUMNS} WHERE o.Order_date >= %s AND o.Blood_grp IN (%s) AND o.Status IN (%s) "
+        "ORDER BY o.Order_date DESC LIMIT 1000", (datetime(2024, 3, 3), "A+", "Pending"))
+    assert compile_query("available blood a+ and o-", "mysql", today) == (
+        "SELECT Blood_grp, Total_Units FROM Blood_Availability WHERE Blood_grp IN (%s, %s) "
+        "ORDER BY Total_Units DESC LIMIT 1000", ("A+", "O-"))
+    assert compile_query("location of the blood bank", "mysql", today) == (
+        "SELECT Emp_name, BB_address FROM Employee LIMIT 1000", None)
+
+
+def test_date_range_and_hospital_filters():
+    sql_query, params = process_query("Supply between 2024-01-01 and 2024-01-31 from hospital city", "mysql")
+    assert "s.Supply_date >= %s AND s.Supply_date < %s AND (h.Hosp_id = %s OR h.Hosp_name LIKE %s)" in sql_query
+    assert params == [datetime(2024, 1, 1), datetime(2024, 2, 1), "CITY", "city%"]
+
+
+def test_unknown_words_and_filters_are_not_understood():
+    assert process_query("orders banana", "mysql") is None
+    assert process_query("location of the blood bank for a+", "mysql") is None
+    assert process_query("orders since 2024-13-01", "mysql") is None
+    assert process_query("weather today", "mysql") is None
+
+
+def test_name_uses_fulltext_on_mysql():
+    assert name_condition("d", "alice smith", "mysql") == (
+        "MATCH(d.Dona_name) AGAINST (%s IN BOOLEAN MODE)", ["+alice* +smith*"])
+
+
+def test_short_words_prefix_any_word_of_the_name_on_mysql():
+    assert name_condition("d", "al b", "mysql") == (
+        "(d.Dona_name LIKE %s OR d.Dona_name LIKE %s) AND (d.Dona_name LIKE %s OR d.Dona_name LIKE %s)",
+        ["al%", "% al%", "b%", "% b%"])
+
+
+def test_name_uses_fts5_on_sqlite():
+    assert name_condition("d", "alice smith", "sqlite") == (
+        "d.rowid IN (SELECT rowid FROM Donor_Name_Index WHERE Donor_Name_Index MATCH %s)", ['"alice"* "smith"*'])
+    assert name_condition("d", "--", "sqlite") is None
+
+
+def test_fts5_matches_word_prefixes(donors):
+    assert names(process_query("contact of al", "sqlite")) == ["Alice Smith", "Bob Alder", "Sal Al"]
+    assert names(process_query("donors named smi ali", "sqlite")) == ["Alice Smith"]
+    assert names(process_query("donors named lter", "sqlite")) == []
+
+
+# SQLite runs the MySQL LIKE fallback too, so both dialects agree on matches
+def test_like_fallback_matches_like_fts5(donors):
+    for name in ["al", "al b", "k"]:
+        query = f"contact of {name}"
+        assert names(process_query(query, "mysql")) == names(process_query(query, "sqlite"))
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+import sites
+from lots import add_lot
+from sites import (Site, home_site, order_site, place_order_at, qualify_order_id, run_at, site_availability,
+                   site_for_order, source_order)
+
+HOSPITAL = {"Hosp_id": "HOS1", "Hosp_name": "City Hospital", "Location": "Delhi"}
+
+
+def stock(site, blood_grp, quantity):
+    run_at(site, lambda tx: add_lot(tx, f"STO{blood_grp}", blood_grp, quantity))
+
+
+def order_ids(site):
+    return run_at(site, lambda tx: [row["Order_id"] for row in tx.fetchall("SELECT Order_id FROM Orders")])
+
+
+# A second site on its own SQLite file, in Delhi like the test hospital
+@pytest.fixture
+def remote(db, tmp_path, monkeypatch):
+    environ = dict(os.environ, BB_SITE_2_SQLITE_PATH=str(tmp_path / "site2.db"), BB_SITE_2_LOCATION="Delhi")
+    site = Site("2", environ)
+    monkeypatch.setitem(sites.SITES, "2", site)
+    return site
+
+
+def test_one_site_keeps_plain_order_ids(db):
+    assert qualify_order_id(home_site(), "ORD1") == "ORD1"
+    assert site_for_order("ORD1") is home_site()
+
+
+def test_order_ids_carry_their_site(remote):
+    assert qualify_order_id(remote, "ORD1") == "2-ORD1"
+    assert qualify_order_id(remote, "2-ORD1") == "2-ORD1"
+    assert qualify_order_id(home_site(), "ORD1") == "1-ORD1"
+    assert (order_site("2-ORD1"), order_site("9-ORD1"), order_site("ORD1")) == ("2", None, None)
+    assert site_for_order("2-ORD1") is remote
+    assert site_for_order("9-ORD1") is home_site()
+
+
+def test_order_is_placed_at_the_owning_site(remote, availability):
+    stock(remote, "A+", 5)
+    result = place_order_at(remote, "ORD1", HOSPITAL, "A+", 2)
+    assert result.placed
+    assert order_ids(remote) == ["2-ORD1"]
+    assert order_ids(home_site()) == []
+    hospital = run_at(remote, lambda tx: tx.fetchone("SELECT Hosp_name FROM Hospital WHERE Hosp_id = 'HOS1'"))
+    assert hospital == {"Hosp_name": "City Hospital"}
+    assert availability("A+") == 0
+
+
+def test_availability_adds_up_the_sites(remote):
+    stock(home_site(), "O-", 2)
+    stock(remote, "O-", 3)
+    stock(remote, "B+", 1)
+    result = site_availability()
+    assert result.missing == {}
+    assert result.totals["O-"] == 5 and result.totals["B+"] == 1
+    assert result.by_site["2"]["O-"] == 3
+
+
+def test_busy_site_is_reported_missing(remote):
+    stock(home_site(), "O-", 2)
+    for _ in range(sites.SITE_WORKERS):
+        remote._slots.acquire()
+    try:
+        result = site_availability()
+    finally:
+        for _ in range(sites.SITE_WORKERS):
+            remote._slots.release()
+    assert result.missing["2"].startswith("busy")
+    assert result.totals["O-"] == 2
+
+
+def test_order_is_sourced_from_the_site_with_stock(remote):
+    stock(home_site(), "AB-", 1)
+    stock(remote, "AB-", 4)
+    site, result = source_order("ORD1", HOSPITAL, "AB-", 3)
+    assert site is remote and result.placed
+    assert order_ids(remote) == ["2-ORD1"]
+    assert source_order("ORD2", HOSPITAL, "AB-", 9) == (None, None)
@@ -0,0 +1,63 @@
+import os
+from datetime import datetime
+
+import pytest
+
+import snapshots
+from database import transaction
+
+pytest.importorskip("pyarrow")
+
+INSERT_ORDER = ("INSERT INTO Orders (Order_id, Hosp_id, Blood_grp, Quantity, Status, Order_date) "
+                "VALUES (%s, %s, %s, %s, %s, %s)")
+
+
+def add_orders(*orders):
+    with transaction() as tx:
+        for order in orders:
+            tx.execute(INSERT_ORDER, order)
+
+
+def exported_orders(root):
+    table = snapshots.load("orders", ["month", "Order_id", "Status"], str(root))
+    return {row["Order_id"]: (str(row["month"]), row["Status"]) for row in table.to_pylist()}
+
+
+@pytest.fixture
+def orders(db, tmp_path):
+    add_orders(("ORD1", "HOS1", "A+", 2, "Pending", datetime(2024, 1, 10)),
+               ("ORD2", "HOS1", "B+", 1, "Pending", datetime(2024, 3, 5)),
+               ("ORD3", "HOS1", "A+", 4, "Pending", datetime(2024, 5, 20)))
+    result = snapshots.export_dataset("orders", full=True, root=str(tmp_path))
+    assert result.months == ["2024-01", "2024-03", "2024-05"]
+    return tmp_path
+
+
+def test_incremental_export_picks_up_old_status_changes(orders):
+    with transaction() as tx:
+        tx.execute("UPDATE Orders SET Status = 'Fulfilled' WHERE Order_id = 'ORD1'")
+    result = snapshots.export_dataset("orders", root=str(orders))
+    assert not result.full
+    assert result.months == ["2024-01", "2024-05"]
+    assert exported_orders(orders)["ORD1"] == ("2024-01", "Fulfilled")
+    consumption = snapshots.hospital_consumption(str(orders))
+    assert consumption.to_dict("records") == [{"Hosp_id": "HOS1", "Blood_grp": "A+", "Units_used": 2, "Orders": 1}]
+
+
+def test_incremental_export_picks_up_backdated_moved_and_deleted_rows(orders):
+    add_orders(("ORD4", "HOS1", "O-", 3, "Pending", datetime(2023, 12, 1)))
+    with transaction() as tx:
+        tx.execute("UPDATE Orders SET Order_date = %s WHERE Order_id = 'ORD1'", (datetime(2024, 2, 1),))
+        tx.execute("DELETE FROM Orders WHERE Order_id = 'ORD2'")
+    snapshots.export_dataset("orders", root=str(orders))
+    assert exported_orders(orders) == {"ORD1": ("2024-02", "Pending"), "ORD3": ("2024-05", "Pending"),
+                                       "ORD4": ("2023-12", "Pending")}
+    assert sorted(os.listdir(orders / "orders")) == ["_watermark.json", "month=2023-12", "month=2024-02",
+                                                     "month=2024-05"]
+    assert snapshots.read_state("orders", str(orders))["rows"] == 3
+
+
+def test_unchanged_closed_months_are_not_reread(orders):
+    result = snapshots.export_dataset("orders", root=str(orders))
+    assert result.months == ["2024-05"]
+    assert result.rows == 1
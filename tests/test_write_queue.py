@@ -0,0 +1,93 @@
+import json
+
+from database import DatabaseError, transaction
+from write_queue import WriteQueue
+
+INSERT_HOSPITAL = "INSERT INTO Hospital (Hosp_id, Hosp_name, Location) VALUES (%s, %s, %s)"
+
+
+def hospital_ids():
+    with transaction() as tx:
+        return [row["Hosp_id"] for row in tx.fetchall("SELECT Hosp_id FROM Hospital ORDER BY Hosp_id")]
+
+
+def hospitals(*ids):
+    return [(hosp_id, f"Hospital {hosp_id}", "Delhi") for hosp_id in ids]
+
+
+def test_writes_commit_in_batches(db):
+    writer = WriteQueue(batch_rows=3, flush_ms=10, spool_path=None)
+    tickets = [writer.submit(INSERT_HOSPITAL, row) for row in hospitals("HOS2", "HOS3", "HOS4", "HOS5", "HOS6")]
+    assert tickets[0].tables == ("Hospital",)
+    while writer.depth():
+        writer._flush(writer._collect())
+    assert list(writer.batch_sizes) == [3, 2]
+    assert [ticket.status for ticket in tickets] == ["committed"] * 5
+    assert hospital_ids() == ["HOS1", "HOS2", "HOS3", "HOS4", "HOS5", "HOS6"]
+
+
+def test_bad_row_fails_alone(db):
+    writer = WriteQueue(batch_rows=10, flush_ms=10, spool_path=None)
+    tickets = [writer.submit(INSERT_HOSPITAL, row) for row in hospitals("HOS2", "HOS1", "HOS3")]
+    assert writer._flush(writer._collect())
+    assert [ticket.status for ticket in tickets] == ["committed", "failed", "committed"]
+    assert writer.stats()["committed"] == 2 and writer.stats()["failed"] == 1
+
+
+def test_background_writer_drains_on_stop(db):
+    writer = WriteQueue(batch_rows=2, flush_ms=10, spool_path=None).start()
+    tickets = [writer.submit(INSERT_HOSPITAL, row) for row in hospitals("HOS2", "HOS3", "HOS4")]
+    writer.stop()
+    assert [ticket.wait(1) for ticket in tickets] == ["committed"] * 3
+    assert writer.depth() == 0
+
+
+def test_full_queue_spools_and_replays(db, tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    writer = WriteQueue(batch_rows=10, flush_ms=10, max_depth=1, spool_path=str(spool))
+    queued, spooled = [writer.submit(INSERT_HOSPITAL, row) for row in hospitals("HOS2", "HOS3")]
+    assert (queued.status, spooled.status) == ("queued", "spooled")
+    assert [json.loads(line)["values"] for line in spool.read_text().splitlines()] == [list(hospitals("HOS3")[0])]
+
+    writer._replay_spool()
+    assert not spool.exists()
+    assert hospital_ids() == ["HOS1", "HOS3"]
+    writer._flush(writer._collect())
+    assert hospital_ids() == ["HOS1", "HOS2", "HOS3"]
+    assert writer.stats()["spooled"] == 1 and writer.stats()["replayed"] == 1
+
+
+def test_unreachable_database_spools_the_batch(db, tmp_path, monkeypatch):
+    import write_queue
+
+    def unreachable(*args, **kwargs):
+        raise DatabaseError("database is down")
+
+    spool = tmp_path / "spool.jsonl"
+    writer = WriteQueue(batch_rows=10, flush_ms=10, spool_path=str(spool))
+    ticket = writer.submit(INSERT_HOSPITAL, hospitals("HOS2")[0])
+    monkeypatch.setattr(write_queue, "transaction", unreachable)
+    assert not writer._flush(writer._collect())
+    assert ticket.status == "spooled"
+
+    writer._replay_spool()
+    assert len(spool.read_text().splitlines()) == 1
+
+    monkeypatch.undo()
+    writer._retry_at = 0
+    writer._replay_spool()
+    assert hospital_ids() == ["HOS1", "HOS2"]
+
+
+# Spooled tickets are already final, so a row rejected on replay is only counted
+def test_rows_rejected_on_replay_are_counted(db, tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    writer = WriteQueue(batch_rows=10, flush_ms=10, max_depth=1, spool_path=str(spool))
+    writer.submit(INSERT_HOSPITAL, hospitals("HOS2")[0])
+    tickets = [writer.submit(INSERT_HOSPITAL, row) for row in hospitals("HOS1", "HOS3")]
+    assert [ticket.status for ticket in tickets] == ["spooled", "spooled"]
+
+    writer._replay_spool()
+    stats = writer.stats()
+    assert (stats["replayed"], stats["replay_failed"]) == (1, 1)
+    assert hospital_ids() == ["HOS1", "HOS3"]
@@ -0,0 +1,14 @@
+import re
+
+BLOOD_GROUPS = ["A+", "A-", "B+", "B-", "O+", "O-", "AB+", "AB-"]
+
+# Shared by the single-row forms and the vectorized bulk import checks
+CONTACT_PATTERN = r"^[0-9]{10}$"
+ID_PATTERN = r"^[a-zA-Z0-9]+$"
+
+# Common form validation functions
+def validate_contact(contact):
+    return re.match(CONTACT_PATTERN, contact)
+
+def validate_id(id_str):
+    return re.match(ID_PATTERN, id_str)
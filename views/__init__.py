@@ -0,0 +1,37 @@
+import importlib
+import sys
+
+from database import page_scope
+
+# Menu entry -> module in this package with its render(). Each module, and
+# everything it imports, is loaded the first time its page is opened.
+PAGES = {
+    "Dashboard": "dashboard",
+    "Employees": "employees",
+    "Donors": "donors",
+    "Donor Campaigns": "campaigns",
+    "Hospitals": "hospitals",
+    "Blood Inventory": "blood_inventory",
+    "Orders": "orders",
+    "Supply": "supply",
+    "Search Database": "search_database",
+    "Analytics": "analytics",
+    "Performance": "performance",
+}
+
+
+# Dotted module path of a page, e.g. views.orders
+def module_name(page):
+    return f"{__name__}.{PAGES[page]}"
+
+
+# False until the page's module has been imported by this process
+def is_loaded(page):
+    return module_name(page) in sys.modules
+
+
+# Import the page's module on first use and draw it against the home
+# database, unless the page picks another site
+def render(page):
+    with page_scope():
+        importlib.import_module(module_name(page)).render()
@@ -0,0 +1,58 @@
+import streamlit as st
+
+import instrumentation
+import snapshots
+from database import DatabaseError, cached_query
+from views.common import lazy_tabs
+
+
+# Analytics page: charts over the Parquet snapshots
+def render():
+    st.header("📈 Analytics")
+    st.caption("Read from Parquet snapshots of Orders and Supply, not the live database")
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        st.warning("Analytics needs pyarrow: pip install pyarrow")
+        st.stop()
+
+    cols = st.columns(len(snapshots.DATASETS) + 1)
+    full = cols[-1].checkbox("Full rebuild")
+    if cols[-1].button("Refresh Snapshots"):
+        try:
+            with st.spinner("Exporting..."):
+                results = snapshots.export_all(full=full)
+            st.success(", ".join(f"{r.dataset}: {r.rows} rows in {r.duration_s:.1f}s" for r in results))
+        except DatabaseError as err:
+            st.error(f"Database error: {err}")
+    for col, name in zip(cols, snapshots.DATASETS):
+        state = snapshots.read_state(name)
+        col.metric(f"{name.title()} snapshot", f"{state['rows']:,} rows" if state else "-",
+                   help=f"Up to {state['watermark']}, exported {state['exported_at']}" if state else "Not exported yet")
+
+    tab1, tab2 = lazy_tabs(["Monthly Demand", "Hospital Consumption"], key="analytics_tabs")
+
+    if tab1.open:
+        with tab1, instrumentation.tab("Monthly Demand"):
+            demand = snapshots.monthly_demand()
+            if demand is None or demand.empty:
+                st.info("No order snapshot yet. Refresh snapshots to build one.")
+            else:
+                st.subheader("Units Ordered per Month by Blood Group")
+                st.line_chart(demand)
+                st.dataframe(demand)
+
+    if tab2.open:
+        with tab2, instrumentation.tab("Hospital Consumption"):
+            consumption = snapshots.hospital_consumption()
+            if consumption is None or consumption.empty:
+                st.info("No order snapshot yet. Refresh snapshots to build one.")
+            else:
+                names = {h["Hosp_id"]: h["Hosp_name"]
+                         for h in cached_query("SELECT Hosp_id, Hosp_name FROM Hospital", ttl=300) or []}
+                consumption.insert(1, "Hosp_name", consumption["Hosp_id"].map(names))
+                hospital = st.selectbox("Hospital", ["All"] + sorted(consumption["Hosp_id"].unique()))
+                if hospital != "All":
+                    consumption = consumption[consumption["Hosp_id"] == hospital]
+                st.bar_chart(consumption.groupby("Blood_grp")["Units_used"].sum())
+                st.dataframe(consumption)
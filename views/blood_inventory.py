@@ -0,0 +1,113 @@
+import pandas as pd
+import streamlit as st
+
+import instrumentation
+from availability import AVAILABILITY_QUERY
+from database import DatabaseError, cached_query, run_transaction
+from inventory import add_stock, remove_stock
+from lots import expire_lots, expiring_soon, get_expiry_sweeper
+from pagination import paginated_table
+from query_cache import query_cache
+from sites import SITES, site_availability
+from validation import BLOOD_GROUPS
+from views.common import bulk_import_panel, lazy_tabs, site_picker
+
+
+# Blood Inventory page: the picked site's storage units, stock updates and
+# lots, and availability at every site
+def render():
+    st.header("🧪 Blood Inventory Management")
+    site = site_picker()
+
+    tab1, tab2, tab3, tab4 = lazy_tabs(["View Inventory", "Update Inventory", "Lots & Expiry", "All Sites"],
+                                       key="blood_inventory_tabs")
+
+    if tab1.open:
+        with tab1, instrumentation.tab("View Inventory"):
+            paginated_table("inventory")
+
+            st.subheader("Blood Availability Summary")
+            blood_summary = cached_query(AVAILABILITY_QUERY, ttl=10)
+            if blood_summary:
+                st.bar_chart(pd.DataFrame(blood_summary).set_index("Blood_grp"))
+
+    if tab2.open:
+        with tab2, instrumentation.tab("Update Inventory"):
+            with st.form("update_inventory", clear_on_submit=True):
+                st.subheader("Update Blood Inventory")
+                cols = st.columns(2)
+
+                with cols[0]:
+                    storage_id = st.text_input("Storage ID* (e.g., STO100)")
+                    blood_type = st.selectbox("Blood Type*", BLOOD_GROUPS)
+
+                with cols[1]:
+                    action = st.radio("Action*", ["Add", "Remove"])
+                    quantity = st.number_input("Quantity (units)*", min_value=1, max_value=100, value=1)
+
+                submitted = st.form_submit_button("Update Inventory")
+
+                if submitted:
+                    if not storage_id:
+                        st.error("Please enter a Storage ID")
+                    else:
+                        if action == "Add":
+                            success = run_transaction(
+                                lambda tx: add_stock(tx, storage_id, blood_type, quantity), "add_stock")
+                        else:  # Remove action
+                            success = run_transaction(
+                                lambda tx: remove_stock(tx, storage_id, quantity), "remove_stock")
+
+                        if success:
+                            query_cache.invalidate("Blood_Lot")
+                            st.success("Inventory updated successfully!")
+                            st.balloons()
+                        elif success is False:
+                            st.error(f"Storage unit {storage_id} holds a different blood group than {blood_type}")
+
+            bulk_import_panel("inventory")
+
+    if tab3.open:
+        with tab3, instrumentation.tab("Lots & Expiry"):
+            st.subheader("Expiring in the Next 7 Days")
+            try:
+                soon = expiring_soon(days=7)
+            except DatabaseError as err:
+                st.error(f"Database error: {err}")
+                soon = None
+            if soon:
+                st.dataframe(pd.DataFrame(soon))
+            else:
+                st.info("No lots expire in the next 7 days")
+
+            sweeper = get_expiry_sweeper()
+            if sweeper.last_run:
+                st.caption(f"Last automatic sweep of all sites {sweeper.last_run:%Y-%m-%d %H:%M}: "
+                           f"{sweeper.last_result[0]} lot(s), {sweeper.last_result[1]} unit(s) expired")
+            if st.button("Run expiry sweep"):
+                try:
+                    lots, units = expire_lots(db=site.backend)
+                    st.success(f"Expired {lots} lot(s), {units} unit(s)")
+                except DatabaseError as err:
+                    st.error(f"Database error: {err}")
+
+            st.subheader("All Lots")
+            paginated_table("lots")
+
+    if tab4.open:
+        with tab4, instrumentation.tab("All Sites"):
+            st.subheader("Availability Across Sites")
+            if st.button("Refresh sites"):
+                st.session_state.pop("site_availability", None)
+            if "site_availability" not in st.session_state:
+                st.session_state.site_availability = site_availability()
+            across = st.session_state.site_availability
+            for site_id, reason in across.missing.items():
+                st.warning(f"{SITES[site_id].name} left out: {reason}")
+            if across.by_site:
+                table = pd.DataFrame({SITES[site_id].name: stock for site_id, stock in across.by_site.items()})
+                table = table.reindex(BLOOD_GROUPS).fillna(0).astype(int)
+                table["Total"] = table.sum(axis=1)
+                st.dataframe(table)
+            st.caption(f"{len(across.by_site)} of {len(across.by_site) + len(across.missing)} site(s) "
+                       f"answered in {across.elapsed_ms:.0f} ms")
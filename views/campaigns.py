@@ -0,0 +1,58 @@
+import pandas as pd
+import streamlit as st
+
+from database import run_transaction
+from eligibility import DONATION_INTERVAL_DAYS, campaign_counts, campaign_page
+from validation import BLOOD_GROUPS
+
+
+# Donor Campaigns page: eligible donors, paged by keyset
+def render():
+    st.header("📣 Donor Campaigns")
+    st.caption(f"Donors whose latest test was Suitable and who can give again "
+               f"({DONATION_INTERVAL_DAYS} days after their last donation), longest-waiting first")
+
+    cols = st.columns([3, 1, 1, 1])
+    groups = cols[0].multiselect("Blood groups*", BLOOD_GROUPS, default=["O-"])
+    idle_days = cols[1].number_input("Not donated in (days)", min_value=0, max_value=3650,
+                                     value=DONATION_INTERVAL_DAYS)
+    min_hb = cols[2].number_input("Min Hb (g/dL)", min_value=0.0, max_value=25.0, value=12.5, step=0.5)
+    page_size = cols[3].selectbox("Page size", [25, 50, 100, 250], index=1)
+
+    if not groups:
+        st.info("Choose at least one blood group")
+    else:
+        # Any change to the filters starts again from the first page
+        signature = (tuple(groups), idle_days, min_hb, page_size)
+        if st.session_state.get("campaign_signature") != signature:
+            st.session_state["campaign_signature"] = signature
+            st.session_state["campaign_pages"] = [None]
+        cursors = st.session_state["campaign_pages"]
+
+        result = run_transaction(lambda tx: (
+            campaign_counts(tx, groups, idle_days, min_hb or None),
+            campaign_page(tx, groups, idle_days, min_hb or None, cursors[-1], page_size),
+        ), "donor_campaign")
+        if result:
+            counts, (rows, next_cursor) = result
+            metrics = st.columns(len(counts))
+            for col, (group, count) in zip(metrics, counts.items()):
+                col.metric(f"{group} eligible", f"{count:,}")
+
+            if rows:
+                donors = pd.DataFrame(rows)
+                st.dataframe(donors)
+                st.download_button("Download page (CSV)", donors.to_csv(index=False),
+                                   file_name=f"campaign_page_{len(cursors)}.csv")
+            else:
+                st.info("No eligible donors match these filters.")
+
+            total = sum(counts.values())
+            nav = st.columns([1, 1, 4])
+            if nav[0].button("Previous", key="campaign_prev", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+            if nav[1].button("Next", key="campaign_next", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
+            nav[2].caption(f"Page {len(cursors)} of {max(1, -(-total // page_size))} · {total} donors")
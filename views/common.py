@@ -0,0 +1,95 @@
+import streamlit as st
+
+import write_queue
+from bulk_import import ENTITIES, import_file
+from database import DatabaseError, use_backend
+from query_cache import query_cache
+from sites import SITES, home_site
+
+
+# CSV/XLSX upload that streams rows through bulk_import and shows the rejection report
+def bulk_import_panel(entity):
+    spec = ENTITIES[entity]
+    with st.expander(f"Bulk import {entity} (CSV/XLSX)"):
+        st.caption(f"Header row must contain: {', '.join(spec['columns'])}")
+        upload = st.file_uploader("File", type=["csv", "xlsx"], key=f"bulk_{entity}")
+        batch_size = st.number_input("Batch size", min_value=100, max_value=10000, value=1000, step=100,
+                                     key=f"bulk_{entity}_batch")
+        if upload and st.button("Import", key=f"bulk_{entity}_run"):
+            try:
+                report = import_file(upload, entity, batch_size=batch_size, filename=upload.name)
+            except DatabaseError as err:
+                st.error(f"Database error: {err}")
+                return
+            query_cache.invalidate(spec["table"], "Blood_Lot")
+            st.success(report.summary())
+            if report.rejected:
+                rejections = report.rejections()
+                st.warning(f"{report.rejected} row(s) rejected")
+                st.dataframe(rejections)
+                st.download_button("Download rejection report", rejections.to_csv(index=False),
+                                   file_name=f"{entity}_rejections.csv", key=f"bulk_{entity}_report")
+
+
+# Sidebar picker for the site an order, supply or inventory page works on;
+# the page's queries go to that site's database from here on. Falls back to
+# the home site when the chosen one cannot be reached.
+def site_picker():
+    home = home_site()
+    if len(SITES) == 1:
+        return home
+    site_id = st.sidebar.selectbox("Site", list(SITES), index=list(SITES).index(home.site_id),
+                                   format_func=lambda site_id: SITES[site_id].name, key="site")
+    site = SITES[site_id]
+    try:
+        use_backend(site.backend)
+    except Exception as err:
+        st.sidebar.error(f"{site.name} unavailable: {err}")
+        return home
+    return site
+
+
+# Hand an insert to the background writer and report its acknowledgement
+def queued_write(query, values, label):
+    try:
+        ticket = write_queue.get_write_queue().submit(query, values)
+    except write_queue.WriteQueueFull as err:
+        st.error(f"{label} not accepted: {err}. Please retry shortly.")
+        return False
+    status = ticket.wait(timeout=2)
+    if status == "failed":
+        st.error(f"Database error: {ticket.error}")
+        return False
+    if status == "committed":
+        st.success(f"{label} saved!")
+    elif status == "spooled":
+        st.info(f"{label} accepted; the database is busy, it will be saved shortly.")
+    else:
+        st.info(f"{label} queued for saving.")
+    return True
+
+
+# A section of a tabbed page; its body only runs while it is the selected one
+class LazyTab:
+    def __init__(self, label, open):
+        self.label = label
+        self.open = open
+        self._container = None
+
+    def __enter__(self):
+        self._container = st.container()
+        return self._container.__enter__()
+
+    def __exit__(self, *exc):
+        return self._container.__exit__(*exc)
+
+
+# Tabs whose hidden sections are not computed: st.tabs runs every tab's body on
+# each rerun, so the sections are picked with a horizontal radio instead
+def lazy_tabs(labels, key):
+    selected = st.radio("Section", labels, key=key, horizontal=True, label_visibility="collapsed")
+    return [LazyTab(label, label == selected) for label in labels]
+
+
+# Refresh a block on a timer without rerunning the whole script
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
@@ -0,0 +1,73 @@
+import pandas as pd
+import streamlit as st
+
+from change_feed import get_live_dashboard
+from database import DatabaseError, cached_query
+from forecast import HORIZONS, get_forecaster
+from views.common import fragment
+
+
+# Dashboard widgets drawn from the in-memory live view, which the change
+# feed keeps current; redrawn every few seconds without touching the database
+@fragment(run_every=2)
+def live_dashboard(live):
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.subheader("Blood Inventory")
+        blood_inventory = live.availability_rows()
+        if blood_inventory:
+            st.dataframe(pd.DataFrame(blood_inventory).set_index("Blood_grp"), height=300)
+    
+    with col2:
+        st.subheader("Recent Donors")
+        recent_donors = cached_query("SELECT Dona_name, Blood_grp, Dona_contact FROM Donor ORDER BY Dona_name LIMIT 5", ttl=60)
+        if recent_donors:
+            st.dataframe(pd.DataFrame(recent_donors), height=300)
+    
+    with col3:
+        st.subheader(f"Pending Orders ({live.pending_count()})")
+        pending_orders = live.pending_rows(5)
+        if pending_orders:
+            st.dataframe(pd.DataFrame(pending_orders), height=300)
+    
+    st.subheader("Recent Activities")
+    activities = live.activity_rows()
+    if activities:
+        st.dataframe(pd.DataFrame(activities), height=200)
+
+    # Forecasts are refitted only after new orders or supplies arrive
+    st.subheader("Predicted Shortages")
+    try:
+        stock = {row["Blood_grp"]: row["Total_Units"] for row in blood_inventory or []}
+        shortages = get_forecaster().shortages(stock)
+    except DatabaseError as err:
+        st.error(f"Database error: {err}")
+        return
+    for horizon in HORIZONS:
+        short = shortages.index[shortages[f"Projected_{horizon}d"] < 0].tolist()
+        if short:
+            st.warning(f"Expected to run short within {horizon} days: {', '.join(short)}")
+    st.dataframe(shortages, height=330)
+
+
+# Dashboard page: live inventory, orders and activity, and forecasts
+def render():
+    st.header("Blood Bank Dashboard")
+
+    try:
+        live_dashboard(get_live_dashboard())
+    except DatabaseError as err:
+        st.error(f"Database error: {err}")
+
+    with st.expander("Demand forecast by hospital"):
+        try:
+            demand = get_forecaster().demand()
+        except DatabaseError as err:
+            st.error(f"Database error: {err}")
+            demand = None
+        if demand is not None and len(demand):
+            hospital = st.selectbox("Hospital", sorted(demand["Hosp_id"].unique()), key="forecast_hospital")
+            st.dataframe(demand[demand["Hosp_id"] == hospital].set_index("Blood_grp").drop(columns="Hosp_id"))
+            st.caption("Daily demand smoothed exponentially per hospital and blood group; "
+                       "forecasts are units expected over the next 7 and 30 days")
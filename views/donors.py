@@ -0,0 +1,60 @@
+import streamlit as st
+
+import instrumentation
+import write_queue
+from database import execute_query
+from pagination import paginated_table
+from query_cache import query_cache
+from validation import BLOOD_GROUPS, validate_contact, validate_id
+from views.common import bulk_import_panel, lazy_tabs, queued_write
+
+
+# Donors page
+def render():
+    st.header("🩸 Donor Management")
+
+    tab1, tab2 = lazy_tabs(["View Donors", "Add Donor"], key="donors_tabs")
+
+    if tab1.open:
+        with tab1, instrumentation.tab("View Donors"):
+            paginated_table("donors")
+
+    if tab2.open:
+        with tab2, instrumentation.tab("Add Donor"):
+            with st.form("add_donor", clear_on_submit=True):
+                st.subheader("Register New Donor")
+                cols = st.columns(2)
+
+                with cols[0]:
+                    donor_id = st.text_input("Donor ID* (e.g., DON100)")
+                    donor_name = st.text_input("Full Name*")
+
+                with cols[1]:
+                    donor_blood = st.selectbox("Blood Group*", BLOOD_GROUPS)
+                    donor_contact = st.text_input("Contact Number*")
+
+                submitted = st.form_submit_button("Register Donor")
+
+                if submitted:
+                    if not all([donor_id, donor_name, donor_contact]):
+                        st.error("Please fill all required fields (*)")
+                    elif not validate_id(donor_id):
+                        st.error("Invalid Donor ID format (letters and numbers only)")
+                    elif not validate_contact(donor_contact):
+                        st.error("Please enter a valid 10-digit phone number")
+                    elif write_queue.ENABLED:
+                        queued_write(
+                            "INSERT INTO Donor (Dona_id, Dona_name, Blood_grp, Dona_contact) VALUES (%s, %s, %s, %s)",
+                            (donor_id, donor_name, donor_blood, donor_contact), "Donor registration"
+                        )
+                    else:
+                        success = execute_query(
+                            "INSERT INTO Donor (Dona_id, Dona_name, Blood_grp, Dona_contact) VALUES (%s, %s, %s, %s)",
+                            (donor_id, donor_name, donor_blood, donor_contact)
+                        )
+                        if success:
+                            query_cache.invalidate("Donor")
+                            st.success("Donor registered successfully!")
+                            st.balloons()
+
+            bulk_import_panel("donors")
@@ -0,0 +1,56 @@
+import streamlit as st
+
+import instrumentation
+from database import execute_query
+from pagination import paginated_table
+from query_cache import query_cache
+from validation import validate_contact
+from views.common import lazy_tabs
+
+
+# Employees page
+def render():
+    st.header("👨‍⚕️ Employee Management")
+
+    tab1, tab2 = lazy_tabs(["View Employees", "Add Employee"], key="employees_tabs")
+
+    if tab1.open:
+        with tab1, instrumentation.tab("View Employees"):
+            paginated_table("employees")
+
+    if tab2.open:
+        with tab2, instrumentation.tab("Add Employee"):
+            with st.form("add_employee", clear_on_submit=True):
+                st.subheader("Add New Employee")
+                cols = st.columns(2)
+
+                with cols[0]:
+                    emp_name = st.text_input("Full Name*")
+                    email = st.text_input("Email*")
+                    salary = st.number_input("Salary*", min_value=0)
+                    designation = st.selectbox("Designation*", ["Manager", "Lab Technician", "Nurse", "Receptionist", "Other"])
+
+                with cols[1]:
+                    joining_date = st.date_input("Joining Date*").strftime('%Y-%m-%d')
+                    bb_contact = st.text_input("Contact Number*")
+                    bb_id = st.number_input("Blood Bank ID*", min_value=1)
+                    bb_address = st.text_area("Address*")
+
+                submitted = st.form_submit_button("Add Employee")
+
+                if submitted:
+                    if not all([emp_name, email, salary, designation, bb_contact, bb_address]):
+                        st.error("Please fill all required fields (*)")
+                    elif not validate_contact(bb_contact):
+                        st.error("Please enter a valid 10-digit phone number")
+                    else:
+                        success = execute_query(
+                            """INSERT INTO Employee 
+                            (Emp_name, Email, Salary, Designation, Joining_date, BB_contact, BB_id, BB_address) 
+                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+                            (emp_name, email, salary, designation, joining_date, bb_contact, bb_id, bb_address)
+                        )
+                        if success:
+                            query_cache.invalidate("Employee")
+                            st.success("Employee added successfully!")
+                            st.balloons()
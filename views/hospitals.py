@@ -0,0 +1,51 @@
+import streamlit as st
+
+import instrumentation
+from database import execute_query
+from pagination import paginated_table
+from query_cache import query_cache
+from validation import validate_id
+from views.common import bulk_import_panel, lazy_tabs
+
+
+# Hospitals page
+def render():
+    st.header("🏥 Hospital Management")
+
+    tab1, tab2 = lazy_tabs(["View Hospitals", "Add Hospital"], key="hospitals_tabs")
+
+    if tab1.open:
+        with tab1, instrumentation.tab("View Hospitals"):
+            paginated_table("hospitals")
+
+    if tab2.open:
+        with tab2, instrumentation.tab("Add Hospital"):
+            with st.form("add_hospital", clear_on_submit=True):
+                st.subheader("Add New Hospital")
+                cols = st.columns(2)
+
+                with cols[0]:
+                    hosp_id = st.text_input("Hospital ID* (e.g., HOSP100)")
+                    hosp_name = st.text_input("Hospital Name*")
+
+                with cols[1]:
+                    location = st.text_input("Location*")
+
+                submitted = st.form_submit_button("Add Hospital")
+
+                if submitted:
+                    if not all([hosp_id, hosp_name, location]):
+                        st.error("Please fill all required fields (*)")
+                    elif not validate_id(hosp_id):
+                        st.error("Invalid Hospital ID format (letters and numbers only)")
+                    else:
+                        success = execute_query(
+                            "INSERT INTO Hospital (Hosp_id, Hosp_name, Location) VALUES (%s, %s, %s)",
+                            (hosp_id, hosp_name, location)
+                        )
+                        if success:
+                            query_cache.invalidate("Hospital")
+                            st.success("Hospital added successfully!")
+                            st.balloons()
+
+            bulk_import_panel("hospitals")
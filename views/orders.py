@@ -0,0 +1,138 @@
+import streamlit as st
+
+import instrumentation
+from database import DatabaseError, backend, cached_query, run_transaction
+from fulfilment import POLICIES, run_fulfilment
+from order_engine import update_order_status
+from pagination import paginated_table
+from query_cache import query_cache
+from sites import ORDER_ID_LENGTH, SITES, place_order_at, qualify_order_id, run_at, site_for_order, source_order
+from validation import BLOOD_GROUPS
+from views.common import lazy_tabs, site_picker
+
+
+# Orders page: placing, updating and batch-fulfilling orders at the picked site
+def render():
+    st.header("📦 Order Management")
+    site = site_picker()
+
+    tab1, tab2, tab3, tab4 = lazy_tabs(["View Orders", "Place Order", "Update Status", "Batch Fulfilment"],
+                                       key="orders_tabs")
+
+    if tab1.open:
+        with tab1, instrumentation.tab("View Orders"):
+            paginated_table("orders")
+
+    if tab2.open:
+        with tab2, instrumentation.tab("Place Order"):
+            with st.form("place_order", clear_on_submit=True):
+                st.subheader("Place New Order")
+                cols = st.columns(2)
+
+                with cols[0]:
+                    order_id = st.text_input("Order ID* (e.g., ORD100)")
+                    hosp_id = st.selectbox("Hospital*", 
+                        [h["Hosp_id"] for h in cached_query("SELECT Hosp_id FROM Hospital", ttl=300, db=backend) or []])
+                    blood_type = st.selectbox("Blood Type*", BLOOD_GROUPS)
+
+                with cols[1]:
+                    quantity = st.number_input("Quantity (units)*", min_value=1, max_value=50, value=1)
+                    backorder = st.checkbox("Backorder if stock is short",
+                                            help="Record the order unreserved; batch fulfilment can fill it later, "
+                                                 "including from compatible blood groups")
+                    any_site = len(SITES) > 1 and st.checkbox(
+                        "Source from nearest site with stock",
+                        help="Checks every site and places the order at the nearest one that can cover it")
+
+                submitted = st.form_submit_button("Place Order")
+
+                if submitted:
+                    hospital = cached_query("SELECT Hosp_id, Hosp_name, Location FROM Hospital WHERE Hosp_id = %s",
+                                            (hosp_id,), ttl=300, db=backend)
+                    longest = max(len(qualify_order_id(other, order_id)) for other in SITES.values())
+                    if not order_id:
+                        st.error("Please enter an Order ID")
+                    elif longest > ORDER_ID_LENGTH:
+                        st.error(f"Order ID too long: with its site prefix it must fit in {ORDER_ID_LENGTH} characters")
+                    elif not hospital:
+                        st.error("Please select a hospital")
+                    elif any_site:
+                        try:
+                            placed_at, result = source_order(order_id, hospital[0], blood_type, quantity)
+                        except DatabaseError as err:
+                            st.error(f"Database error: {err}")
+                        else:
+                            if placed_at:
+                                st.success(f"Order {qualify_order_id(placed_at, order_id)} placed at {placed_at.name}")
+                                st.caption(f"Allocated from {len(result.allocations)} lot(s) in "
+                                           f"{result.latency_ms:.1f} ms")
+                            else:
+                                st.error(f"No site that answered has {quantity} units of {blood_type}")
+                    else:
+                        # Lock, check and deduct in one transaction at the picked site
+                        try:
+                            result = place_order_at(site, order_id, hospital[0], blood_type, quantity, backorder)
+                        except DatabaseError as err:
+                            st.error(f"Database error: {err}")
+                            result = None
+
+                        if result and result.backordered:
+                            st.info(f"Order backordered: only {result.available} units of {blood_type} in stock. "
+                                    "Run Batch Fulfilment once stock arrives.")
+                        elif result and result.placed:
+                            st.success(f"Order {qualify_order_id(site, order_id)} placed successfully!")
+                            st.caption(f"Allocated from {len(result.allocations)} lot(s), first-expiring first, "
+                                       f"in {result.latency_ms:.1f} ms")
+                            st.balloons()
+                        elif result:
+                            st.error(f"Insufficient blood available in inventory ({result.available} units of {blood_type})")
+
+    if tab3.open:
+        with tab3, instrumentation.tab("Update Status"):
+            st.subheader("Update Order Status")
+            order_id = st.selectbox("Select Order", 
+                [o["Order_id"] for o in cached_query("SELECT Order_id FROM Orders WHERE Status = 'Pending'", ttl=10) or []])
+
+            new_status = st.selectbox("New Status", ["Fulfilled", "Cancelled"])
+
+            if st.button("Update Status") and order_id:
+                # Status change and any returned stock commit together, at the site holding the order
+                try:
+                    success = run_at(site_for_order(order_id, site),
+                                     lambda tx: update_order_status(tx, order_id, new_status), "update_order_status")
+                except DatabaseError as err:
+                    st.error(f"Database error: {err}")
+                    success = None
+
+                if success:
+                    query_cache.invalidate("Orders", "Blood_Lot", "Order_Allocation")
+                    st.success(f"Order {order_id} status updated to {new_status}")
+                elif success is False:
+                    st.warning(f"Order {order_id} is no longer pending")
+
+    if tab4.open:
+        with tab4, instrumentation.tab("Batch Fulfilment"):
+            st.subheader("Fulfil Pending Orders")
+            st.caption("Reserved orders are fulfilled as they stand; backorders are matched against stock, "
+                       "substituting compatible blood groups (O- last).")
+            policy = st.selectbox("Priority", POLICIES,
+                                  format_func=lambda p: {"max_orders": "Most orders (smallest first)",
+                                                         "fifo": "First come, first served"}[p])
+            preview_col, apply_col = st.columns(2)
+            plan = None
+            if preview_col.button("Preview"):
+                plan = run_transaction(lambda tx: run_fulfilment(tx, policy, dry_run=True), "fulfilment_preview")
+            if apply_col.button("Fulfil Orders", type="primary"):
+                # Deductions, allocations and status changes commit together
+                plan = run_transaction(lambda tx: run_fulfilment(tx, policy), "batch_fulfilment")
+                if plan:
+                    query_cache.invalidate("Orders", "Blood_Lot", "Order_Allocation")
+                    st.success(f"Fulfilled {len(plan.fulfilled)} order(s)")
+            if plan:
+                cols = st.columns(4)
+                cols[0].metric("Fulfillable", len(plan.fulfilled))
+                cols[1].metric("Left Pending", len(plan.unfilled))
+                cols[2].metric("With Substitutes", len(plan.substituted))
+                cols[3].metric("Planned In", f"{plan.latency_ms:.0f} ms")
+                if len(plan.allocations):
+                    st.dataframe(plan.allocations.groupby("Blood_grp")["Units"].sum().rename("Units issued"))
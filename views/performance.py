@@ -0,0 +1,75 @@
+import pandas as pd
+import streamlit as st
+
+import instrumentation
+import write_queue
+from change_feed import get_feed
+from database import pool_waits, recent_transactions
+from query_cache import query_cache
+from views.common import lazy_tabs
+
+
+# Performance page: query profile, reruns and background services
+def render():
+    st.header("⏱️ Query Performance")
+    events = instrumentation.events()
+    latencies = sorted(event["latency_ms"] for event in events)
+    waits = sorted(pool_waits)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Queries Recorded", len(events))
+    col2.metric("Median Latency", f"{latencies[len(latencies) // 2]:.1f} ms" if latencies else "-")
+    col3.metric("Errors", sum(1 for event in events if event["error"]))
+    col4.metric("Median Pool Wait", f"{waits[len(waits) // 2]:.1f} ms" if waits else "-")
+
+    tab1, tab2, tab3, tab4, tab5 = lazy_tabs(["Slowest Queries", "By Page", "N+1 Patterns", "Transactions",
+                                              "Page Loads"], key="performance_tabs")
+
+    if tab1.open:
+        with tab1:
+            slowest = instrumentation.slowest()
+            if slowest:
+                st.dataframe(pd.DataFrame(slowest)[["latency_ms", "rows", "pool_wait_ms", "page", "tab", "query", "error"]])
+            else:
+                st.info("No queries recorded yet.")
+
+    if tab2.open:
+        with tab2:
+            pages = instrumentation.per_page()
+            if pages:
+                st.dataframe(pd.DataFrame(pages))
+
+    if tab3.open:
+        with tab3:
+            repeated = instrumentation.n_plus_one()
+            if repeated:
+                st.warning("These statements ran many times within one page load; consider batching them.")
+                st.dataframe(pd.DataFrame(repeated))
+            else:
+                st.success("No repeated per-run statements detected.")
+
+    if tab4.open:
+        with tab4:
+            st.write(query_cache.stats())
+            st.write("Change feed", get_feed().stats())
+            if write_queue.ENABLED:
+                st.write("Write queue", write_queue.get_write_queue().stats())
+            if recent_transactions:
+                st.dataframe(pd.DataFrame(list(recent_transactions)[::-1]))
+
+    if tab5.open:
+        with tab5:
+            cold = instrumentation.cold_start()
+            if cold:
+                st.metric("Cold Start", f"{cold['duration_ms']:.0f} ms",
+                          help=f"First run of this process ({cold['page']}), imports included")
+            page_runs = instrumentation.per_page_runs()
+            if page_runs:
+                st.caption("Script run time per page; a page's first visit also imports its module")
+                st.dataframe(pd.DataFrame(page_runs)[["page", "reruns", "median_ms", "p95_ms", "max_ms",
+                                                      "first_visit_ms"]])
+
+    if st.button("Clear Profile"):
+        instrumentation.clear()
+        pool_waits.clear()
+        st.rerun()
@@ -0,0 +1,28 @@
+import pandas as pd
+import streamlit as st
+
+from database import cached_query
+from search import SEARCH_TTL, process_query
+
+
+# Search Database page: plain-language questions turned into SQL
+def render():
+    st.header("🔍 Search Blood Bank Database")
+    user_query = st.text_input("Ask your question (e.g., 'available blood', 'donors with A+', 'contact of John', "
+                               "'pending orders for O- at hospital City General in the last 30 days'):")
+
+    if user_query:
+        query_info = process_query(user_query)
+        if query_info:
+            sql_query, params = query_info
+            result = cached_query(sql_query, params, ttl=SEARCH_TTL)
+            if result:
+                st.write("### Results:")
+                df = pd.DataFrame(result)
+                st.dataframe(df.style.set_properties(**{'background-color': '#333333'}))
+            else:
+                st.warning("No relevant data found.")
+        else:
+            st.error("Invalid query. Try asking about: blood availability, donors, hospital orders, supply, or contact info, "
+                     "optionally with a blood group, 'at hospital ...', a status, or a date range "
+                     "('between 2024-01-01 and 2024-03-31', 'since ...', 'last 30 days').")
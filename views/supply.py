@@ -0,0 +1,63 @@
+import streamlit as st
+
+import instrumentation
+import write_queue
+from database import DatabaseError, backend, cached_query
+from inventory import INSERT_SUPPLY, record_supply
+from pagination import paginated_table
+from query_cache import query_cache
+from sites import run_at
+from validation import BLOOD_GROUPS
+from views.common import bulk_import_panel, lazy_tabs, queued_write, site_picker
+
+
+# Supply page, for the picked site
+def render():
+    st.header("🚚 Supply Management")
+    site = site_picker()
+
+    tab1, tab2 = lazy_tabs(["View Supply History", "Add Supply Record"], key="supply_tabs")
+
+    if tab1.open:
+        with tab1, instrumentation.tab("View Supply History"):
+            paginated_table("supply")
+
+    if tab2.open:
+        with tab2, instrumentation.tab("Add Supply Record"):
+            with st.form("add_supply", clear_on_submit=True):
+                st.subheader("Add New Supply Record")
+                cols = st.columns(2)
+
+                with cols[0]:
+                    supply_id = st.text_input("Supply ID* (e.g., SUP100)")
+                    hosp_id = st.selectbox("Hospital*", 
+                        [h["Hosp_id"] for h in cached_query("SELECT Hosp_id FROM Hospital", ttl=300, db=backend) or []])
+
+                with cols[1]:
+                    blood_type = st.selectbox("Blood Type*", BLOOD_GROUPS)
+                    quantity = st.number_input("Quantity (units)*", min_value=1, max_value=50, value=1)
+
+                submitted = st.form_submit_button("Record Supply")
+
+                if submitted:
+                    if not supply_id:
+                        st.error("Please enter a Supply ID")
+                    elif write_queue.ENABLED and site.home:
+                        queued_write(INSERT_SUPPLY, (supply_id, hosp_id, blood_type, quantity), "Supply record")
+                    else:
+                        # The write queue only serves the home database
+                        hospital = cached_query("SELECT Hosp_id, Hosp_name, Location FROM Hospital WHERE Hosp_id = %s",
+                                                (hosp_id,), ttl=300, db=backend)
+                        try:
+                            success = run_at(site, lambda tx: record_supply(tx, supply_id, hosp_id, blood_type, quantity),
+                                             "record_supply", hospital[0] if hospital else None)
+                        except DatabaseError as err:
+                            st.error(f"Database error: {err}")
+                            success = None
+
+                        if success:
+                            query_cache.invalidate("Supply", "Blood_Lot")
+                            st.success("Supply recorded successfully!")
+                            st.balloons()
+
+            bulk_import_panel("supply")
@@ -0,0 +1,305 @@
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+
+import instrumentation
+from database import DatabaseError, backend, transaction
+from query_cache import query_cache
+
+logger = logging.getLogger("blood_bank.write_queue")
+
+# Off unless BB_ASYNC_WRITES=1; the UI then hands inserts to the background writer
+ENABLED = os.environ.get("BB_ASYNC_WRITES", "0").lower() in ("1", "true", "yes")
+BATCH_ROWS = int(os.environ.get("BB_WRITE_BATCH_ROWS", "500"))
+FLUSH_MS = int(os.environ.get("BB_WRITE_FLUSH_MS", "200"))
+MAX_DEPTH = int(os.environ.get("BB_WRITE_QUEUE_DEPTH", "10000"))
+SPOOL_PATH = os.environ.get("BB_WRITE_SPOOL", "write_spool.jsonl")
+# How long submit() blocks on a full queue when there is no spool file
+SUBMIT_TIMEOUT = 5
+
+INSERT_TABLE = re.compile(r"^\s*INSERT\s+(?:IGNORE\s+)?INTO\s+`?(\w+)", re.IGNORECASE)
+
+
+class WriteQueueFull(Exception):
+    pass
+
+
+# Acknowledgement handle returned to the caller for one queued write
+class WriteTicket:
+    def __init__(self, query, values, tables):
+        self.query = query
+        self.values = tuple(values)
+        self.tables = tables
+        self.status = "queued"
+        self.error = None
+        self.submitted_at = time.monotonic()
+        self._done = threading.Event()
+
+    def _finish(self, status, error=None):
+        self.status = status
+        self.error = error
+        self._done.set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    # Wait for the commit (or spool/failure); returns the final status
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        return self.status
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat(" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+# Background writer: coalesces queued inserts into multi-row batches and
+# commits them every FLUSH_MS or BATCH_ROWS rows on its own pooled connection.
+#
+# Ordering: writes taken straight from the queue commit in submission order,
+# and spooled writes replay in the order they were spooled. The two streams
+# are not ordered against each other: a write submitted while the queue is
+# full, or in a batch that failed, lands in the spool and can commit after
+# newer writes that still fit in the queue. Queued writes are independent
+# single-row INSERTs, so only their relative commit order (and commit-time
+# defaults such as Supply_date) is affected.
+class WriteQueue:
+    def __init__(self, batch_rows=BATCH_ROWS, flush_ms=FLUSH_MS, max_depth=MAX_DEPTH, spool_path=SPOOL_PATH):
+        self.batch_rows = batch_rows
+        self.flush_ms = flush_ms
+        self.spool_path = spool_path
+        self._queue = queue.Queue(maxsize=max_depth)
+        self._spool_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._retry_at = 0.0
+        self.batch_sizes = deque(maxlen=1000)
+        self.commit_ms = deque(maxlen=1000)
+        # Updated by submitting threads and the writer thread alike
+        self._counter_lock = threading.Lock()
+        self.counters = {"submitted": 0, "committed": 0, "failed": 0, "spooled": 0, "replayed": 0,
+                         "replay_failed": 0, "batches": 0, "max_depth": 0}
+
+    def _count(self, name, n=1):
+        with self._counter_lock:
+            self.counters[name] += n
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+            self._thread.start()
+        return self
+
+    # Drain what is queued, then stop the worker
+    def stop(self, timeout=30):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    # Queue one INSERT; tables default to the table being inserted into and
+    # are invalidated in the query cache once the batch commits. A spooled
+    # ticket is final at "spooled": if the database rejects the row on
+    # replay the caller is not told; it is logged and counted in stats()
+    # as "replay_failed".
+    def submit(self, query, values, tables=None):
+        if tables is None:
+            match = INSERT_TABLE.match(query)
+            tables = (match.group(1),) if match else ()
+        ticket = WriteTicket(query, values, tables)
+        self._count("submitted")
+        try:
+            self._queue.put_nowait(ticket)
+        except queue.Full:
+            # Backpressure: park the write durably on disk, or make the caller wait
+            if self.spool_path:
+                self._spool([ticket])
+                return ticket
+            try:
+                self._queue.put(ticket, timeout=SUBMIT_TIMEOUT)
+            except queue.Full:
+                self._count("submitted", -1)
+                raise WriteQueueFull(f"write queue is full ({self._queue.maxsize} pending writes)")
+        depth = self._queue.qsize()
+        with self._counter_lock:
+            self.counters["max_depth"] = max(self.counters["max_depth"], depth)
+        return ticket
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        sizes = list(self.batch_sizes)
+        latencies = sorted(self.commit_ms)
+        with self._counter_lock:
+            counters = dict(self.counters)
+        return dict(
+            counters,
+            depth=self.depth(),
+            avg_batch=sum(sizes) / len(sizes) if sizes else 0.0,
+            p95_commit_ms=latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+            spool_bytes=os.path.getsize(self.spool_path) if self.spool_path and os.path.exists(self.spool_path) else 0,
+        )
+
+    def _run(self):
+        instrumentation.start_run("write_queue")
+        while not (self._stop.is_set() and self._queue.empty()):
+            # Older spooled writes go in before anything newer
+            self._replay_spool()
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+
+    # Block for the first write, then take more until the batch is full or
+    # the flush interval is up
+    def _collect(self):
+        try:
+            batch = [self._queue.get(timeout=self.flush_ms / 1000)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_ms / 1000
+        while len(batch) < self.batch_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    # Commit a batch in one transaction. Consecutive writes with the same
+    # statement go in one executemany (a multi-row INSERT); a run that fails
+    # is retried row by row so one bad row does not sink its neighbours.
+    # Returns False if the database could not be reached at all; the batch
+    # is then spooled, or left to the caller when spool_on_error is off.
+    def _flush(self, batch, spool_on_error=True):
+        started = time.perf_counter()
+        written, failed = [], []
+        try:
+            with transaction("write_queue") as tx:
+                for run in self._runs(batch):
+                    try:
+                        with tx.savepoint():
+                            tx.executemany(run[0].query, [ticket.values for ticket in run])
+                        written += run
+                    except backend.row_errors:
+                        for ticket in run:
+                            try:
+                                with tx.savepoint():
+                                    tx.execute(ticket.query, ticket.values)
+                                written.append(ticket)
+                            except backend.row_errors as err:
+                                failed.append((ticket, err))
+        except DatabaseError as err:
+            logger.warning("write batch of %d not committed: %s", len(batch), err)
+            if not spool_on_error:
+                return False
+            if self.spool_path:
+                self._spool(batch)
+            else:
+                self._count("failed", len(batch))
+                for ticket in batch:
+                    ticket._finish("failed", err)
+            return False
+
+        self.batch_sizes.append(len(batch))
+        self.commit_ms.append((time.perf_counter() - started) * 1000)
+        with self._counter_lock:
+            self.counters["batches"] += 1
+            self.counters["committed"] += len(written)
+            self.counters["failed"] += len(failed)
+        query_cache.invalidate(*{table for ticket in written for table in ticket.tables})
+        for ticket in written:
+            ticket._finish("committed")
+        for ticket, err in failed:
+            logger.error("write rejected: %s %s: %s", ticket.query, ticket.values, err)
+            ticket._finish("failed", err)
+        return True
+
+    @staticmethod
+    def _runs(batch):
+        runs = []
+        for ticket in batch:
+            if runs and runs[-1][0].query == ticket.query:
+                runs[-1].append(ticket)
+            else:
+                runs.append([ticket])
+        return runs
+
+    def _append(self, path, tickets):
+        with open(path, "a") as spool:
+            for ticket in tickets:
+                spool.write(json.dumps({"query": ticket.query, "values": ticket.values,
+                                        "tables": list(ticket.tables)}, default=_encode) + "\n")
+            spool.flush()
+            os.fsync(spool.fileno())
+
+    # Append writes to the spool file; they count as accepted once fsynced
+    def _spool(self, tickets):
+        with self._spool_lock:
+            self._append(self.spool_path, tickets)
+        self._count("spooled", len(tickets))
+        for ticket in tickets:
+            ticket._finish("spooled")
+
+    # Move spooled writes into the database once it is reachable again.
+    # A crash mid-replay replays the file again on restart; rows already
+    # committed then fail on their primary key and are dropped.
+    def _replay_spool(self):
+        if not self.spool_path or time.monotonic() < self._retry_at:
+            return
+        replaying = self.spool_path + ".replay"
+        with self._spool_lock:
+            if not os.path.exists(replaying):
+                if not os.path.exists(self.spool_path):
+                    return
+                os.replace(self.spool_path, replaying)
+        with open(replaying) as spool:
+            tickets = [WriteTicket(entry["query"], entry["values"], tuple(entry["tables"]))
+                       for entry in map(json.loads, filter(str.strip, spool))]
+        for start in range(0, len(tickets), self.batch_rows):
+            batch = tickets[start:start + self.batch_rows]
+            if not self._flush(batch, spool_on_error=False):
+                # Still unreachable: keep the rest, ahead of anything spooled since
+                with self._spool_lock:
+                    if os.path.exists(self.spool_path):
+                        with open(self.spool_path) as newer:
+                            pending = newer.read()
+                        os.remove(self.spool_path)
+                    else:
+                        pending = ""
+                    self._append(self.spool_path, tickets[start:])
+                    with open(self.spool_path, "a") as spool:
+                        spool.write(pending)
+                self._retry_at = time.monotonic() + 5
+                break
+            rejected = sum(ticket.status == "failed" for ticket in batch)
+            self._count("replayed", len(batch) - rejected)
+            if rejected:
+                self._count("replay_failed", rejected)
+        os.remove(replaying)
+
+
+_write_queue = None
+_lock = threading.Lock()
+
+
+# The process-wide writer, started on first use and shared by all sessions
+def get_write_queue():
+    global _write_queue
+    with _lock:
+        if _write_queue is None:
+            _write_queue = WriteQueue().start()
+    return _write_queue